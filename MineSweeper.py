@@ -1,13 +1,22 @@
 import numpy as np
 import random
+from board_codec import UNKNOWN, empty_board, tiles_to_array
+from constraint_store import ConstraintStore
+from frontier_solver import neighbor_table, solve_constraints
+from linear_solver import linear_deductions
+from opening_book import resolve_book
+from rules_kernel import adjacent, analyze_rules, neighbor_sum, pair_subset_mines
+from solver_stats import NULL_STATS
 
-def get_safe_moves(board):
+def get_safe_moves(board, cache=None, total_mines=None):
     """
     工具函数：接收10*10的二维棋盘数据，计算并返回安全的坐标点列表
     
     参数:
     board -- 10*10的二维数组，表示当前棋盘状态
              None表示未知格子，数字表示周围地雷数量
+    cache -- 可选的frontier_cache.FrontierCache，多次调用之间复用前沿分量的枚举结果
+    total_mines -- 可选的整局地雷总数，给出时内部格子也得到精确概率
     
     返回:
     list -- 安全坐标点列表，每个坐标点为(x, y)元组
@@ -37,144 +46,334 @@ def get_safe_moves(board):
         print(f"下一步点击坐标: ({x}, {y})")
     ```
     """
-    solver = MinesweeperSolver()
+    solver = MinesweeperSolver(cache=cache, total_mines=total_mines)
     return solver.get_safe_coordinates(board)
 
+def get_safe_moves_batch(boards):
+    """
+    批量工具函数：一次分析一批棋盘，所有计算都是整批的数组运算，没有逐个棋盘的Python循环
+
+    只使用可以向量化的规则（数字等于未知格子数、相邻数字的子集规则、已知地雷数等于数字、0的周围），
+    不做前沿枚举，所以找到的安全格子可能比get_safe_moves少，但不会把地雷当作安全格子
+
+    参数:
+    boards -- (N, H, W)的int8数组（board_codec格式）；也可以是N个tiles组成的列表
+
+    返回:
+    tuple -- (safe, moves)
+             safe为(N, H, W)的布尔数组，确定安全的格子；
+             moves为(N, 2)的整数数组，每个棋盘建议点击的(i, j)：有安全格子时取行优先的第一个，
+             否则取靠近数字且估计概率最低的格子；全部未知时取中心，没有未知格子时为(-1, -1)
+    """
+    if not isinstance(boards, np.ndarray) or boards.dtype != np.int8:
+        boards = np.stack([tiles_to_array(board) for board in boards])
+    count, rows, cols = boards.shape
+
+    rules = analyze_rules(boards)
+    mines = rules.mine_mask | pair_subset_mines(boards)
+    rules = analyze_rules(boards, known_mines=mines)
+    safe = (rules.safe_mask | rules.zero_safe_mask) & ~mines
+
+    # 估计概率：每个数字把剩余地雷数/剩余未知格子数累加到周围的未知格子上
+    numbers = boards > 0
+    mine_share = np.zeros(boards.shape)
+    np.divide(boards - rules.flagged_count, rules.unknown_count, out=mine_share,
+              where=numbers & (rules.unknown_count > 0))
+    estimate = neighbor_sum(mine_share)
+
+    # 按优先级分层打分（估计值不超过8）：安全格子 < 靠近数字 < 其他未知格子 < 推出的地雷
+    near_numbers = adjacent(boards >= 0)
+    score = np.where(near_numbers, estimate, estimate + 16)
+    score = np.where(mines, 32.0, score)
+    score = np.where(safe, -1.0, score)
+    score = np.where(rules.unknown, score, np.inf).reshape(count, -1)
+
+    best = np.argmin(score, axis=1)
+    moves = np.stack(np.divmod(best, cols), axis=1)
+    moves[np.isinf(score[np.arange(count), best])] = -1
+    moves[rules.unknown.all(axis=(1, 2))] = (rows // 2, cols // 2)
+    return safe, moves
+
 class MinesweeperSolver:
     """
     扫雷游戏解答器类，用于分析棋盘状态并提供安全的点击位置
     
     主要功能:
-    1. 分析棋盘状态，计算每个格子是地雷的概率
+    1. 分析棋盘状态，通过前沿枚举精确计算每个格子是地雷的概率
     2. 提供下一步最佳的点击位置
     3. 返回安全的坐标点列表
     """
     
-    def __init__(self):
-        self.board_size = 10
-        self.known_board = np.full((self.board_size, self.board_size), None)
-        self.probability_map = np.zeros((self.board_size, self.board_size))
+    def __init__(self, incremental=False, cache=None, total_mines=None, deduction="pairs", rows=10, cols=10,
+                 stats=None, opening_book=None):
+        """
+        参数:
+        incremental -- 为True时在两次update_board之间保留约束状态，
+                       每次只重新分析新揭示格子附近的约束，结果与完整重算相同
+        cache -- 可选的frontier_cache.FrontierCache，可以在多个求解器、多局游戏之间共享
+        total_mines -- 可选的整局地雷总数。给出时前沿布局按剩余地雷在内部格子中的放法数加权，
+                       内部格子得到精确概率，选择下一步时不再优先靠近数字的格子
+        deduction -- 枚举之前的规则推理："pairs"比较相邻数字对；"linear"对所有约束做整数消元和
+                     上下界检查（linear_solver），推出的安全格子也不再参与枚举。只用于完整重算模式
+        rows, cols -- 初始棋盘的行数和列数。update_board收到不同尺寸的棋盘时按新尺寸重新开始，
+                      所以任意尺寸的棋盘都可以直接传入
+        stats -- 可选的solver_stats.SolverStats，记录各阶段（update_board、calculate_probabilities、
+                 advanced_analysis、enumeration、get_next_move）的纳秒耗时和约束、分量、枚举布局数、
+                 缓存命中等计数器；默认不统计
+        opening_book -- 可选的opening_book.OpeningBook，为True时使用默认的开局库（第一次用到时才读取）。
+                        知道total_mines时，空棋盘和开局库收录的开局棋盘直接使用开局库的下一步，
+                        update_board跳过分析，之后需要时再补上
+        """
+        self.known_board = empty_board(rows, cols)
+        self.probability_map = np.zeros((rows, cols))
         self.visited = set()
         self.safe_moves = set()
         self.potential_mines = set()  # 可能是地雷的位置
         self.last_move = None  # 记录上一次的移动
+        self.incremental = incremental
+        self.cache = cache
+        self.total_mines = total_mines
+        self.deduction = deduction
+        self.constraints = ConstraintStore()  # 按格子索引的约束（增量模式下已扣除推出的地雷）
+        self._component_cache = {}  # 增量模式：上一次各前沿分量的枚举结果
+        self._revealed = []  # 新揭示、还没有分析的格子（扁平索引）
+        self.stats = stats or NULL_STATS
+        self.opening_book = opening_book
+        self._book_move = None  # 开局库给出的下一步(i, j)
+        self._stale = False  # update_board因为开局库跳过了分析
         
     def update_board(self, new_board):
         """更新当前已知的棋盘状态"""
-        old_board = self.known_board.copy()
-        self.known_board = np.array(new_board)
-        
-        # 检查新的数字，用于更精确地分析
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                # 如果这个位置是新揭示的数字
-                if old_board[i, j] is None and isinstance(self.known_board[i, j], (int, float)):
-                    # 如果是0，标记周围所有格子为安全
-                    if self.known_board[i, j] == 0:
-                        for ni, nj in self._get_neighbors(i, j):
-                            if self.known_board[ni, nj] is None:
-                                self.safe_moves.add((ni, nj))
-        
-        # 更新后重新计算概率
-        self.calculate_probabilities()
+        started = self.stats.start()
+        old_board = self.known_board
+        self.known_board = tiles_to_array(new_board)
+        
+        if old_board.shape != self.known_board.shape:
+            self.probability_map = np.zeros(self.known_board.shape)
+        if old_board.shape != self.known_board.shape or (
+                (old_board != UNKNOWN) & (self.known_board == UNKNOWN)).any():
+            # 新的一局（或者换了棋盘）：丢弃保存的约束和上一局的安全格子，全部重新建立
+            self._reset_incremental_state()
+            self.safe_moves = set()
+            changed = self.known_board != UNKNOWN
+        else:
+            changed = (old_board == UNKNOWN) & (self.known_board != UNKNOWN)
+        # 上一次跳过分析时新揭示的格子还没有处理，所以追加而不是覆盖
+        self._revealed.extend(np.flatnonzero(changed).tolist())
+        
+        # 新揭示的0，标记周围所有格子为安全
+        new_zeros = changed & (self.known_board == 0)
+        if new_zeros.any():
+            self._add_cells(self.safe_moves, adjacent(new_zeros) & (self.known_board == UNKNOWN))
+        
+        # 开局库收录了这个棋盘时直接使用它的下一步，不做分析
+        book = self.opening_book = resolve_book(self.opening_book)
+        move = book.lookup(self.known_board, self.total_mines) if book else None
+        if move is not None:
+            self._book_move = (move[1], move[0])
+            self._stale = True
+        else:
+            # 更新后重新计算概率
+            self._book_move = None
+            self.calculate_probabilities()
+        self.stats.stop("update_board", started)
         
     def calculate_probabilities(self):
-        """计算每个格子是地雷的概率"""
-        self.probability_map = np.zeros((self.board_size, self.board_size))
+        """计算每个格子是地雷的精确概率"""
+        started = self.stats.start()
+        self._stale = False
+        # 已被揭示的格子不再是安全的候选移动
+        self.safe_moves = {(i, j) for i, j in self.safe_moves if self.known_board[i, j] == UNKNOWN}
+        if self.incremental:
+            self._incremental_analysis()
+        else:
+            self._full_analysis()
+        self.stats.stop("calculate_probabilities", started)
+    
+    def _full_analysis(self):
+        """完整重算模式：规则推理之后对其余的前沿做枚举"""
         self.potential_mines.clear()  # 清除旧的潜在地雷标记
         
-        # 标记已知数字周围的未知格子
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                if isinstance(self.known_board[i, j], (int, float)) and self.known_board[i, j] > 0:
-                    self._analyze_cell(i, j)
+        # 按新揭示的格子更新约束库
+        self._analyze_cells()
         
-        # 高级分析：查找确定是地雷的格子
-        self._advanced_analysis()
+        # 规则推理：查找确定是地雷和确定安全的格子
+        known_safe = self._advanced_analysis()
+        self.safe_moves |= known_safe
         
-    def _analyze_cell(self, i, j):
-        """分析一个已知数字格子周围的情况"""
-        if not isinstance(self.known_board[i, j], (int, float)) or self.known_board[i, j] <= 0:
-            return
-            
-        # 获取周围的未知格子
-        unknown_cells = []
-        for ni, nj in self._get_neighbors(i, j):
-            if self.known_board[ni, nj] is None:
-                unknown_cells.append((ni, nj))
-        
-        # 如果周围有未知格子，更新它们的概率
-        if unknown_cells:
-            # 数字表示周围地雷数量
-            mine_probability = self.known_board[i, j] / len(unknown_cells)
-            for ni, nj in unknown_cells:
-                self.probability_map[ni, nj] += mine_probability
-                
-            # 如果数字等于周围未知格子数量，所有未知格子都是地雷
-            if self.known_board[i, j] == len(unknown_cells):
-                for ni, nj in unknown_cells:
-                    self.potential_mines.add((ni, nj))
-                    
-            # 如果数字为0，周围所有格子都是安全的
-            elif self.known_board[i, j] == 0:
-                for ni, nj in unknown_cells:
-                    self.safe_moves.add((ni, nj))
+        # 前沿枚举：规则推出的地雷和安全格子不再参与枚举，得到其余格子的精确概率。
+        # 约束直接从约束库得到，不必每次扫描整个棋盘重建
+        rows, cols = self.known_board.shape
+        mine_idx = {i * cols + j for i, j in self.potential_mines}
+        safe_idx = {i * cols + j for i, j in known_safe}
+        result = self._enumerate(self._frontier_constraints(mine_idx, safe_idx),
+                                 self.known_board.ravel().tolist(), rows, cols, mine_idx, safe_idx)
+        self.probability_map = result.probabilities
+        self.potential_mines |= result.mines
+        self.safe_moves |= result.safe
+        
+    def _analyze_cells(self):
+        """
+        更新约束库中新揭示的格子及其相邻数字的约束
+        
+        完整重算模式下约束库只扣除棋盘上标出的地雷，不扣除推出的地雷，
+        所以只需要更新周围有格子被揭示的数字
+        """
+        rows, cols = self.known_board.shape
+        values = self.known_board.ravel().tolist()
+        neighbors = neighbor_table(rows, cols)
+        self.constraints.refresh(self._ring(self._revealed, neighbors), values, neighbors, ())
+        self._revealed = []
     
     def _advanced_analysis(self):
-        """高级分析：比较相邻数字的信息来推断安全格子和地雷"""
-        # 遍历所有已知数字
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                if not isinstance(self.known_board[i, j], (int, float)) or self.known_board[i, j] <= 0:
-                    continue
-                    
-                # 获取这个数字周围的未知格子
-                unknown_neighbors = [(ni, nj) for ni, nj in self._get_neighbors(i, j) 
-                                   if self.known_board[ni, nj] is None]
-                
-                # 对于每个相邻的已知数字，比较它们的未知邻居
-                for ni, nj in self._get_neighbors(i, j):
-                    if not isinstance(self.known_board[ni, nj], (int, float)) or self.known_board[ni, nj] <= 0:
-                        continue
-                        
-                    # 获取相邻数字的未知邻居
-                    neighbor_unknowns = [(xi, xj) for xi, xj in self._get_neighbors(ni, nj) 
-                                       if self.known_board[xi, xj] is None]
-                    
-                    # 计算两个集合的差异
-                    only_in_first = set(unknown_neighbors) - set(neighbor_unknowns)
-                    only_in_second = set(neighbor_unknowns) - set(unknown_neighbors)
-                    
-                    # 如果第一个数字比第二个数字大，且第二个数字的所有未知邻居都是第一个数字的未知邻居
-                    # 那么只存在于第一个集合中的格子都是地雷
-                    if (self.known_board[i, j] > self.known_board[ni, nj] and 
-                        len(only_in_second) == 0 and 
-                        len(only_in_first) == self.known_board[i, j] - self.known_board[ni, nj]):
-                        for xi, xj in only_in_first:
-                            self.potential_mines.add((xi, xj))
-                            
-                    # 如果第二个数字比第一个数字大，且第一个数字的所有未知邻居都是第二个数字的未知邻居
-                    # 那么只存在于第二个集合中的格子都是地雷
-                    elif (self.known_board[ni, nj] > self.known_board[i, j] and 
-                          len(only_in_first) == 0 and 
-                          len(only_in_second) == self.known_board[ni, nj] - self.known_board[i, j]):
-                        for xi, xj in only_in_second:
-                            self.potential_mines.add((xi, xj))
+        """高级分析：比较重叠的约束来推断地雷和安全格子
+        
+        数字等于周围未知格子数量时，所有未知格子都是地雷；对每一对共享未知格子的数字，
+        如果两个数字之差等于只属于第一个数字的未知邻居数量，那么这些格子都是地雷，
+        只属于第二个数字的未知邻居都安全（约束库的格子索引直接给出重叠的数字）。
+        deduction为"linear"时改为对所有约束做线性推理
+        
+        返回:
+        set -- 推出的确定安全的格子
+        """
+        started = self.stats.start()
+        cols = self.known_board.shape[1]
+        if self.deduction == "linear":
+            safe, mines = linear_deductions(list(self.constraints.values()))
+        else:
+            safe, mines = self.constraints.deduce(self.constraints.numbers())
+        self.potential_mines.update(divmod(idx, cols) for idx in mines)
+        self.stats.stop("advanced_analysis", started)
+        return {divmod(idx, cols) for idx in safe}
+    
+    def _enumerate(self, constraints, values, rows, cols, mine_idx, safe_idx=(), component_cache=None):
+        """前沿枚举（solve_constraints），记录enumeration阶段的耗时和相关计数器"""
+        stats = self.stats
+        started = stats.start()
+        hits = self.cache.hits if stats and self.cache is not None else 0
+        result = solve_constraints(constraints, values, rows, cols, mine_idx, safe_idx,
+                                   component_cache=component_cache, cache=self.cache,
+                                   total_mines=self.total_mines)
+        stats.stop("enumeration", started)
+        if stats:
+            stats.count("constraints", len(constraints))
+            stats.count("components", result.components)
+            stats.count("configurations", result.configurations)
+            stats.count("component_reuse", result.reused)
+            if self.cache is not None:
+                stats.count("cache_hits", self.cache.hits - hits)
+        return result
+    
+    def _frontier_constraints(self, mine_idx, safe_idx):
+        """
+        约束库中的约束扣除推出的地雷、去掉推出的安全格子，结果与
+        frontier_solver.build_constraints(..., known_mines)再去掉安全格子相同
+        """
+        constraints = {}
+        for need, cells in self.constraints.values():
+            if mine_idx or safe_idx:
+                need -= sum(1 for c in cells if c in mine_idx)
+                cells = tuple(c for c in cells if c not in mine_idx and c not in safe_idx)
+            if cells:
+                constraints[cells] = need
+        return [(need, cells) for cells, need in constraints.items()]
+    
+    def _reset_incremental_state(self):
+        """清空保存的约束以及增量模式的分量结果和已推出的地雷"""
+        self.constraints.clear()
+        self._component_cache = {}
+        self.potential_mines = set()
+        self._revealed = []
+    
+    def _incremental_analysis(self):
+        """
+        增量模式的概率计算
+        
+        只重建新揭示格子及其相邻数字的约束，规则只检查约束发生变化的数字，
+        通过约束库的格子索引找到与它们重叠的约束；推出的地雷不会因为揭示更多格子而失效，
+        所以跨调用保留。前沿枚举复用约束没有变化的分量的结果
+        """
+        board = self.known_board
+        rows, cols = board.shape
+        values = board.ravel().tolist()
+        neighbors = neighbor_table(rows, cols)
+        mine_idx = {i * cols + j for i, j in self.potential_mines}
+        
+        # 约束会变化的数字：新揭示的格子，以及与新揭示格子相邻的数字
+        dirty = set(self._revealed)
+        for idx in self._revealed:
+            dirty.update(neighbors[idx])
+        self._revealed = []
+        pending = self.constraints.refresh(dirty, values, neighbors, mine_idx)
+        
+        started = self.stats.start()
+        while pending:
+            safe, new_mines = self.constraints.deduce(pending)
+            self.safe_moves.update(divmod(idx, cols) for idx in safe)
+            new_mines -= mine_idx
+            if not new_mines:
+                break
+            mine_idx |= new_mines
+            # 新地雷要从相邻数字的约束中扣除，扣除后的约束可能推出更多结论
+            pending = self.constraints.refresh(self._ring(new_mines, neighbors), values, neighbors, mine_idx)
+        self.stats.stop("advanced_analysis", started)
+        
+        constraints = {cells: need for need, cells in self.constraints.values()}
+        result = self._enumerate([(need, cells) for cells, need in constraints.items()],
+                                 values, rows, cols, mine_idx, component_cache=self._component_cache)
+        self.probability_map = result.probabilities
+        self.safe_moves |= result.safe
+
+        # 枚举推出的地雷同样从相邻数字的约束中扣除，保证下次调用时约束与potential_mines一致
+        found = {i * cols + j for i, j in result.mines} - mine_idx
+        if found:
+            mine_idx |= found
+            self.constraints.refresh(self._ring(found, neighbors), values, neighbors, mine_idx)
+        self.potential_mines = {divmod(idx, cols) for idx in mine_idx}
+    
+    @staticmethod
+    def _ring(cells, neighbors):
+        """cells以及与cells相邻的所有格子"""
+        ring = set(cells)
+        for idx in cells:
+            ring.update(neighbors[idx])
+        return ring
+    
+    @staticmethod
+    def _add_cells(cells, mask):
+        """把布尔数组中为True的格子以(i, j)元组加入集合"""
+        cells.update(tuple(cell) for cell in np.argwhere(mask).tolist())
     
     def _get_neighbors(self, i, j):
         """获取一个格子周围的8个相邻格子的坐标"""
+        rows, cols = self.known_board.shape
         neighbors = []
         for di in [-1, 0, 1]:
             for dj in [-1, 0, 1]:
                 if di == 0 and dj == 0:
                     continue
                 ni, nj = i + di, j + dj
-                if 0 <= ni < self.board_size and 0 <= nj < self.board_size:
+                if 0 <= ni < rows and 0 <= nj < cols:
                     neighbors.append((ni, nj))
         return neighbors
     
     def get_next_move(self):
         """决定下一步点击的位置"""
+        started = self.stats.start()
+        move = self._choose_move()
+        self.stats.stop("get_next_move", started)
+        return move
+    
+    def _choose_move(self):
+        """get_next_move的选择逻辑：开局库、已知安全的格子、第一步的中间位置、概率最低的格子、随机冒险"""
+        if self._book_move is not None:
+            move = self._book_move
+            self._book_move = None
+            self.safe_moves.discard(move)
+            self.last_move = move
+            return move
+        self.refresh_probabilities()
+        
         # 首先检查是否有已知安全的移动
         if self.safe_moves:
             move = list(self.safe_moves)[0]
@@ -183,77 +382,55 @@ class MinesweeperSolver:
             return move
         
         # 如果是第一步，选择中间位置
-        if np.all(self.known_board == None):
-            self.last_move = (self.board_size // 2, self.board_size // 2)
+        if np.all(self.known_board == UNKNOWN):
+            rows, cols = self.known_board.shape
+            self.last_move = (rows // 2, cols // 2)
             return self.last_move
         
-        # 找到概率最低的未知格子
-        min_prob = float('inf')
-        best_move = None
-        
-        # 避开可能是地雷的格子
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                if self.known_board[i, j] is None and (i, j) not in self.potential_mines:
-                    # 优先选择靠近已知数字的格子
-                    has_number_neighbor = False
-                    for ni, nj in self._get_neighbors(i, j):
-                        if isinstance(self.known_board[ni, nj], (int, float)) and self.known_board[ni, nj] >= 0:
-                            has_number_neighbor = True
-                            break
-                    
-                    # 如果有数字邻居且概率较低，优先选择
-                    current_prob = self.probability_map[i, j]
-                    if has_number_neighbor:
-                        # 优先选择概率为0的格子
-                        if current_prob == 0:
-                            best_move = (i, j)
-                            min_prob = 0
-                            break
-                        elif current_prob < min_prob:
-                            min_prob = current_prob
-                            best_move = (i, j)
-        
-        # 如果没有找到靠近数字且概率低的格子，尝试任何概率低的格子
-        if best_move is None:
-            for i in range(self.board_size):
-                for j in range(self.board_size):
-                    if self.known_board[i, j] is None and (i, j) not in self.potential_mines:
-                        current_prob = self.probability_map[i, j]
-                        if current_prob < min_prob:
-                            min_prob = current_prob
-                            best_move = (i, j)
-        
-        # 如果仍然没有找到，随机选择一个未知格子（避开可能的地雷）
+        # 找到概率最低的未知格子，避开可能是地雷的格子（按行优先取第一个，概率为0的格子自然排在最前）
+        candidates = self._candidate_mask()
+        # 优先选择靠近已知数字的格子（不知道总地雷数时，内部格子的概率只是估计）
+        preferred = candidates if self.total_mines is not None else candidates & adjacent(self.known_board >= 0)
+        best_moves = self._lowest_probability(preferred) or self._lowest_probability(candidates)
+        best_move = best_moves[0] if best_moves else None
+        
+        # 如果仍然没有找到，随机选择一个未知格子
         if best_move is None:
-            unknown_positions = [(i, j) for i in range(self.board_size) 
-                              for j in range(self.board_size) 
-                              if self.known_board[i, j] is None and (i, j) not in self.potential_mines]
-            
-            # 如果所有未知格子都可能是地雷，那么只能冒险选择一个
-            if not unknown_positions:
-                unknown_positions = [(i, j) for i in range(self.board_size) 
-                                  for j in range(self.board_size) 
-                                  if self.known_board[i, j] is None]
+            # 所有未知格子都可能是地雷，那么只能冒险选择一个
+            unknown_positions = [tuple(cell) for cell in np.argwhere(self.known_board == UNKNOWN).tolist()]
                 
             if unknown_positions:
-                # 优先选择角落和边缘，因为它们通常地雷概率较低
-                corner_and_edges = []
-                for i, j in unknown_positions:
-                    neighbor_count = len(self._get_neighbors(i, j))
-                    if neighbor_count < 8:  # 不是完全被包围的格子
-                        corner_and_edges.append((i, j))
-                
-                if corner_and_edges:
-                    best_move = random.choice(corner_and_edges)
-                else:
-                    best_move = random.choice(unknown_positions)
+                best_move = self._pick_corner_or_edge(unknown_positions)
             else:
                 # 如果没有未知格子，游戏结束
                 return None
         
         self.last_move = best_move
         return best_move
+    
+    def refresh_probabilities(self):
+        """update_board因为开局库跳过了分析时，现在补上，保证probability_map等状态是最新的"""
+        if self._stale:
+            self.calculate_probabilities()
+    
+    def _candidate_mask(self):
+        """所有未知且不是潜在地雷的格子（布尔数组）"""
+        candidates = self.known_board == UNKNOWN
+        for i, j in self.potential_mines:
+            candidates[i, j] = False
+        return candidates
+    
+    def _pick_corner_or_edge(self, positions):
+        """随机选择一个格子，优先选择角落和边缘，因为它们通常地雷概率较低"""
+        corner_and_edges = []
+        for i, j in positions:
+            neighbor_count = len(self._get_neighbors(i, j))
+            if neighbor_count < 8:  # 不是完全被包围的格子
+                corner_and_edges.append((i, j))
+        
+        if corner_and_edges:
+            return random.choice(corner_and_edges)
+        return random.choice(positions)
         
     def solve_step(self, current_board):
         """解决扫雷游戏的一步"""
@@ -274,6 +451,7 @@ class MinesweeperSolver:
         list -- 安全坐标点列表，每个坐标点为(x, y)元组
         """
         self.update_board(board)
+        self.refresh_probabilities()
         
         # 收集所有安全的移动
         safe_coordinates = []
@@ -284,40 +462,16 @@ class MinesweeperSolver:
             return safe_coordinates
         
         # 2. 找到概率为0的格子
-        zero_prob_moves = []
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                if (self.known_board[i, j] is None and 
-                    (i, j) not in self.potential_mines and 
-                    (i, j) not in self.safe_moves and
-                    self.probability_map[i, j] == 0):
-                    zero_prob_moves.append((i, j))
+        candidates = self._candidate_mask()
+        zero_prob_moves = [tuple(cell) for cell in np.argwhere(candidates & (self.probability_map == 0)).tolist()]
         
         if zero_prob_moves:
             safe_coordinates.extend(zero_prob_moves)
             return safe_coordinates
             
         # 3. 找到靠近已知数字且概率最低的格子
-        min_prob = float('inf')
-        best_moves = []
-        
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                if self.known_board[i, j] is None and (i, j) not in self.potential_mines:
-                    # 检查是否靠近已知数字
-                    has_number_neighbor = False
-                    for ni, nj in self._get_neighbors(i, j):
-                        if isinstance(self.known_board[ni, nj], (int, float)) and self.known_board[ni, nj] >= 0:
-                            has_number_neighbor = True
-                            break
-                    
-                    if has_number_neighbor:
-                        current_prob = self.probability_map[i, j]
-                        if current_prob < min_prob:
-                            min_prob = current_prob
-                            best_moves = [(i, j)]
-                        elif current_prob == min_prob:
-                            best_moves.append((i, j))
+        preferred = candidates if self.total_mines is not None else candidates & adjacent(self.known_board >= 0)
+        best_moves = self._lowest_probability(preferred)
         
         if best_moves:
             # 返回概率最低的格子
@@ -325,43 +479,27 @@ class MinesweeperSolver:
             return safe_coordinates
             
         # 4. 如果没有找到靠近数字的格子，选择任何概率最低的格子
-        min_prob = float('inf')
-        best_moves = []
-        
-        for i in range(self.board_size):
-            for j in range(self.board_size):
-                if self.known_board[i, j] is None and (i, j) not in self.potential_mines:
-                    current_prob = self.probability_map[i, j]
-                    if current_prob < min_prob:
-                        min_prob = current_prob
-                        best_moves = [(i, j)]
-                    elif current_prob == min_prob:
-                        best_moves.append((i, j))
+        best_moves = self._lowest_probability(candidates)
         
         if best_moves:
             safe_coordinates.append(random.choice(best_moves))
             return safe_coordinates
             
         # 5. 如果所有格子都可能是地雷，选择一个未知格子（优先选择角落和边缘）
-        unknown_positions = [(i, j) for i in range(self.board_size) 
-                          for j in range(self.board_size) 
-                          if self.known_board[i, j] is None]
+        unknown_positions = [tuple(cell) for cell in np.argwhere(self.known_board == UNKNOWN).tolist()]
         
         if unknown_positions:
-            # 优先选择角落和边缘
-            corner_and_edges = []
-            for i, j in unknown_positions:
-                neighbor_count = len(self._get_neighbors(i, j))
-                if neighbor_count < 8:  # 不是完全被包围的格子
-                    corner_and_edges.append((i, j))
-            
-            if corner_and_edges:
-                safe_coordinates.append(random.choice(corner_and_edges))
-            else:
-                safe_coordinates.append(random.choice(unknown_positions))
+            safe_coordinates.append(self._pick_corner_or_edge(unknown_positions))
         
         # 如果棋盘上没有未知格子，返回空列表
         return safe_coordinates
+    
+    def _lowest_probability(self, mask):
+        """按行优先顺序返回mask中地雷概率最低的所有格子"""
+        if not mask.any():
+            return []
+        lowest = self.probability_map[mask].min()
+        return [tuple(cell) for cell in np.argwhere(mask & (self.probability_map == lowest)).tolist()]
 
 # 使用示例
 if __name__ == "__main__":
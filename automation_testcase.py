@@ -0,0 +1,45 @@
+"""
+main.py的测试共用的基类：在临时目录中准备token.txt，为模拟服务器创建MagicNewtonAutomation
+"""
+import os
+import tempfile
+import unittest
+
+from main import MagicNewtonAutomation
+
+
+class AutomationTestCase(unittest.TestCase):
+    """
+    子类设置tokens；setUp把它们写入临时目录中的token.txt，测试结束时删除临时目录。
+    automation()创建的对象在测试结束时自动关闭
+    """
+
+    tokens = []
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.token_file = self.path("token.txt")
+        with open(self.token_file, "w") as f:
+            f.write("\n".join(self.tokens) + "\n")
+
+    def path(self, name):
+        """临时目录中的文件路径"""
+        return os.path.join(self.tmp.name, name)
+
+    def automation(self, server, state_file=None, **options):
+        """
+        连接server的MagicNewtonAutomation，账号之间不等待
+
+        参数:
+        state_file -- 状态数据库的文件名（在临时目录中），默认不使用状态数据库
+        options -- 传给MagicNewtonAutomation的其他参数，例如max_concurrency
+        """
+        automation = MagicNewtonAutomation(server.url, self.token_file, proxy_file=self.path("proxy.txt"),
+                                           header_file=self.path("header.json"),
+                                           state_file=state_file and self.path(state_file), **options)
+        automation.task_delay = (0, 0)
+        self.addCleanup(automation.api_client.close)
+        if automation.state_store:
+            self.addCleanup(automation.state_store.close)
+        return automation
@@ -0,0 +1,155 @@
+import numpy as np
+from board_codec import UNKNOWN
+from MineSweeper import get_safe_moves_batch
+from rules_kernel import adjacent, neighbor_count
+
+_GOLDEN = np.uint64(0x9E3779B97F4A7C15)
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+
+def _mix(values):
+    """splitmix64的混合函数，对uint64数组逐元素计算（乘法按2^64回绕）"""
+    values = values.copy()
+    values ^= values >> np.uint64(30)
+    values *= _MIX1
+    values ^= values >> np.uint64(27)
+    values *= _MIX2
+    values ^= values >> np.uint64(31)
+    return values
+
+
+class BatchGames:
+    """
+    同时进行count局扫雷的批量引擎，每一步每局点击一个格子，全部用(K, H, W)的数组运算完成
+
+    地雷在第一步点击时放置，与minesweeper_demo.MinesweeperGame.place_mines相同，
+    点击位置及其周围8格不放地雷。每局有独立的随机流：第start + k局的布局只由(seed, start + k)
+    和第一次点击的位置决定，与批次大小无关，所以百万局可以分成多批跑，结果仍然可以复现。
+    点到0时与服务器一样揭示整个0区域及其边界。
+
+    坐标与get_safe_moves_batch的返回值相同，为(行, 列)。
+
+    属性:
+    boards -- (K, H, W)的int8可见棋盘（board_codec格式），可以直接交给批量求解器
+    mines -- (K, H, W)的地雷布尔数组，第一步之前为None
+    game_over / exploded -- (K,)的布尔数组
+    clicks -- (K,)的整数数组，每局的有效点击次数
+    """
+
+    def __init__(self, count, rows=10, cols=10, num_mines=10, seed=None, start=0):
+        self.count = count
+        self.rows = rows
+        self.cols = cols
+        self.num_mines = num_mines
+        base = np.random.SeedSequence(seed).generate_state(1, np.uint64)[0]
+        games = np.arange(start, start + count, dtype=np.uint64)
+        self._game_keys = _mix(base + games * _GOLDEN)
+        self.mines = None
+        self.counts = None
+        self.boards = np.full((count, rows, cols), UNKNOWN, dtype=np.int8)
+        self.game_over = np.zeros(count, dtype=bool)
+        self.exploded = np.zeros(count, dtype=bool)
+        self.clicks = np.zeros(count, dtype=np.int64)
+        self._hidden_safe = np.full(count, rows * cols, dtype=np.int64)
+
+    @property
+    def win(self):
+        return self.game_over & ~self.exploded
+
+    def place_mines(self, moves):
+        """
+        为每局放置地雷，moves[k]为第k局第一次点击的(行, 列)，它及其周围的格子不放地雷
+
+        每局每个格子算出一个随机键，排除的格子键为最大值，取键最小的num_mines个格子
+        """
+        count, rows, cols = self.count, self.rows, self.cols
+        cells = np.arange(rows * cols, dtype=np.uint64) + np.uint64(1)
+        keys = _mix(self._game_keys[:, None] ^ (cells * _MIX2)[None, :])
+
+        i = np.arange(rows)[None, :, None]
+        j = np.arange(cols)[None, None, :]
+        excluded = ((np.abs(i - moves[:, 0, None, None]) <= 1)
+                    & (np.abs(j - moves[:, 1, None, None]) <= 1)).reshape(count, -1)
+        keys[excluded] = np.iinfo(np.uint64).max
+
+        num_mines = min(self.num_mines, rows * cols - int(excluded.sum(axis=1).max()))
+        mines = np.zeros((count, rows * cols), dtype=bool)
+        if num_mines:
+            chosen = np.argpartition(keys, num_mines - 1, axis=1)[:, :num_mines]
+            np.put_along_axis(mines, chosen, True, axis=1)
+        self.mines = mines.reshape(count, rows, cols)
+        self.counts = neighbor_count(self.mines).astype(np.int8)
+        self._hidden_safe = np.full(count, rows * cols - num_mines, dtype=np.int64)
+
+    def step(self, moves):
+        """
+        每局点击一个格子
+
+        参数:
+        moves -- (K, 2)的整数数组，每局点击的(行, 列)；已结束的局和(-1, -1)不点击
+        """
+        moves = np.asarray(moves)
+        if self.mines is None:
+            self.place_mines(moves)
+
+        games = np.arange(self.count)
+        active = ~self.game_over & (moves[:, 0] >= 0)
+        i = np.where(active, moves[:, 0], 0)
+        j = np.where(active, moves[:, 1], 0)
+        active &= self.boards[games, i, j] == UNKNOWN
+        self.clicks += active
+
+        hit = active & self.mines[games, i, j]
+        self.exploded |= hit
+        active &= ~hit
+
+        clicked = np.zeros(self.boards.shape, dtype=bool)
+        clicked[games[active], i[active], j[active]] = True
+        cascading = active & (self.counts[games, i, j] == 0)
+        if cascading.any():
+            clicked[cascading] |= self._zero_regions(clicked[cascading], cascading)
+
+        new = clicked & (self.boards == UNKNOWN)
+        self.boards[new] = self.counts[new]
+        self._hidden_safe -= new.sum(axis=(1, 2))
+        self.game_over |= hit | (self._hidden_safe == 0)
+
+    def _zero_regions(self, start, games):
+        """
+        从start中的0格子逐圈扩张到相连的所有0，返回这些0区域及其周围一圈
+
+        start为games选出的那些局的点击位置，这些局同时扩张，其余的局不参与计算
+        """
+        zeros = (self.counts[games] == 0) & ~self.mines[games] & (self.boards[games] == UNKNOWN)
+        region = start
+        while True:
+            grown = adjacent(region) & zeros & ~region
+            if not grown.any():
+                break
+            region |= grown
+        return region | adjacent(region)
+
+    def run(self, solver=get_safe_moves_batch, max_steps=None):
+        """
+        用批量求解器把所有对局玩到结束
+
+        参数:
+        solver -- 接受(K, H, W)棋盘、返回(safe, moves)的函数，与get_safe_moves_batch相同
+        max_steps -- 最多走的步数，默认为格子总数（每步至少揭示一个格子）
+
+        返回:
+        np.ndarray -- (K,)的布尔数组，每局是否获胜
+        """
+        if max_steps is None:
+            max_steps = self.rows * self.cols
+        moves = np.full((self.count, 2), -1, dtype=np.int64)
+        for _ in range(max_steps):
+            playing = ~self.game_over
+            if not playing.any():
+                break
+            # 只把还没结束的局交给求解器，越往后剩下的局越少
+            moves[:] = -1
+            moves[playing] = solver(self.boards[playing])[1]
+            self.step(moves)
+        return self.win
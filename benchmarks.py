@@ -0,0 +1,520 @@
+"""
+求解器性能基准测试
+
+用法:
+    python benchmarks.py bitboard [--games 200] [--seed 42]
+    python benchmarks.py batch [--boards 2000] [--seed 42]
+    python benchmarks.py linear [--games 100] [--seed 42]
+    python benchmarks.py simulator [--games 3000] [--seed 42]
+    python benchmarks.py engine [--games 5000] [--seed 42]
+    python benchmarks.py replay [--path replays]
+    python benchmarks.py suite [--baseline benchmark_baseline.json] [--threshold 0.25] [--repeats 9] [--save]
+    python benchmarks.py engines [--engines minesweeper bitboard] [--games 200] [--seed 42]
+"""
+import argparse
+import importlib
+import json
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+
+from batch_engine import BatchGames
+from board_codec import UNKNOWN, array_to_tiles, tiles_to_array
+from boardresolver import get_safe_move
+from frontier_solver import build_constraints, solve_frontier
+from linear_solver import linear_deductions
+from MineSweeper import MinesweeperSolver, get_safe_moves, get_safe_moves_batch
+from minesweeper_demo import MinesweeperGame
+from rules_kernel import adjacent, analyze_rules, neighbor_count, pair_subset_mines
+from reference_solvers import SetBoardSolver
+from replay_corpus import ReplayCorpus
+from simulator import SimulatedGame
+from solver_registry import available_solvers
+from tournament import run_tournament
+
+# 文件名带连字符，只能通过importlib导入
+minesweeper_request = importlib.import_module("minesweeper-request")
+
+
+def play_games(solver, games, seed, size=10, num_mines=10):
+    """
+    用solver玩若干局完整游戏，只统计求解器本身(update_board + get_next_move)的耗时
+
+    返回(求解器总耗时秒数, 总步数, 胜局数)
+    """
+    elapsed = 0.0
+    moves = 0
+    wins = 0
+    for game_index in range(games):
+        random.seed(seed + game_index)
+        game = MinesweeperGame(size=size, num_mines=num_mines)
+        solver.reset_board()
+        while not game.game_over:
+            tiles = game.get_board_for_solver()
+            start = time.perf_counter()
+            solver.update_board(tiles)
+            x, y = solver.get_next_move()
+            elapsed += time.perf_counter() - start
+            moves += 1
+            # 求解器使用(x, y) = (列, 行)，演示游戏使用(行, 列)
+            game.click(y, x)
+        wins += game.win
+    return elapsed, moves, wins
+
+
+def bench_bitboard(games, seed):
+    """对比位棋盘求解器与原集合实现在完整游戏中的每步耗时"""
+    results = {}
+    for name, solver in (("set", SetBoardSolver()),
+                         ("bitboard", minesweeper_request.MinesweeperSolver())):
+        elapsed, moves, wins = play_games(solver, games, seed)
+        results[name] = elapsed / moves
+        print(f"{name:>9}: {games}局 {moves}步 胜{wins}局, "
+              f"求解器耗时 {elapsed * 1000:.1f} ms, 每步 {elapsed / moves * 1e6:.1f} 微秒")
+    print(f"加速比: {results['set'] / results['bitboard']:.1f}x")
+    return results
+
+
+def random_positions(count, seed, size=10, num_mines=10):
+    """
+    随机生成count个部分揭示的int8棋盘，形状为(count, size, size)
+
+    每个棋盘随机放置地雷，再随机揭示一部分非地雷格子
+    """
+    rng = np.random.default_rng(seed)
+    cells = size * size
+    order = rng.random((count, cells)).argsort(axis=1)
+    mines = np.zeros((count, cells), dtype=bool)
+    np.put_along_axis(mines, order[:, :num_mines], True, axis=1)
+    mines = mines.reshape(count, size, size)
+    numbers = neighbor_count(mines)
+    revealed = (rng.random((count, size, size)) < rng.random((count, 1, 1)) * 0.7) & ~mines
+    return np.where(revealed, numbers, UNKNOWN).astype(np.int8)
+
+
+def bench_batch(count, seed):
+    """对比get_safe_moves逐个棋盘调用与get_safe_moves_batch整批调用的吞吐量"""
+    boards = random_positions(count, seed)
+    tiles = [array_to_tiles(board) for board in boards]
+
+    start = time.perf_counter()
+    for board in tiles:
+        get_safe_moves(board)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    get_safe_moves_batch(boards)
+    batch = time.perf_counter() - start
+
+    print(f"get_safe_moves      : {count}个棋盘 {single * 1000:.1f} ms, {count / single:,.0f} 棋盘/秒")
+    print(f"get_safe_moves_batch: {count}个棋盘 {batch * 1000:.1f} ms, {count / batch:,.0f} 棋盘/秒")
+    print(f"加速比: {single / batch:.1f}x")
+    return count / single, count / batch
+
+
+def game_positions(games, seed, size=10, num_mines=10):
+    """用MinesweeperSolver玩若干局演示游戏，返回第一步之后每一步点击前的int8棋盘"""
+    positions = []
+    solver = MinesweeperSolver()
+    for game_index in range(games):
+        random.seed(seed + game_index)
+        game = MinesweeperGame(size=size, num_mines=num_mines)
+        game.click(size // 2, size // 2)
+        while not game.game_over:
+            board = tiles_to_array(game.get_board_for_solver())
+            positions.append(board)
+            game.click(*solver.solve_step(board))
+    return positions
+
+
+def bench_linear(games, seed):
+    """
+    在真实对局的局面上对比相邻数字对规则与线性推理：各自仍需要猜测的局面数，以及每次调用的耗时
+
+    "需要猜测"指棋盘上还有未知格子，但规则推不出任何确定安全的格子；另外统计推出的确定格子
+    （安全格子和地雷）总数。前沿枚举给出的是所有规则能达到的上限
+    """
+    boards = game_positions(games, seed)
+    guesses = {"pairs": 0, "linear": 0, "exact": 0}
+    decided = {"pairs": 0, "linear": 0, "exact": 0}
+    elapsed = {"pairs": 0.0, "linear": 0.0}
+    for board in boards:
+        start = time.perf_counter()
+        rules = analyze_rules(board)
+        mines = rules.mine_mask | pair_subset_mines(board)
+        rules = analyze_rules(board, known_mines=mines)
+        safe = (rules.safe_mask | rules.zero_safe_mask) & ~mines
+        elapsed["pairs"] += time.perf_counter() - start
+        guesses["pairs"] += not safe.any()
+        decided["pairs"] += int(safe.sum() + (mines & rules.unknown).sum())
+
+        start = time.perf_counter()
+        rows, cols = board.shape
+        safe, mines = linear_deductions(build_constraints(board.ravel().tolist(), rows, cols))
+        elapsed["linear"] += time.perf_counter() - start
+        guesses["linear"] += not safe
+        decided["linear"] += len(safe) + len(mines)
+
+        result = solve_frontier(board)
+        guesses["exact"] += not result.safe
+        decided["exact"] += len(result.safe) + len(result.mines)
+
+    total = len(boards)
+    for name in ("pairs", "linear"):
+        print(f"{name:>6}: 需要猜测 {guesses[name]}/{total} 个局面, 确定格子 {decided[name]} 个, "
+              f"每次调用 {elapsed[name] / total * 1e6:.1f} 微秒")
+    print(f"{'exact':>6}: 需要猜测 {guesses['exact']}/{total} 个局面, 确定格子 {decided['exact']} 个（前沿枚举）")
+    print(f"线性推理比相邻数字对规则少猜测 {guesses['pairs'] - guesses['linear']} 次")
+    return guesses, elapsed
+
+
+def click_games(make_game, games, seed, size=10):
+    """
+    每局按随机顺序点击格子直到游戏结束（第一下点中间），只统计click本身的耗时
+
+    make_game(game_index)返回新的一局，click使用与SimulatedGame相同的(x, y)参数
+    返回(总耗时秒数, 总点击数)
+    """
+    elapsed = 0.0
+    clicks = 0
+    for game_index in range(games):
+        game = make_game(game_index)
+        order = [(x, y) for x in range(size) for y in range(size)]
+        random.Random(seed + game_index).shuffle(order)
+        order.insert(0, (size // 2, size // 2))
+        for x, y in order:
+            if game.game_over:
+                break
+            start = time.perf_counter()
+            game.click(x, y)
+            elapsed += time.perf_counter() - start
+            clicks += 1
+    return elapsed, clicks
+
+
+def bench_simulator(games, seed):
+    """
+    对比SimulatedGame与minesweeper_demo.MinesweeperGame的点击吞吐量
+
+    MinesweeperGame点到0时只揭示一个格子，SimulatedGame会像服务器一样揭示整个0区域，
+    所以同样的点击顺序下SimulatedGame的局面推进得更快
+    """
+    def demo_game(game_index):
+        random.seed(seed + game_index)
+        game = MinesweeperGame()
+        click = game.click
+        # 演示游戏的click参数为(行, 列)
+        game.click = lambda x, y: click(y, x)
+        return game
+
+    results = {}
+    for name, make_game in (("demo", demo_game),
+                            ("simulator", lambda game_index: SimulatedGame(seed=seed + game_index))):
+        elapsed, clicks = click_games(make_game, games, seed)
+        results[name] = clicks / elapsed
+        print(f"{name:>9}: {games}局 {clicks}次点击 {elapsed * 1000:.1f} ms, {clicks / elapsed:,.0f} 次点击/秒")
+    return results
+
+
+def bench_engine(games, seed):
+    """
+    对比逐局循环（SimulatedGame + 单个棋盘调用get_safe_moves_batch）与BatchGames整批推进的对局吞吐量
+
+    两边使用同一个求解器，只是对局的组织方式不同；逐局循环只跑games的十分之一，按局数折算
+    """
+    serial_games = max(games // 10, 1)
+    start = time.perf_counter()
+    serial_wins = 0
+    for game_index in range(serial_games):
+        game = SimulatedGame(seed=seed + game_index)
+        while not game.game_over:
+            _, moves = get_safe_moves_batch(game.board[None])
+            i, j = moves[0]
+            game.click(j, i)
+        serial_wins += game.win
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine = BatchGames(games, seed=seed)
+    wins = engine.run()
+    batch = time.perf_counter() - start
+
+    print(f"逐局循环 : {serial_games}局 胜率 {serial_wins / serial_games:.1%}, "
+          f"{serial * 1000:.1f} ms, {serial_games / serial:,.0f} 局/秒")
+    print(f"BatchGames: {games}局 胜率 {wins.mean():.1%}, {batch * 1000:.1f} ms, "
+          f"{games / batch:,.0f} 局/秒, {engine.clicks.sum() / batch:,.0f} 次点击/秒")
+    print(f"加速比: {(games / batch) / (serial_games / serial):.1f}x")
+    return serial_games / serial, games / batch
+
+
+def bench_replay(path, batch_size=1024):
+    """
+    用回放语料库中的真实局面测试get_safe_moves_batch：吞吐量，以及有多少局面能找到确定安全的格子
+
+    语料库按批次从内存映射中读取，不会一次读进内存
+    """
+    corpus = ReplayCorpus(path)
+    if not len(corpus):
+        print(f"语料库 {path} 为空")
+        return None
+    elapsed = 0.0
+    decided = 0
+    for _, boards in corpus.batches(batch_size):
+        start = time.perf_counter()
+        safe, _ = get_safe_moves_batch(boards)
+        elapsed += time.perf_counter() - start
+        decided += int(safe.any(axis=(1, 2)).sum())
+    total = len(corpus)
+    games = len(np.unique(corpus.index["game"]))
+    print(f"{games}局 {total}个局面, 有确定安全格子的局面 {decided}/{total}, "
+          f"{elapsed * 1000:.1f} ms, {total / elapsed:,.0f} 棋盘/秒")
+    return total / elapsed
+
+
+def board_sets(per_set=40, seed=42):
+    """
+    为基准测试套件生成固定的棋盘集合（同一个种子每次结果相同）
+
+    用MinesweeperSolver玩SimulatedGame对局，按阶段挑选局面:
+    opening -- 第一下点击之后的局面
+    midgame -- 揭示了35%-65%安全格子的局面
+    dense_frontier -- 20个地雷的对局中前沿（与数字相邻的未知格子）最大的局面
+    near_endgame -- 只剩5个以内安全格子没有揭示的局面
+
+    返回:
+    dict -- 集合名 -> int8棋盘列表
+    """
+    sets = {"opening": [], "midgame": [], "dense_frontier": [], "near_endgame": []}
+    game_index = 0
+    while any(len(boards) < per_set for boards in sets.values()):
+        dense = game_index % 2 == 1
+        num_mines = 20 if dense else 10
+        game = SimulatedGame(num_mines=num_mines, seed=seed + game_index)
+        game_index += 1
+        solver = MinesweeperSolver()
+        game.click(5, 5)
+        positions = []
+        while not game.game_over:
+            board = game.board.copy()
+            positions.append(board)
+            i, j = solver.solve_step(board)
+            game.click(j, i)
+
+        if not positions:
+            continue
+        if dense:
+            frontier = [int((adjacent(board >= 0) & (board == UNKNOWN)).sum()) for board in positions]
+            sets["dense_frontier"].append(positions[int(np.argmax(frontier))])
+            continue
+        sets["opening"].append(positions[0])
+        safe_cells = game.rows * game.cols - num_mines
+        hidden_safe = [int((board == UNKNOWN).sum()) - num_mines for board in positions]
+        midgame = [board for board, hidden in zip(positions, hidden_safe) if 0.35 <= 1 - hidden / safe_cells <= 0.65]
+        endgame = [board for board, hidden in zip(positions, hidden_safe) if hidden <= 5]
+        if midgame:
+            sets["midgame"].append(midgame[0])
+        if endgame:
+            sets["near_endgame"].append(endgame[0])
+    return {name: boards[:per_set] for name, boards in sets.items()}
+
+
+# 与基线的差别小于这个微秒数时不算回退：几微秒的路径上25%只是计时器和调度的噪声
+NOISE_FLOOR_US = 2.0
+
+
+def _calibrate():
+    """
+    与求解器无关的固定工作量（纯Python循环和numpy排序）的微秒数，衡量这台机器此刻的速度。
+    整台机器变慢时它和各路径一起变慢，按它的比例缩放基线，求解器本身的回退不会影响它
+    """
+    values = np.random.default_rng(0).random(20000)
+    start = time.perf_counter()
+    total = 0
+    for i in range(20000):
+        total += i * i
+    np.sort(values)
+    return (time.perf_counter() - start) * 1e6
+
+
+def _time_calls(setup, call, boards):
+    """对每个棋盘先执行setup(board)（不计时），再计时call(state)，返回一轮中每次调用的平均微秒数"""
+    elapsed = 0.0
+    for board in boards:
+        state = setup(board)
+        start = time.perf_counter()
+        call(state)
+        elapsed += time.perf_counter() - start
+    return elapsed / len(boards) * 1e6
+
+
+def _loaded_solver(board):
+    solver = MinesweeperSolver()
+    solver.update_board(board)
+    return solver
+
+
+def _loaded_bitboard(board):
+    solver = minesweeper_request.MinesweeperSolver()
+    solver.update_board(array_to_tiles(board))
+    return solver
+
+
+# 套件中的热点路径：名称 -> (setup, call)。setup的结果传给call，只有call计时
+SUITE_PATHS = {
+    "boardresolver.get_safe_move": (array_to_tiles, get_safe_move),
+    "MinesweeperSolver.update_board": (lambda board: (MinesweeperSolver(), board),
+                                       lambda state: state[0].update_board(state[1])),
+    "MinesweeperSolver.calculate_probabilities": (_loaded_solver, lambda solver: solver.calculate_probabilities()),
+    "MinesweeperSolver.get_safe_coordinates": (lambda board: (MinesweeperSolver(), board),
+                                               lambda state: state[0].get_safe_coordinates(state[1])),
+    "bitboard.analyze_board": (_loaded_bitboard, lambda solver: solver.analyze_board()),
+    "bitboard.get_next_move": (_loaded_bitboard, lambda solver: solver.get_next_move()),
+}
+
+
+def run_suite(per_set=40, seed=42, repeats=9):
+    """
+    运行基准测试套件，返回({"集合/路径": 每次调用的微秒数}, 校准工作量的微秒数)
+
+    每一轮依次测量所有路径，共repeats轮，轮次交错进行。每次测量路径之前先测一次校准工作量，
+    按两者之比（路径相对于机器此刻速度的耗时）取repeats轮的中位数：
+    机器整体变慢时比值不变，一阵短暂的干扰只影响一两轮，也不会改变中位数。
+    返回的微秒数为比值的中位数乘以校准工作量的中位数
+    """
+    sets = board_sets(per_set, seed)
+    ratios = {}
+    calibration = []
+    for _ in range(repeats):
+        for set_name, boards in sets.items():
+            for path, (setup, call) in SUITE_PATHS.items():
+                reference = _calibrate()
+                calibration.append(reference)
+                # 求解器内部用random打破平局，每条路径都从相同的状态开始
+                random.seed(seed)
+                elapsed = _time_calls(setup, call, boards)
+                ratios.setdefault(f"{set_name}/{path}", []).append(elapsed / reference)
+    speed = float(np.median(calibration))
+    return {name: float(np.median(values)) * speed for name, values in ratios.items()}, speed
+
+
+def compare_baseline(results, baseline, threshold, noise_floor=NOISE_FLOOR_US, scale=1.0):
+    """
+    与基线比较，返回变慢超过threshold（相对比例）且超过noise_floor微秒的 [(名称, 基线微秒, 当前微秒)]
+
+    基线中没有的条目不比较。scale为本次与基线的机器速度之比（校准工作量耗时之比），基线先乘以它再比较
+    """
+    regressions = []
+    for name, value in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        reference *= scale
+        if value > reference * (1 + threshold) and value - reference > noise_floor:
+            regressions.append((name, reference, value))
+    return regressions
+
+
+def bench_suite(baseline_path, threshold, save, repeats=9):
+    """运行套件并与JSON基线比较；save为True时把本次结果写为新的基线。有性能回退时返回1"""
+    results, calibration = run_suite(repeats=repeats)
+    try:
+        with open(baseline_path) as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        saved = {}
+    baseline = saved.get("results", {})
+    # 旧的基线没有校准值时不缩放
+    scale = calibration / saved["calibration_us"] if saved.get("calibration_us") else 1.0
+    print(f"机器速度: 校准工作量 {calibration:.0f} 微秒，基线按 {scale:.2f} 倍缩放")
+
+    for name, value in results.items():
+        reference = baseline.get(name)
+        change = f"{value / (reference * scale) - 1:+.0%}" if reference else "无基线"
+        print(f"{name:<58} {value:>9.1f} 微秒  {change}")
+
+    regressions = compare_baseline(results, baseline, threshold, scale=scale)
+    for name, reference, value in regressions:
+        print(f"性能回退: {name} {reference:.1f} -> {value:.1f} 微秒（阈值 {threshold:.0%}）")
+
+    if save:
+        with open(baseline_path, "w") as f:
+            json.dump({"python": platform.python_version(), "numpy": np.__version__,
+                       "machine": platform.machine(), "calibration_us": calibration, "results": results},
+                      f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"基线已写入 {baseline_path}")
+    return 1 if regressions and not save else 0
+
+
+def bench_engines(engines, games, seed):
+    """按注册名称在相同的SimulatedGame对局上比较各引擎的胜率和每步耗时（单进程，耗时互不干扰）"""
+    summaries = run_tournament(engines, games, seed, workers=1)
+    for summary in summaries:
+        latency = summary["latency_us"]
+        print(f"{summary['solver']:>13}: {games}局 胜率 {summary['win_rate']:.1%}, "
+              f"每步 p50 {latency['p50']:.1f} / p95 {latency['p95']:.1f} 微秒")
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="扫雷求解器性能基准测试")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    bitboard_parser = subparsers.add_parser("bitboard", help="位棋盘求解器 vs 原集合实现")
+    bitboard_parser.add_argument("--games", type=int, default=200)
+    bitboard_parser.add_argument("--seed", type=int, default=42)
+
+    batch_parser = subparsers.add_parser("batch", help="get_safe_moves_batch vs 逐个调用get_safe_moves")
+    batch_parser.add_argument("--boards", type=int, default=2000)
+    batch_parser.add_argument("--seed", type=int, default=42)
+
+    linear_parser = subparsers.add_parser("linear", help="线性推理 vs 相邻数字对规则")
+    linear_parser.add_argument("--games", type=int, default=100)
+    linear_parser.add_argument("--seed", type=int, default=42)
+
+    simulator_parser = subparsers.add_parser("simulator", help="SimulatedGame vs 演示游戏的点击吞吐量")
+    simulator_parser.add_argument("--games", type=int, default=3000)
+    simulator_parser.add_argument("--seed", type=int, default=42)
+
+    engine_parser = subparsers.add_parser("engine", help="BatchGames整批推进 vs 逐局循环")
+    engine_parser.add_argument("--games", type=int, default=5000)
+    engine_parser.add_argument("--seed", type=int, default=42)
+
+    replay_parser = subparsers.add_parser("replay", help="在回放语料库的真实局面上运行get_safe_moves_batch")
+    replay_parser.add_argument("--path", default="replays")
+
+    suite_parser = subparsers.add_parser("suite", help="各热点路径在固定棋盘集合上的耗时，与JSON基线比较")
+    suite_parser.add_argument("--baseline", default="benchmark_baseline.json")
+    suite_parser.add_argument("--threshold", type=float, default=0.25, help="超过基线多少比例算作回退")
+    suite_parser.add_argument("--repeats", type=int, default=9, help="轮数，取各路径的中位数")
+    suite_parser.add_argument("--save", action="store_true", help="把本次结果写为新的基线")
+
+    engines_parser = subparsers.add_parser("engines", help="按名称比较solver_registry中的引擎")
+    engines_parser.add_argument("--engines", nargs="+", choices=available_solvers(), default=available_solvers())
+    engines_parser.add_argument("--games", type=int, default=200)
+    engines_parser.add_argument("--seed", type=int, default=42)
+
+    args = parser.parse_args()
+    if args.command == "bitboard":
+        bench_bitboard(args.games, args.seed)
+    elif args.command == "batch":
+        bench_batch(args.boards, args.seed)
+    elif args.command == "linear":
+        bench_linear(args.games, args.seed)
+    elif args.command == "simulator":
+        bench_simulator(args.games, args.seed)
+    elif args.command == "engine":
+        bench_engine(args.games, args.seed)
+    elif args.command == "replay":
+        bench_replay(args.path)
+    elif args.command == "suite":
+        sys.exit(bench_suite(args.baseline, args.threshold, args.save, args.repeats))
+    elif args.command == "engines":
+        bench_engines(args.engines, args.games, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import random
+
+# 按棋盘尺寸缓存的相邻格子掩码
+_neighbor_masks = {}
+
+
+def neighbor_masks(rows, cols):
+    """
+    获取每个格子（扁平索引 y * cols + x）的相邻格子位掩码
+
+    结果按(rows, cols)缓存，同一尺寸的棋盘只生成一次
+    """
+    key = (rows, cols)
+    masks = _neighbor_masks.get(key)
+    if masks is None:
+        masks = []
+        for y in range(rows):
+            for x in range(cols):
+                mask = 0
+                for dy in (-1, 0, 1):
+                    for dx in (-1, 0, 1):
+                        if dx == 0 and dy == 0:
+                            continue
+                        nx, ny = x + dx, y + dy
+                        if 0 <= nx < cols and 0 <= ny < rows:
+                            mask |= 1 << (ny * cols + nx)
+                masks.append(mask)
+        masks = tuple(masks)
+        _neighbor_masks[key] = masks
+    return masks
+
+
+class Bitboard:
+    """
+    扫雷棋盘的位棋盘表示
+
+    每个格子对应整数中的一位（扁平索引 y * cols + x），
+    已揭示、未知、已知地雷、已知安全格子都用整数位掩码表示，
+    "周围未点击格子数 == 数字" 这类规则就变成了掩码按位与和 bit_count
+    """
+
+    def __init__(self, rows=10, cols=10):
+        self.rows = rows
+        self.cols = cols
+        self.full = (1 << (rows * cols)) - 1
+        self.neighbors = neighbor_masks(rows, cols)
+
+        # 用于膨胀运算：去掉最左列/最右列，防止移位时跨行
+        left_col = 0
+        for y in range(rows):
+            left_col |= 1 << (y * cols)
+        self._not_left = self.full & ~left_col
+        self._not_right = self.full & ~(left_col << (cols - 1))
+
+        self.reset()
+
+    def reset(self):
+        """清空棋盘"""
+        self.numbers = [0] * (self.rows * self.cols)  # 已揭示格子的数字
+        self.revealed = 0    # 已揭示（已点击）的格子
+        self.unknown = self.full  # 未揭示的格子
+        self.zeros = 0       # 数字为0的格子
+        self.positive = 0    # 数字大于0的格子
+        self.mines = 0       # 已知地雷
+        self.safe = 0        # 已知安全
+
+    def load(self, tiles):
+        """
+        根据API返回的tiles（tiles[y][x]，None表示未知）更新棋盘
+
+        只处理新揭示的格子，返回新揭示格子的掩码
+        """
+        numbers = self.numbers
+        revealed = self.revealed
+        new = 0
+        idx = 0
+        for row in tiles:
+            for value in row:
+                if value is not None and not (revealed >> idx) & 1:
+                    bit = 1 << idx
+                    new |= bit
+                    numbers[idx] = value
+                    if value == 0:
+                        self.zeros |= bit
+                    elif value > 0:
+                        self.positive |= bit
+                idx += 1
+        self.revealed = revealed | new
+        self.unknown = self.full & ~self.revealed
+        return new
+
+    def dilate(self, mask):
+        """返回掩码中所有格子的8邻域（包含格子本身）"""
+        cols = self.cols
+        horizontal = mask | ((mask << 1) & self._not_left) | ((mask >> 1) & self._not_right)
+        return (horizontal | (horizontal << cols) | (horizontal >> cols)) & self.full
+
+    def value(self, x, y):
+        """获取(x, y)的显示值，未揭示返回None"""
+        idx = y * self.cols + x
+        if not (self.revealed >> idx) & 1:
+            return None
+        return self.numbers[idx]
+
+    def coords(self, idx):
+        """扁平索引转换为(x, y)坐标"""
+        y, x = divmod(idx, self.cols)
+        return x, y
+
+
+def lowest_index(mask):
+    """返回掩码中最低位格子的索引"""
+    return (mask & -mask).bit_length() - 1
+
+
+def random_index(mask, rng=random):
+    """从掩码中随机选择一个格子，返回其索引"""
+    k = rng.randrange(mask.bit_count())
+    while k:
+        mask &= mask - 1
+        k -= 1
+    return lowest_index(mask)
@@ -0,0 +1,42 @@
+import numpy as np
+
+# int8棋盘中的哨兵值，0-8为周围地雷数量
+UNKNOWN = -1  # 未揭示的格子（服务器返回null）
+MINE = -2     # 已知是地雷的格子
+
+
+def tiles_to_array(tiles):
+    """
+    把服务器返回的tiles（null/数字的二维列表）转换为int8棋盘
+
+    参数:
+    tiles -- 二维列表或numpy数组，None表示未知格子，数字表示周围地雷数量，负数表示地雷
+
+    返回:
+    np.ndarray -- dtype为int8的二维数组，未知格子为UNKNOWN，地雷为MINE。
+                  已经是int8数组的输入原样返回，不会复制
+    """
+    if isinstance(tiles, np.ndarray):
+        if tiles.dtype == np.int8:
+            return tiles
+        tiles = tiles.tolist()
+
+    rows = len(tiles)
+    cols = len(tiles[0]) if rows else 0
+    flat = np.fromiter(
+        [UNKNOWN if value is None else (MINE if value < 0 else value)
+         for row in tiles for value in row],
+        dtype=np.int8,
+        count=rows * cols,
+    )
+    return flat.reshape(rows, cols)
+
+
+def empty_board(rows, cols):
+    """创建全部未知的int8棋盘"""
+    return np.full((rows, cols), UNKNOWN, dtype=np.int8)
+
+
+def array_to_tiles(board):
+    """把int8棋盘转换回服务器格式的tiles（未知和地雷格子为None）"""
+    return [[None if value < 0 else value for value in row] for row in board.tolist()]
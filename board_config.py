@@ -0,0 +1,42 @@
+from collections import namedtuple
+
+# 棋盘配置：行数、列数、地雷总数（mines未知时为None）
+BoardConfig = namedtuple("BoardConfig", ["rows", "cols", "mines"])
+
+# start_game可以使用的难度，以及模拟器、模拟服务器、锦标赛和开局库使用的配置。
+# 这些是经典扫雷的尺寸和地雷数，服务器实际的地雷数没有核实过，所以不用来推断真实对局的地雷总数
+DIFFICULTIES = {
+    "Easy": BoardConfig(10, 10, 10),
+    "Medium": BoardConfig(16, 16, 40),
+    "Hard": BoardConfig(16, 30, 99),
+}
+
+# 服务器响应中可能表示地雷总数的字段
+_MINE_FIELDS = ("mines", "numMines", "mineCount", "totalMines")
+
+
+def config_for(difficulty):
+    """按难度名称（不区分大小写）返回BoardConfig，未知的难度抛出ValueError"""
+    for name, config in DIFFICULTIES.items():
+        if name.lower() == str(difficulty).lower():
+            return config
+    raise ValueError(f"未知的难度: {difficulty}")
+
+
+def config_from_state(state):
+    """
+    根据服务器返回的_minesweeper字段（或SimulatedGame.state()）确定棋盘配置
+
+    行数和列数取自tiles；地雷总数只在响应中带有地雷数字段时给出，否则为None。
+    求解器把地雷总数当作确切的值（可以据此确定内部格子），所以不用DIFFICULTIES中未核实的地雷数猜测
+
+    参数:
+    state -- 包含"tiles"的字典
+    """
+    tiles = state["tiles"]
+    rows = len(tiles)
+    cols = len(tiles[0]) if rows else 0
+    for field in _MINE_FIELDS:
+        if isinstance(state.get(field), int):
+            return BoardConfig(rows, cols, state[field])
+    return BoardConfig(rows, cols, None)
@@ -1,109 +1,60 @@
 import numpy as np
 import random
+from board_codec import UNKNOWN, tiles_to_array
+from frontier_solver import solve_frontier
+from rules_kernel import analyze_rules, adjacent, neighbor_sum
 
-def get_safe_move(board):
+def get_safe_move(board, total_mines=None):
     """
-    简化版扫雷解析器，接收一个10*10的二维棋盘数据，返回一个安全的坐标点
+    简化版扫雷解析器，接收任意尺寸的二维棋盘数据，返回一个安全的坐标点
     
     参数:
-    board -- 10*10的二维数组，表示当前棋盘状态
-             None表示未知格子，数字表示周围地雷数量
+    board -- 二维数组（行数和列数由棋盘本身决定），表示当前棋盘状态
+             None表示未知格子，数字表示周围地雷数量；也可以直接传入tiles_to_array得到的int8数组
+    total_mines -- 可选的整局地雷总数。给出时改用frontier_solver.solve_frontier的精确概率：
+                   每种前沿布局按C(内部格子数, 剩余地雷数)加权，内部格子也得到精确概率
     
     返回:
     tuple -- 安全坐标点(x, y)，如果找不到安全点则返回None
     """
-    board_size = 10
-    board = np.array(board)
-    potential_mines = set()
+    board = tiles_to_array(board)
+    rows, cols = board.shape
+    unknown = board == UNKNOWN
     
     # 第一步：检查是否是初始棋盘
-    if np.all(board == None):
-        return (board_size // 2, board_size // 2)  # 返回中心位置
+    if np.all(unknown):
+        return (rows // 2, cols // 2)  # 返回中心位置
 
     # 第三步：分析数字格子，找出可能的地雷和安全格子
-    probability_map = np.zeros((board_size, board_size))
+    probability_map, mine_mask, near_numbers = _estimate(board, total_mines)
     
-    for i in range(board_size):
-        for j in range(board_size):
-            if isinstance(board[i, j], (int, float)) and board[i, j] > 0:
-                # 获取周围的未知格子
-                unknown_cells = []
-                for ni, nj in _get_neighbors(i, j, board_size):
-                    if board[ni, nj] is None:
-                        unknown_cells.append((ni, nj))
-                
-                # 如果周围有未知格子，更新它们的概率
-                if unknown_cells:
-                    # 数字表示周围地雷数量
-                    mine_probability = board[i, j] / len(unknown_cells)
-                    for ni, nj in unknown_cells:
-                        probability_map[ni, nj] += mine_probability
-                    
-                    # 如果数字等于周围未知格子数量，所有未知格子都是地雷
-                    if board[i, j] == len(unknown_cells):
-                        for ni, nj in unknown_cells:
-                            potential_mines.add((ni, nj))
+    # 排除确定是地雷的格子
+    candidates = unknown & ~mine_mask
     
-    # 第四步：找到概率为0的格子
-    for i in range(board_size):
-        for j in range(board_size):
-            if (board[i, j] is None and 
-                (i, j) not in potential_mines and
-                probability_map[i, j] == 0):
-                # 找到一个靠近已知数字的概率为0的格子
-                for ni, nj in _get_neighbors(i, j, board_size):
-                    if isinstance(board[ni, nj], (int, float)) and board[ni, nj] >= 0:
-                        return (i, j)
-    
-    # 第五步：找到概率最低的格子
-    min_prob = float('inf')
-    best_move = None
-    
-    for i in range(board_size):
-        for j in range(board_size):
-            if board[i, j] is None and (i, j) not in potential_mines:
-                # 优先选择靠近已知数字的格子
-                has_number_neighbor = False
-                for ni, nj in _get_neighbors(i, j, board_size):
-                    if isinstance(board[ni, nj], (int, float)) and board[ni, nj] >= 0:
-                        has_number_neighbor = True
-                        break
-                
-                current_prob = probability_map[i, j]
-                if has_number_neighbor and current_prob < min_prob:
-                    min_prob = current_prob
-                    best_move = (i, j)
+    # 第四步：找到一个靠近已知数字的概率为0的格子
+    zero_prob = candidates & near_numbers & (probability_map == 0)
+    if zero_prob.any():
+        return tuple(np.argwhere(zero_prob)[0].tolist())
     
+    # 第五步：找到靠近已知数字且概率最低的格子（知道地雷总数时所有格子的估计可以直接比较）
+    best_move = _lowest_probability(probability_map, candidates if total_mines is not None else candidates & near_numbers)
     if best_move:
         return best_move
     
     # 第六步：如果还没找到，选择任何概率最低的格子
-    min_prob = float('inf')
-    best_move = None
-    
-    for i in range(board_size):
-        for j in range(board_size):
-            if board[i, j] is None and (i, j) not in potential_mines:
-                current_prob = probability_map[i, j]
-                if current_prob < min_prob:
-                    min_prob = current_prob
-                    best_move = (i, j)
-    
+    best_move = _lowest_probability(probability_map, candidates)
     if best_move:
         return best_move
     
     # 第七步：如果所有未知格子都可能是地雷，随机选择一个未知格子
-    unknown_positions = [(i, j) for i in range(board_size) 
-                      for j in range(board_size) 
-                      if board[i, j] is None]
+    unknown_positions = [tuple(cell) for cell in np.argwhere(unknown).tolist()]
     
     if unknown_positions:
         # 优先选择角落和边缘
-        corner_and_edges = []
-        for i, j in unknown_positions:
-            neighbor_count = len(_get_neighbors(i, j, board_size))
-            if neighbor_count < 8:  # 不是完全被包围的格子
-                corner_and_edges.append((i, j))
+        edge = np.zeros(board.shape, dtype=bool)
+        edge[[0, -1], :] = True
+        edge[:, [0, -1]] = True
+        corner_and_edges = [tuple(cell) for cell in np.argwhere(unknown & edge).tolist()]
         
         if corner_and_edges:
             return random.choice(corner_and_edges)
@@ -113,17 +64,45 @@ def get_safe_move(board):
     # 如果没有未知格子，返回None
     return None
 
-def _get_neighbors(i, j, board_size):
-    """获取一个格子周围的8个相邻格子的坐标"""
-    neighbors = []
-    for di in [-1, 0, 1]:
-        for dj in [-1, 0, 1]:
-            if di == 0 and dj == 0:
-                continue
-            ni, nj = i + di, j + dj
-            if 0 <= ni < board_size and 0 <= nj < board_size:
-                neighbors.append((ni, nj))
-    return neighbors
+def estimate_probabilities(board, total_mines=None):
+    """
+    get_safe_move使用的地雷概率：给出total_mines时是精确概率，否则是启发式估计（超过1的估计值按1计）
+
+    参数与get_safe_move相同；返回与棋盘形状相同的浮点数组，已揭示的格子为0
+    """
+    probability_map, _, _ = _estimate(tiles_to_array(board), total_mines)
+    return np.minimum(probability_map, 1.0)
+
+def _estimate(board, total_mines):
+    """
+    给出total_mines时使用solve_frontier按地雷总数加权的精确概率；
+    否则每个数字把 数字/周围未知格子数 累加到它周围的未知格子上，这只是启发式估计，不是概率，
+    内部格子没有信息，估计为0
+
+    返回(概率, 确定是地雷的格子, 靠近数字的格子)
+    """
+    unknown = board == UNKNOWN
+    near_numbers = adjacent(board >= 0)
+    if total_mines is not None:
+        result = solve_frontier(board, total_mines=total_mines)
+        mine_mask = np.zeros(board.shape, dtype=bool)
+        for cell in result.mines:
+            mine_mask[cell] = True
+        return np.where(unknown, result.probabilities, 0.0), mine_mask, near_numbers
+
+    rules = analyze_rules(board)
+    numbers = board > 0
+    mine_share = np.zeros(board.shape)
+    np.divide(board, rules.unknown_count, out=mine_share, where=numbers & (rules.unknown_count > 0))
+    probability_map = np.where(unknown, neighbor_sum(mine_share), 0.0)
+    return probability_map, rules.mine_mask, near_numbers
+
+def _lowest_probability(probability_map, mask):
+    """返回mask中概率最低的格子（行优先顺序的第一个），mask为空时返回None"""
+    if not mask.any():
+        return None
+    masked = np.where(mask, probability_map, np.inf)
+    return tuple(int(k) for k in np.unravel_index(np.argmin(masked), masked.shape))
 
 # 使用示例
 if __name__ == "__main__":
@@ -0,0 +1,137 @@
+from frontier_solver import cell_constraint
+
+
+class ConstraintStore:
+    """
+    按格子索引的约束集合，供MinesweeperSolver在多次update_board之间保存约束
+
+    每个数字格子保存一个约束(剩余地雷数, 未知邻居索引元组)，refresh时传入的已知地雷已经扣除。
+    另外维护 未知格子 -> 覆盖它的数字格子 的索引，找出与某个约束重叠的所有约束只需要
+    查几次字典，不用扫描棋盘或者为每对数字重新生成邻居列表和集合
+    """
+
+    def __init__(self):
+        self._constraints = {}  # 数字格子 -> (剩余地雷数, 未知邻居索引元组)
+        self._cell_sets = {}  # 数字格子 -> 未知邻居集合
+        self._by_cell = {}  # 未知格子 -> 覆盖它的数字格子集合
+
+    def __len__(self):
+        return len(self._constraints)
+
+    def __contains__(self, idx):
+        return idx in self._constraints
+
+    def get(self, idx):
+        """返回数字格子的约束，没有约束时返回None"""
+        return self._constraints.get(idx)
+
+    def numbers(self):
+        """所有有约束的数字格子"""
+        return self._constraints.keys()
+
+    def values(self):
+        """所有约束，格式与frontier_solver.build_constraints的元素相同"""
+        return self._constraints.values()
+
+    def clear(self):
+        self._constraints.clear()
+        self._cell_sets.clear()
+        self._by_cell.clear()
+
+    def set(self, idx, constraint):
+        """
+        设置数字格子的约束，constraint为None时删除
+
+        返回:
+        bool -- 约束是否发生了变化
+        """
+        old = self._constraints.get(idx)
+        if old == constraint:
+            return False
+        if old is not None:
+            for c in old[1]:
+                covering = self._by_cell[c]
+                covering.discard(idx)
+                if not covering:
+                    del self._by_cell[c]
+        if constraint is None:
+            del self._constraints[idx]
+            del self._cell_sets[idx]
+            return True
+        self._constraints[idx] = constraint
+        self._cell_sets[idx] = set(constraint[1])
+        for c in constraint[1]:
+            if c in self._by_cell:
+                self._by_cell[c].add(idx)
+            else:
+                self._by_cell[c] = {idx}
+        return True
+
+    def refresh(self, cells, values, neighbors, known_mines):
+        """
+        按当前棋盘重新计算cells中数字格子的约束
+
+        返回:
+        set -- 约束发生了变化的数字格子
+        """
+        changed = set()
+        for idx in cells:
+            if self.set(idx, cell_constraint(values, neighbors, idx, known_mines)):
+                changed.add(idx)
+        return changed
+
+    def overlapping(self, idx):
+        """与idx的约束至少共享一个未知格子的其他数字格子"""
+        constraint = self._constraints.get(idx)
+        if constraint is None:
+            return set()
+        result = set()
+        for c in constraint[1]:
+            result |= self._by_cell[c]
+        result.discard(idx)
+        return result
+
+    def deduce(self, numbers):
+        """
+        对numbers中的数字，与所有重叠的约束比较，推出确定安全和确定是地雷的格子
+
+        规则（约束中已扣除已知地雷）:
+        1. 剩余地雷数为0时全部安全，等于未知格子数时全部是地雷
+        2. 差集规则：a、b两个约束，如果 a的剩余地雷数 - b的剩余地雷数 等于 只属于a的格子数，
+           那么只属于a的格子都是地雷，只属于b的格子都安全。b是a的子集时就是子集规则
+           （剩余地雷数相同时只属于a的格子都安全）
+
+        返回:
+        (safe, mines) -- 扁平索引集合
+        """
+        safe = set()
+        mines = set()
+        constraints = self._constraints
+        cell_sets = self._cell_sets
+        numbers = set(numbers)
+        for idx in numbers:
+            constraint = constraints.get(idx)
+            if constraint is None:
+                continue
+            need, own = constraint
+            if need == 0:
+                safe.update(own)
+            elif need == len(own):
+                mines.update(own)
+            own_set = cell_sets[idx]
+            for other in self.overlapping(idx):
+                if other < idx and other in numbers:
+                    # 这一对已经在检查other时比较过
+                    continue
+                other_need = constraints[other][0]
+                other_set = cell_sets[other]
+                only_own = own_set - other_set
+                only_other = other_set - own_set
+                # 两个方向都检查，每对约束只需要比较一次
+                if need - other_need == len(only_own):
+                    mines |= only_own
+                    safe |= only_other
+                elif other_need - need == len(only_other):
+                    mines |= only_other
+                    safe |= only_own
+        return safe, mines
@@ -0,0 +1,164 @@
+import json
+from collections import OrderedDict
+
+from frontier_solver import enumerate_component
+
+# 棋盘的8种对称变换（旋转和翻转）：(是否交换行列, 行方向, 列方向)
+SYMMETRIES = tuple(
+    (swap, si, sj) for swap in (False, True) for si in (1, -1) for sj in (1, -1)
+)
+
+
+def _transformed_codes(coords, swap, si, sj, stride):
+    """对(c, i, j)列表做一种对称变换并平移到(0, 0)，返回{格子: 整数编码}，编码为 行 * stride + 列"""
+    if swap:
+        moved = [(c, si * j, sj * i) for c, i, j in coords]
+    else:
+        moved = [(c, si * i, sj * j) for c, i, j in coords]
+    min_i = min(i for _, i, _ in moved)
+    min_j = min(j for _, _, j in moved)
+    return {c: (i - min_i) * stride + (j - min_j) for c, i, j in moved}
+
+
+def canonical_form(constraints, cols):
+    """
+    把一个前沿分量的约束转换为与位置和朝向无关的规范形式
+
+    把约束中的格子换成(i, j)坐标，分别做8种对称变换并平移到从(0, 0)开始，
+    先按格子集合的编码选出字典序最小的变换（只有形状对称时才需要比较完整的约束），
+    再用选中的变换给出约束的键。约束只包含棋盘内的格子，所以靠墙的分量和
+    不靠墙的分量（边缘上下文）自然得到不同的键
+
+    返回:
+    (key, mapping) -- key为可哈希的约束元组；mapping把分量中的格子索引映射到规范编码
+    """
+    coords = []
+    for c in {c for _, group in constraints for c in group}:
+        i, j = divmod(c, cols)
+        coords.append((c, i, j))
+    # 编码的行宽取外接矩形较长的一边，对任何变换都相同
+    stride = max(max(i for _, i, _ in coords) - min(i for _, i, _ in coords),
+                 max(j for _, _, j in coords) - min(j for _, _, j in coords)) + 1
+
+    best_cells = None
+    candidates = []
+    for swap, si, sj in SYMMETRIES:
+        mapping = _transformed_codes(coords, swap, si, sj, stride)
+        cells = sorted(mapping.values())
+        if best_cells is None or cells < best_cells:
+            best_cells, candidates = cells, [mapping]
+        elif cells == best_cells:
+            candidates.append(mapping)
+
+    best_key = None
+    best_mapping = None
+    for mapping in candidates:
+        key = tuple(sorted(
+            (value, tuple(sorted([mapping[c] for c in group]))) for value, group in constraints
+        ))
+        if best_key is None or key < best_key:
+            best_key, best_mapping = key, mapping
+    return best_key, best_mapping
+
+
+class FrontierCache:
+    """
+    前沿分量枚举结果的缓存，在同一局内和不同局之间复用
+
+    同样的局部形状（墙边的1-2-1、角落的1等）反复出现，规范化之后只需要枚举一次。
+    缓存按规范形式保存(布局总数, 每个规范格子是地雷的次数)，安全格子和地雷格子
+    就是次数为0和次数等于布局总数的格子。超过maxsize时淘汰最久没有使用的条目。
+
+    规范化本身要做8次变换，对只有几个格子的分量比直接枚举还慢，
+    所以少于min_variables个格子的分量直接枚举，不经过缓存
+    """
+
+    def __init__(self, maxsize=4096, min_variables=10):
+        self.maxsize = maxsize
+        self.min_variables = min_variables
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # 规范形式 -> (布局总数, 按规范编码排序的地雷次数)
+        self._exact = OrderedDict()  # (列数, 原始约束) -> (布局总数, {格子: 地雷次数}, 规范形式)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def solve(self, variables, constraints, cols):
+        """
+        与frontier_solver.enumerate_component相同，返回(布局总数, 每个变量是地雷的次数列表)，
+        但先查缓存，未命中时枚举并写入缓存
+        """
+        if len(variables) < self.min_variables:
+            return enumerate_component(variables, constraints)
+
+        # 同一局相邻两步之间大部分分量完全不变，先按原始约束查找，省去规范化
+        exact_key = (cols, frozenset(constraints))
+        exact = self._exact.get(exact_key)
+        if exact is not None:
+            self.hits += 1
+            total, by_variable, key = exact
+            self._exact.move_to_end(exact_key)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            return total, [by_variable[v] for v in variables]
+
+        key, mapping = canonical_form(constraints, cols)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            total, counts = entry
+            order = {cell: k for k, cell in enumerate(sorted(mapping.values()))}
+            variable_counts = [counts[order[mapping[v]]] for v in variables]
+        else:
+            self.misses += 1
+            total, variable_counts = enumerate_component(variables, constraints)
+            by_cell = dict(zip((mapping[v] for v in variables), variable_counts))
+            self._store(self._entries, key, (total, tuple(by_cell[cell] for cell in sorted(by_cell))))
+
+        self._store(self._exact, exact_key, (total, dict(zip(variables, variable_counts)), key))
+        return total, variable_counts
+
+    def _store(self, entries, key, value):
+        """写入条目，超过maxsize时淘汰最久没有使用的条目"""
+        entries[key] = value
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+
+    def stats(self):
+        """返回命中次数、未命中次数、命中率和当前条目数"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+    def clear(self):
+        """清空缓存和计数"""
+        self._entries.clear()
+        self._exact.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def save(self, path):
+        """把规范形式的缓存条目（按最近使用顺序）保存为JSON文件，按原始位置的条目不保存"""
+        entries = [
+            [[[value, list(group)] for value, group in key], total, list(counts)]
+            for key, (total, counts) in self._entries.items()
+        ]
+        with open(path, "w") as f:
+            json.dump({"entries": entries}, f)
+
+    def load(self, path):
+        """从save保存的文件读取条目，合并到当前缓存中（超出maxsize时保留最新的条目）"""
+        with open(path) as f:
+            data = json.load(f)
+        for key, total, counts in data["entries"]:
+            key = tuple((value, tuple(group)) for value, group in key)
+            self._entries[key] = (total, tuple(counts))
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
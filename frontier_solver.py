@@ -0,0 +1,760 @@
+from math import comb, lgamma
+
+import numpy as np
+from board_codec import UNKNOWN, MINE, tiles_to_array
+
+# 按棋盘尺寸缓存的相邻格子表，避免每次求解都重新生成
+_neighbor_tables = {}
+
+# 布局数上界不超过该值的分量直接回溯，否则逐层动态规划
+BACKTRACK_LIMIT = 1024
+
+
+def neighbor_table(rows, cols):
+    """
+    获取棋盘上每个格子（扁平索引 i * cols + j）的相邻格子索引
+
+    结果按(rows, cols)缓存，同一尺寸的棋盘只生成一次
+    """
+    key = (rows, cols)
+    table = _neighbor_tables.get(key)
+    if table is None:
+        table = []
+        for i in range(rows):
+            for j in range(cols):
+                cells = []
+                for di in (-1, 0, 1):
+                    for dj in (-1, 0, 1):
+                        if di == 0 and dj == 0:
+                            continue
+                        ni, nj = i + di, j + dj
+                        if 0 <= ni < rows and 0 <= nj < cols:
+                            cells.append(ni * cols + nj)
+                table.append(tuple(cells))
+        table = tuple(table)
+        _neighbor_tables[key] = table
+    return table
+
+
+class FrontierResult:
+    """
+    前沿求解结果
+
+    属性:
+    probabilities -- rows*cols的浮点数组，未知格子是地雷的概率（已揭示格子为0；
+                     前沿格子为精确值，内部格子在给出总地雷数时为精确值，否则只是前沿平均密度的占位估计）
+    safe -- 确定安全的未知格子集合，元素为(i, j)
+    mines -- 确定是地雷的未知格子集合，元素为(i, j)
+    frontier -- 与数字相邻的未知格子集合
+    components -- 相互独立的前沿分量数量
+    configurations -- 枚举得到的一致地雷布局总数（各分量之和）
+    reused -- 直接复用component_cache中上一次结果、没有重新枚举的分量数量
+    """
+
+    def __init__(self, probabilities, safe, mines, frontier, components, configurations, reused=0):
+        self.probabilities = probabilities
+        self.safe = safe
+        self.mines = mines
+        self.frontier = frontier
+        self.components = components
+        self.configurations = configurations
+        self.reused = reused
+
+
+def _flatten(board):
+    """把棋盘转换为int8后展开为一维列表，返回(values, rows, cols)"""
+    board = tiles_to_array(board)
+    rows, cols = board.shape
+    return board.ravel().tolist(), rows, cols
+
+
+def build_constraints(values, rows, cols, known_mines=()):
+    """
+    根据所有已揭示的数字建立约束
+
+    values为int8棋盘展开的列表（UNKNOWN/MINE/0-8）。
+    每个约束为(剩余地雷数, 未知邻居索引元组)，已确定的地雷（棋盘上的MINE以及known_mines）
+    会从数字中扣除并且不作为变量。
+    覆盖相同格子的重复约束只保留一份
+    """
+    neighbors = neighbor_table(rows, cols)
+    has_mines = bool(known_mines) or MINE in values
+    constraints = {}
+    for idx, value in enumerate(values):
+        if value < 0:
+            continue
+        unknown = [n for n in neighbors[idx] if values[n] < 0]
+        if not unknown:
+            continue
+        mines_needed = value
+        if has_mines:
+            mines_needed -= sum(1 for n in unknown if values[n] == MINE or n in known_mines)
+            unknown = [n for n in unknown if values[n] == UNKNOWN and n not in known_mines]
+        if unknown:
+            # 相邻数字常常覆盖完全相同的未知格子，重复的约束只保留一份
+            constraints[tuple(unknown)] = mines_needed
+    return [(value, cells) for cells, value in constraints.items()]
+
+
+def cell_constraint(values, neighbors, idx, known_mines=()):
+    """
+    单个格子的约束，规则与build_constraints相同
+
+    返回(剩余地雷数, 未知邻居索引元组)；格子不是数字或周围没有未知格子时返回None
+    """
+    value = values[idx]
+    if value < 0:
+        return None
+    unknown = []
+    for n in neighbors[idx]:
+        if values[n] == MINE or (values[n] == UNKNOWN and n in known_mines):
+            value -= 1
+        elif values[n] == UNKNOWN:
+            unknown.append(n)
+    return (value, tuple(unknown)) if unknown else None
+
+
+def split_components(constraints):
+    """
+    把约束按共享的未知格子划分为相互独立的分量
+
+    返回列表，每个元素为(变量列表, 约束列表)。变量沿约束图按广度优先顺序排列，
+    使相邻格子连续赋值，回溯时约束尽早闭合从而尽早剪枝
+    """
+    var_constraints = {}
+    for ci, (_, cells) in enumerate(constraints):
+        for c in cells:
+            if c in var_constraints:
+                var_constraints[c].append(ci)
+            else:
+                var_constraints[c] = [ci]
+
+    seen = set()
+    components = []
+    for start in var_constraints:
+        if start in seen:
+            continue
+        seen.add(start)
+        order = [start]
+        used = set()
+        head = 0
+        while head < len(order):
+            for ci in var_constraints[order[head]]:
+                if ci in used:
+                    continue
+                used.add(ci)
+                for c in constraints[ci][1]:
+                    if c not in seen:
+                        seen.add(c)
+                        order.append(c)
+            head += 1
+        components.append((order, [constraints[ci] for ci in sorted(used)]))
+    return components
+
+
+def enumerate_component(variables, constraints):
+    """
+    统计一个分量内所有满足约束的地雷布局
+
+    每个变量都至少属于一个约束，所以布局数不超过各约束 C(格子数, 剩余地雷数) 的乘积。
+    这个上界不超过BACKTRACK_LIMIT的小分量直接回溯，逐个布局累加；
+    更大的分量按变量顺序逐层动态规划，只记录未闭合约束还需要的地雷数，
+    布局数量爆炸时耗时只与每层的状态数有关
+
+    返回(布局总数, 每个变量在所有布局中是地雷的次数列表)
+    """
+    n = len(variables)
+    index = {v: k for k, v in enumerate(variables)}
+    positions = [sorted(index[c] for c in cells) for _, cells in constraints]
+
+    var_constraints = [[] for _ in range(n)]
+    for ci, cells in enumerate(positions):
+        for k in cells:
+            var_constraints[k].append(ci)
+
+    bound = 1
+    for value, cells in constraints:
+        bound *= comb(len(cells), value)
+        if bound > BACKTRACK_LIMIT:
+            return _layered_count(n, constraints, positions, var_constraints)
+
+    need = [value for value, _ in constraints]
+    free = [len(cells) for _, cells in constraints]
+    return _backtrack_count(n, need, free, var_constraints)
+
+
+def _backtrack_count(n, need, free, var_constraints):
+    """直接回溯，在每个完整布局处累加地雷次数"""
+    counts = [0] * n
+    assignment = [0] * n
+    total = 0
+
+    def backtrack(k):
+        nonlocal total
+        if k == n:
+            total += 1
+            for v in range(n):
+                if assignment[v]:
+                    counts[v] += 1
+            return
+
+        cons = var_constraints[k]
+        for c in cons:
+            free[c] -= 1
+
+        # 尝试该格子为安全：剩余可用格子必须仍能放下所需地雷
+        for c in cons:
+            if need[c] > free[c]:
+                break
+        else:
+            backtrack(k + 1)
+
+        # 尝试该格子为地雷：相关约束都还需要地雷
+        for c in cons:
+            if need[c] == 0:
+                break
+        else:
+            for c in cons:
+                need[c] -= 1
+            assignment[k] = 1
+            backtrack(k + 1)
+            assignment[k] = 0
+            for c in cons:
+                need[c] += 1
+
+        for c in cons:
+            free[c] += 1
+
+    backtrack(0)
+    return total, counts
+
+
+def _layer_steps(n, constraints, positions, var_constraints):
+    """
+    预先算好逐层动态规划每层的状态转移
+
+    第k层的状态是给前k个变量赋值后，尚未闭合的约束还需要的地雷数。
+    新开始的约束追加在状态末尾；checks为(状态中的位置, 该变量之后约束剩余的格子数)，
+    carry/carry_dec描述下一层的状态由哪些位置组成、取地雷时哪些位置减1
+    """
+    starts = [[] for _ in range(n)]
+    open_at = [[] for _ in range(n + 1)]
+    for ci, cells in enumerate(positions):
+        starts[cells[0]].append(ci)
+        # open_at[k]：前k个变量中已有属于它的变量、后面还有变量没有赋值的约束
+        for k in range(cells[0] + 1, cells[-1] + 1):
+            open_at[k].append(ci)
+
+    steps = []
+    for k in range(n):
+        slot = {c: s for s, c in enumerate(open_at[k] + starts[k])}
+        cons = var_constraints[k]
+        checks = [(slot[c], sum(1 for p in positions[c] if p > k)) for c in cons]
+        carry = [slot[c] for c in open_at[k + 1]]
+        dec = [1 if c in cons else 0 for c in open_at[k + 1]]
+        init = tuple(constraints[c][0] for c in starts[k])
+        steps.append((init, checks, carry, list(zip(carry, dec))))
+    return steps
+
+
+def _explore_layers(steps):
+    """
+    正向展开所有可达状态
+
+    返回(layers, final)：layers[k]为(第k层 状态 -> 到达该状态的前缀数, 状态 -> (取安全后的状态, 取地雷后的状态))，
+    不可行的一侧为None；final为最后一层（只可能是空状态，为空说明没有一致的布局）
+    """
+    layers = []
+    layer = {(): 1}
+    for init, checks, carry, carry_dec in steps:
+        moves = {}
+        following = {}
+        for state, ways in layer.items():
+            full = state + init
+            safe = mine = None
+            for s, f in checks:
+                if full[s] > f:
+                    break
+            else:
+                safe = tuple([full[s] for s in carry])
+                following[safe] = following.get(safe, 0) + ways
+            for s, f in checks:
+                if full[s] == 0 or full[s] > f + 1:
+                    break
+            else:
+                mine = tuple([full[s] - d for s, d in carry_dec])
+                following[mine] = following.get(mine, 0) + ways
+            moves[state] = (safe, mine)
+        layers.append((layer, moves))
+        layer = following
+    return layers, layer
+
+
+def _layered_count(n, constraints, positions, var_constraints):
+    """
+    逐层动态规划计数，返回值与_backtrack_count相同
+
+    正向统计到达每个状态的前缀数，反向统计每个状态能补全的后缀数，
+    变量k是地雷的布局数 = Σ 前缀数 × 取地雷后到达状态的后缀数
+    """
+    layers, final = _explore_layers(_layer_steps(n, constraints, positions, var_constraints))
+
+    completions = {(): 1} if final else {}
+    counts = [0] * n
+    for k in range(n - 1, -1, -1):
+        layer, moves = layers[k]
+        below = completions
+        completions = {}
+        mine_total = 0
+        for state, (safe, mine) in moves.items():
+            total = below.get(safe, 0) if safe is not None else 0
+            if mine is not None:
+                mine_ways = below.get(mine, 0)
+                total += mine_ways
+                mine_total += layer[state] * mine_ways
+            if total:
+                completions[state] = total
+        counts[k] = mine_total
+    return completions.get((), 0), counts
+
+
+def component_distribution(variables, constraints):
+    """
+    按地雷数量拆分的分量枚举结果，用于按总地雷数加权
+
+    返回(totals, mine_counts, safe_counts)，都是float数组：
+    totals[m] -- 分量内恰好有m个地雷的布局数，长度为变量数+1
+    mine_counts[k, m] / safe_counts[k, m] -- 其中第k个变量是地雷/安全的布局数
+    """
+    n = len(variables)
+    index = {v: k for k, v in enumerate(variables)}
+    positions = [sorted(index[c] for c in cells) for _, cells in constraints]
+
+    var_constraints = [[] for _ in range(n)]
+    for ci, cells in enumerate(positions):
+        for k in cells:
+            var_constraints[k].append(ci)
+
+    bound = 1
+    for value, cells in constraints:
+        bound *= comb(len(cells), value)
+        if bound > BACKTRACK_LIMIT:
+            return _layered_distribution(n, constraints, positions, var_constraints)
+
+    need = [value for value, _ in constraints]
+    free = [len(cells) for _, cells in constraints]
+    return _backtrack_distribution(n, need, free, var_constraints)
+
+
+def _backtrack_distribution(n, need, free, var_constraints):
+    """直接回溯，在每个完整布局处按布局的地雷数累加"""
+    totals = np.zeros(n + 1)
+    mine_counts = np.zeros((n, n + 1))
+    safe_counts = np.zeros((n, n + 1))
+    assignment = [0] * n
+
+    def backtrack(k, mines):
+        if k == n:
+            totals[mines] += 1
+            for v in range(n):
+                if assignment[v]:
+                    mine_counts[v, mines] += 1
+                else:
+                    safe_counts[v, mines] += 1
+            return
+
+        cons = var_constraints[k]
+        for c in cons:
+            free[c] -= 1
+
+        for c in cons:
+            if need[c] > free[c]:
+                break
+        else:
+            backtrack(k + 1, mines)
+
+        for c in cons:
+            if need[c] == 0:
+                break
+        else:
+            for c in cons:
+                need[c] -= 1
+            assignment[k] = 1
+            backtrack(k + 1, mines + 1)
+            assignment[k] = 0
+            for c in cons:
+                need[c] += 1
+
+        for c in cons:
+            free[c] += 1
+
+    backtrack(0, 0)
+    return totals, mine_counts, safe_counts
+
+
+def _layered_distribution(n, constraints, positions, var_constraints):
+    """
+    逐层动态规划，返回值与_backtrack_distribution相同
+
+    与_layered_count使用同样的状态，但前缀数和后缀数换成按地雷数展开的多项式：
+    第k层前缀多项式的长度为k+1，后缀多项式的长度为n-k+1。变量k在布局总地雷数为t时
+    是地雷的次数 = Σ_状态 Σ_{a+b+1=t} 前缀[a] × 取地雷后状态的后缀[b]，按层用一次矩阵乘法算出
+    """
+    layers, final = _explore_layers(_layer_steps(n, constraints, positions, var_constraints))
+    index = [{state: s for s, state in enumerate(layer)} for layer, _ in layers]
+    index.append({(): 0} if final else {})
+
+    transitions = []
+    for k, (layer, moves) in enumerate(layers):
+        following = index[k + 1]
+        safe_next = np.array([-1 if safe is None else following[safe] for safe, _ in moves.values()], dtype=np.intp)
+        mine_next = np.array([-1 if mine is None else following[mine] for _, mine in moves.values()], dtype=np.intp)
+        transitions.append((safe_next, mine_next))
+
+    # 反向：suffix[k][状态, b] = 从该状态补全剩余n-k个变量、其中有b个地雷的方式数
+    suffix = [None] * (n + 1)
+    suffix[n] = np.zeros((len(index[n]), 1))
+    if final:
+        suffix[n][0, 0] = 1
+    for k in range(n - 1, -1, -1):
+        safe_next, mine_next = transitions[k]
+        below = suffix[k + 1]
+        current = np.zeros((len(safe_next), n - k + 1))
+        has_safe = safe_next >= 0
+        has_mine = mine_next >= 0
+        current[has_safe, :-1] += below[safe_next[has_safe]]
+        current[has_mine, 1:] += below[mine_next[has_mine]]
+        suffix[k] = current
+
+    totals = suffix[0][0] if len(suffix[0]) else np.zeros(n + 1)
+    mine_counts = np.zeros((n, n + 1))
+    safe_counts = np.zeros((n, n + 1))
+
+    # 正向：prefix[状态, a] = 前k个变量中有a个地雷、到达该状态的方式数
+    prefix = np.ones((1, 1))
+    for k in range(n):
+        safe_next, mine_next = transitions[k]
+        below = suffix[k + 1]
+        diagonal = np.add.outer(np.arange(k + 1), np.arange(n - k)).ravel()
+        following = np.zeros((len(index[k + 1]), k + 2))
+        has_safe = safe_next >= 0
+        has_mine = mine_next >= 0
+        if has_safe.any():
+            joint = prefix[has_safe].T @ below[safe_next[has_safe]]
+            safe_counts[k, :n] = np.bincount(diagonal, joint.ravel(), minlength=n)
+            np.add.at(following[:, :-1], safe_next[has_safe], prefix[has_safe])
+        if has_mine.any():
+            joint = prefix[has_mine].T @ below[mine_next[has_mine]]
+            mine_counts[k, 1:] = np.bincount(diagonal, joint.ravel(), minlength=n)
+            np.add.at(following[:, 1:], mine_next[has_mine], prefix[has_mine])
+        prefix = following
+    return totals, mine_counts, safe_counts
+
+
+def solve_frontier(board, known_mines=(), known_safe=(), cache=None, total_mines=None):
+    """
+    精确计算棋盘上每个未知格子是地雷的概率
+
+    参数:
+    board -- 二维棋盘：服务器格式的tiles（None表示未知格子，数字表示周围地雷数量）
+             或board_codec.tiles_to_array得到的int8数组
+    known_mines -- 预先确定是地雷的格子(i, j)，不参与枚举
+    known_safe -- 预先确定安全的格子(i, j)，不参与枚举
+    cache -- 可选的frontier_cache.FrontierCache，跨棋盘复用相同形状分量的枚举结果
+    total_mines -- 可选的整局地雷总数（包括已经标出的地雷）。给出时每种前沿布局按
+                   剩余地雷放进内部格子的方式数加权，内部格子也得到精确概率
+
+    返回:
+    FrontierResult -- 前沿格子的精确概率以及确定安全/确定地雷的格子集合。
+                      不知道总地雷数时，不与任何数字相邻的内部格子没有约束信息，
+                      这里只填入前沿的平均地雷密度作为占位估计，调用方应优先选择靠近数字的格子
+    """
+    values, rows, cols = _flatten(board)
+    mine_idx = {i * cols + j for i, j in known_mines}
+    safe_idx = {i * cols + j for i, j in known_safe}
+
+    constraints = build_constraints(values, rows, cols, mine_idx)
+    if safe_idx:
+        # 已确定安全的格子视为已揭示但不提供约束
+        constraints = [
+            (value, kept)
+            for value, kept in (
+                (value, tuple(c for c in cells if c not in safe_idx))
+                for value, cells in constraints
+            )
+            if kept
+        ]
+
+    return solve_constraints(constraints, values, rows, cols, mine_idx, safe_idx, cache=cache,
+                             total_mines=total_mines)
+
+
+def solve_constraints(constraints, values, rows, cols, mine_idx=(), safe_idx=(), component_cache=None,
+                      cache=None, total_mines=None):
+    """
+    根据已经建立好的约束计算概率，供自行维护约束的调用方使用
+
+    参数:
+    constraints -- build_constraints格式的约束列表（覆盖相同格子的约束只能有一份）
+    values -- int8棋盘展开的列表
+    mine_idx, safe_idx -- 预先确定是地雷/安全的格子的扁平索引
+    component_cache -- 可选的字典，保存上一次求解各分量的枚举结果。
+                       约束完全相同的分量直接复用，返回时只保留本次用到的分量
+    cache -- 可选的frontier_cache.FrontierCache，component_cache未命中时按规范形式查找。
+             FrontierCache只保存不区分地雷数的结果，给出total_mines时不使用
+    total_mines -- 可选的整局地雷总数，含义与solve_frontier相同
+
+    返回:
+    FrontierResult，含义与solve_frontier相同
+    """
+    components = split_components(constraints)
+    if total_mines is not None:
+        result = _solve_with_mine_count(components, values, rows, cols, mine_idx, safe_idx,
+                                        total_mines, component_cache)
+        if result is not None:
+            return result
+
+    probabilities = [0.0] * (rows * cols)
+    safe = set()
+    mines = set()
+    frontier = set()
+    configurations = 0
+    reused = 0
+
+    used = {}
+    count_component = enumerate_component if cache is None else (
+        lambda variables, group: cache.solve(variables, group, cols))
+    for variables, group in components:
+        if component_cache is None:
+            total, counts = count_component(variables, group)
+        else:
+            key = frozenset(group)
+            cached = component_cache.get(key)
+            if cached is None:
+                total, counts = count_component(variables, group)
+                cached = (total, dict(zip(variables, counts)))
+            else:
+                total, counts = cached[0], [cached[1][v] for v in variables]
+                reused += 1
+            used[key] = cached
+        configurations += total
+        if total == 0:
+            # 棋盘数据自相矛盾，无法给出概率
+            continue
+        for v, count in zip(variables, counts):
+            frontier.add(v)
+            probabilities[v] = count / total
+            if count == 0:
+                safe.add(divmod(v, cols))
+            elif count == total:
+                mines.add(divmod(v, cols))
+
+    for idx in mine_idx:
+        frontier.add(idx)
+        probabilities[idx] = 1.0
+        mines.add(divmod(idx, cols))
+    for idx in safe_idx:
+        # 预先确定安全的格子按概率0计入前沿，内部格子的估计与不预先给出时相同
+        frontier.add(idx)
+        safe.add(divmod(idx, cols))
+
+    if component_cache is not None:
+        component_cache.clear()
+        component_cache.update(used)
+
+    # 内部格子：占位估计，不是精确概率（需要总地雷数才能精确计算）。
+    # 按索引顺序求和，使结果与前沿集合的构建顺序无关
+    if frontier:
+        density = sum(probabilities[v] for v in sorted(frontier)) / len(frontier)
+        for idx, value in enumerate(values):
+            if value == UNKNOWN and idx not in frontier and idx not in safe_idx:
+                probabilities[idx] = density
+
+    return FrontierResult(
+        np.array(probabilities).reshape(rows, cols),
+        safe,
+        mines,
+        {divmod(v, cols) for v in frontier},
+        len(components),
+        configurations,
+        reused,
+    )
+
+
+def _log_binomial(n, k):
+    """log C(n, k)，k不在[0, n]内时为-inf"""
+    if k < 0 or k > n:
+        return -np.inf
+    return lgamma(n + 1) - lgamma(k + 1) - lgamma(n - k + 1)
+
+
+def _convolve_all(distributions):
+    """依次卷积各分量的地雷数分布，每一步按最大值归一化，避免大棋盘上溢出"""
+    result = np.ones(1)
+    for distribution in distributions:
+        result = np.convolve(result, distribution)
+        result /= result.max()
+    return result
+
+
+def _solve_with_mine_count(components, values, rows, cols, mine_idx, safe_idx, total_mines,
+                           component_cache):
+    """
+    按总地雷数加权的求解，供solve_constraints使用
+
+    前沿上共有f个地雷的布局，剩余的 M-f 个地雷放进R个内部格子有C(R, M-f)种方式，
+    所以每种前沿布局按C(R, M-f)加权。组合数在对数空间里计算，减去最大值后再取指数。
+    分量之间通过地雷数耦合：分量c有m个地雷的权重为 Σ_s 其他分量共有s个地雷的布局数 × C(R, M-m-s)。
+
+    没有任何地雷总数与棋盘一致时（例如传入的总数不对）返回None，由调用方退回不加权的计算
+    """
+    known = set(mine_idx) | {idx for idx, value in enumerate(values) if value == MINE}
+    remaining = total_mines - len(known)
+    frontier = [v for variables, _ in components for v in variables]
+    frontier_set = set(frontier)
+    interior = [
+        idx for idx, value in enumerate(values)
+        if value == UNKNOWN and idx not in frontier_set and idx not in known and idx not in safe_idx
+    ]
+
+    used = {}
+    distributions = []
+    configurations = 0
+    reused = 0
+    for variables, group in components:
+        key = ("by_mine_count", frozenset(group))
+        cached = component_cache.get(key) if component_cache is not None else None
+        if cached is None:
+            totals, mine_counts, safe_counts = component_distribution(variables, group)
+            cached = (totals, dict(zip(variables, mine_counts)), dict(zip(variables, safe_counts)))
+        else:
+            reused += 1
+        used[key] = cached
+        totals, by_mine, by_safe = cached
+        scale = totals.max()
+        if scale == 0:
+            # 棋盘数据自相矛盾
+            return None
+        configurations += totals.sum()
+        distributions.append((
+            variables,
+            totals / scale,
+            np.array([by_mine[v] for v in variables]) / scale,
+            np.array([by_safe[v] for v in variables]) / scale,
+        ))
+
+    # binomial[f] -- 前沿共有f个地雷时内部的放法数（相对值），feasible[f]表示放得下
+    size = len(frontier) + 1
+    log_weights = np.array([_log_binomial(len(interior), remaining - f) for f in range(size)])
+    feasible = np.isfinite(log_weights)
+    if not feasible.any():
+        return None
+    binomial = np.exp(log_weights - log_weights[feasible].max())
+
+    # 每个分量以外其他分量的地雷数分布：前缀卷积 × 后缀卷积
+    count = len(distributions)
+    prefix = [np.ones(1)]
+    for _, totals, _, _ in distributions:
+        prefix.append(_convolve_all([prefix[-1], totals]))
+    suffix = [np.ones(1)] * (count + 1)
+    for c in range(count - 1, -1, -1):
+        suffix[c] = _convolve_all([distributions[c][1], suffix[c + 1]])
+    support = [np.ones(1, dtype=bool)]
+    for _, totals, _, _ in distributions:
+        support.append(np.convolve(support[-1], totals > 0) > 0)
+    support_suffix = [np.ones(1, dtype=bool)] * (count + 1)
+    for c in range(count - 1, -1, -1):
+        support_suffix[c] = np.convolve(distributions[c][1] > 0, support_suffix[c + 1]) > 0
+
+    frontier_weights = prefix[count] * binomial
+    if not (support[count] & feasible).any() or frontier_weights.sum() == 0:
+        return None
+
+    probabilities = [0.0] * (rows * cols)
+    safe = set()
+    mines = set()
+    for c, (variables, totals, mine_counts, safe_counts) in enumerate(distributions):
+        others = _convolve_all([prefix[c], suffix[c + 1]])
+        # weights[m] = Σ_s others[s] * binomial[m + s]
+        weights = np.correlate(binomial, others, "valid")
+        # 分量有m个地雷可行：自身有这样的布局，且其他分量存在某个地雷数s使总数放得下
+        others_support = np.convolve(support[c], support_suffix[c + 1]) > 0
+        possible = (totals > 0) & (np.correlate(feasible, others_support, "valid") > 0)
+        component_probabilities = mine_counts @ weights / (totals @ weights)
+        never_mine = ~(mine_counts[:, possible] > 0).any(axis=1)
+        always_mine = ~(safe_counts[:, possible] > 0).any(axis=1)
+        component_probabilities[never_mine] = 0.0
+        component_probabilities[always_mine] = 1.0
+        for v, probability, is_safe, is_mine in zip(
+                variables, component_probabilities.tolist(), never_mine.tolist(), always_mine.tolist()):
+            probabilities[v] = probability
+            if is_safe:
+                safe.add(divmod(v, cols))
+            elif is_mine:
+                mines.add(divmod(v, cols))
+
+    for idx in known:
+        if values[idx] == UNKNOWN:
+            probabilities[idx] = 1.0
+            mines.add(divmod(idx, cols))
+    for idx in safe_idx:
+        safe.add(divmod(idx, cols))
+
+    # 内部格子：每个格子是地雷的概率 = 内部地雷数的期望 / R
+    if interior:
+        possible = support[count] & feasible
+        inside = remaining - np.arange(size)
+        expected = float((frontier_weights * inside).sum() / frontier_weights.sum()) / len(interior)
+        if (inside[possible] == 0).all():
+            safe.update(divmod(idx, cols) for idx in interior)
+            expected = 0.0
+        elif (inside[possible] == len(interior)).all():
+            mines.update(divmod(idx, cols) for idx in interior)
+            expected = 1.0
+        for idx in interior:
+            probabilities[idx] = expected
+
+    if component_cache is not None:
+        component_cache.clear()
+        component_cache.update(used)
+
+    return FrontierResult(
+        np.array(probabilities).reshape(rows, cols),
+        safe,
+        mines,
+        {divmod(v, cols) for v in frontier} | {divmod(idx, cols) for idx in known if values[idx] == UNKNOWN}
+        | {divmod(idx, cols) for idx in safe_idx},
+        len(components),
+        int(configurations),
+        reused,
+    )
+
+
+# 使用示例
+if __name__ == "__main__":
+    import time
+
+    example_board = [
+        [None, None, None, None, None, None, None, None, None, None],
+        [None, None, None, None, None, None, None, None, None, None],
+        [None, 1, 1, 1, 2, None, None, None, None, None],
+        [None, 1, 0, 0, 1, None, None, None, None, None],
+        [None, 1, 0, 0, 1, 2, None, None, None, None],
+        [None, 2, 1, 0, 0, 1, None, None, None, None],
+        [None, None, 1, 0, 0, 1, None, None, None, None],
+        [None, None, 2, 1, 1, 1, None, None, None, None],
+        [None, None, None, None, None, None, None, None, None, None],
+        [None, None, None, None, None, None, None, None, None, None]
+    ]
+
+    result = solve_frontier(example_board)
+    print(f"确定安全: {sorted(result.safe)}")
+    print(f"确定地雷: {sorted(result.mines)}")
+    print(np.round(result.probabilities, 2))
+
+    runs = 1000
+    start = time.perf_counter()
+    for _ in range(runs):
+        solve_frontier(example_board)
+    elapsed = (time.perf_counter() - start) / runs
+    print(f"平均耗时: {elapsed * 1e6:.1f} 微秒")
@@ -0,0 +1,133 @@
+from math import gcd
+
+
+def _combine(row, pivot, cell):
+    """
+    用pivot行消去row中cell的系数：pivot[cell] * row - row[cell] * pivot，再按最大公约数约分
+
+    行为(系数字典 {格子: 系数}, 右端常数)，全部是精确的整数运算
+    """
+    coefficients, target = row
+    pivot_coefficients, pivot_target = pivot
+    p = pivot_coefficients[cell]
+    q = coefficients[cell]
+    combined = {c: a * p for c, a in coefficients.items()}
+    for c, a in pivot_coefficients.items():
+        value = combined.get(c, 0) - q * a
+        if value:
+            combined[c] = value
+        else:
+            combined.pop(c, None)
+    target = target * p - q * pivot_target
+
+    divisor = abs(target)
+    for a in combined.values():
+        divisor = gcd(divisor, a)
+    if divisor > 1:
+        combined = {c: a // divisor for c, a in combined.items()}
+        target //= divisor
+    return combined, target
+
+
+def eliminate(rows):
+    """
+    稀疏整数高斯-若尔当消元，返回消元后的非零行
+
+    逐行加入：先用已有的主元行消去新行中的主元格子，剩下的系数非零时取其中最小的格子作为新主元，
+    再用新行消去其他主元行中的这个格子。只有约束真正重叠的格子会产生新的非零系数
+    """
+    pivots = {}  # 主元格子 -> 行
+    for row in rows:
+        for cell in [c for c in row[0] if c in pivots]:
+            if cell in row[0]:
+                row = _combine(row, pivots[cell], cell)
+        if not row[0]:
+            continue
+        cell = min(row[0])
+        for other, other_row in pivots.items():
+            if cell in other_row[0]:
+                pivots[other] = _combine(other_row, row, cell)
+        pivots[cell] = row
+    return list(pivots.values())
+
+
+def bound_deductions(rows):
+    """
+    对每行 Σ a_k x_k = b（x_k ∈ {0, 1}）做上下界检查
+
+    行的最大值为正系数之和，最小值为负系数之和。如果某个变量取另一个值后，
+    其余变量无论怎么取都达不到b，那么它的取值就确定了。
+    返回(确定为0的格子集合, 确定为1的格子集合)；自相矛盾的行不给出结论
+    """
+    zeros = set()
+    ones = set()
+    for coefficients, target in rows:
+        above = -target  # 最大值比b多出的部分
+        below = target  # b比最小值多出的部分
+        for a in coefficients.values():
+            if a > 0:
+                above += a
+            else:
+                below -= a
+        if above < 0 or below < 0:
+            continue
+        for cell, a in coefficients.items():
+            if a > 0:
+                if a > above:
+                    ones.add(cell)
+                elif a > below:
+                    zeros.add(cell)
+            else:
+                if -a > below:
+                    ones.add(cell)
+                elif -a > above:
+                    zeros.add(cell)
+    return zeros, ones
+
+
+def _substitute(rows, safe, mines):
+    """把确定的格子代入各行：地雷从右端扣除，确定的格子从系数中删去，丢弃变为空的行"""
+    substituted = []
+    for coefficients, target in rows:
+        if not (coefficients.keys() & safe or coefficients.keys() & mines):
+            substituted.append((coefficients, target))
+            continue
+        target -= sum(a for c, a in coefficients.items() if c in mines)
+        coefficients = {c: a for c, a in coefficients.items() if c not in safe and c not in mines}
+        if coefficients:
+            substituted.append((coefficients, target))
+    return substituted
+
+
+def linear_deductions(constraints):
+    """
+    用线性代数从前沿约束中推出确定安全和确定是地雷的格子
+
+    把所有约束写成一个稀疏的0/1矩阵方程，对原始约束和消元后的约束都做上下界检查；
+    确定的格子代入后重新消元，直到没有新的结论。消元后的一行可以是任意多个约束的组合，
+    所以能推出需要三个或更多约束才能证明的格子，而不只是相邻数字两两比较。
+    结果只包含一定正确的结论，但不保证找到全部（完整的判断需要frontier_solver的枚举）
+
+    参数:
+    constraints -- build_constraints格式的约束列表
+
+    返回:
+    (safe, mines) -- 确定安全/确定是地雷的格子扁平索引集合
+    """
+    safe = set()
+    mines = set()
+    rows = [(dict.fromkeys(cells, 1), need) for need, cells in constraints]
+    while rows:
+        zeros, ones = bound_deductions(rows)
+        if not (zeros or ones):
+            zeros, ones = bound_deductions(eliminate(rows))
+        # 只有矛盾的棋盘才会出现同一个格子两种结论，这时不采用这些格子
+        conflict = zeros & ones
+        zeros -= conflict
+        ones -= conflict
+        if not (zeros or ones):
+            break
+        safe |= zeros
+        mines |= ones
+        rows = _substitute(rows, zeros, ones)
+    return safe, mines
@@ -1,9 +1,18 @@
+import asyncio
+import functools
+import heapq
+import itertools
 import random
 import json
+import threading
 import time
 import requests
 import os
+import sqlite3
 import sys
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Dict, Any, List, Optional
 from colorama import Fore, Style, init
 from datetime import datetime, timezone, timedelta
@@ -13,7 +22,8 @@ from fake_useragent import UserAgent
 init(autoreset=True)
 
 # Configuration
-BASE_URL = "https://www.magicnewton.com/portal/api"
+# Override with MAGICNEWTON_BASE_URL to point at another server, e.g. the local mock_server.py
+BASE_URL = os.environ.get("MAGICNEWTON_BASE_URL", "https://www.magicnewton.com/portal/api")
 ENDPOINTS = {
     "user": "/user",
     "quests": "/quests",
@@ -30,8 +40,17 @@ ONE_TIME_QUEST_ID = [
 ]
 MIN_TASK_DELAY = 7  # seconds
 MAX_TASK_DELAY = 14  # seconds
-MIN_LOOP_DELAY = 24 * 60 * 60  # 24 hours in seconds
-MAX_LOOP_DELAY = (24 * 60 * 60) + (77 * 60)  # 24 hours + 77 minutes in seconds
+ROLL_JITTER = 77 * 60  # up to 77 minutes after the daily reset before an account rolls again
+RETRY_DELAY = 10 * 60  # seconds before an account whose rolls could not be finished is tried again
+MAX_CONCURRENCY = int(os.environ.get("MAGICNEWTON_CONCURRENCY", "4"))  # accounts processed at the same time
+POOL_SIZE = 10  # HTTP connections per host shared by all accounts
+# Endpoints that return the same data for every account, served from a shared cache
+SHARED_ENDPOINTS = {ENDPOINTS['quests']}
+CACHE_TTL = int(os.environ.get("MAGICNEWTON_CACHE_TTL", 60 * 60))  # seconds, 0 disables the cache
+CACHE_FILE = os.environ.get("MAGICNEWTON_CACHE_FILE")  # optional file that keeps the cache between runs
+# SQLite file with each account's last known state, used to skip finished accounts on restart; empty disables
+STATE_FILE = os.environ.get("MAGICNEWTON_STATE_FILE", "state.db")
+STATE_BATCH_SIZE = 50  # account updates written in one transaction
 
 # Rainbow Banner
 def rainbow_banner():
@@ -81,6 +100,57 @@ def get_random_delay(min_sec: int, max_sec: int) -> int:
 def format_separator(length: int = 70):
     return f"{Fore.CYAN}{'━' * length}"
 
+def parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def next_roll_window(completed_at: datetime, jitter: int = ROLL_JITTER) -> datetime:
+    """When an account whose daily roll was completed at completed_at should roll again:
+    the next UTC midnight (rolls reset per UTC day) plus a random delay of up to jitter seconds"""
+    next_day = completed_at.astimezone(timezone.utc).date() + timedelta(days=1)
+    reset = datetime(next_day.year, next_day.month, next_day.day, tzinfo=timezone.utc)
+    return reset + timedelta(seconds=get_random_delay(0, jitter))
+
+# Per-account deadlines
+class DeadlineScheduler:
+    """Min-heap of (due time, token). wait() sleeps once until the earliest deadline and returns
+    only the accounts that are due, instead of waking every account on one global cycle.
+    Not thread-safe: run_automation schedules and waits from the same thread."""
+
+    def __init__(self, clock=time.time, sleep=time.sleep):
+        self.clock = clock
+        self.sleep = sleep
+        self._heap = []
+        self._order = itertools.count()  # accounts due at the same time keep the order they were scheduled in
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def schedule(self, token: str, due: datetime):
+        heapq.heappush(self._heap, (due.timestamp(), next(self._order), token))
+
+    def next_due(self) -> Optional[datetime]:
+        if not self._heap:
+            return None
+        return datetime.fromtimestamp(self._heap[0][0], timezone.utc)
+
+    def pop_due(self) -> List[str]:
+        """Remove and return every token whose deadline has passed, earliest first"""
+        now = self.clock()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due.append(heapq.heappop(self._heap)[2])
+        return due
+
+    def wait(self) -> List[str]:
+        """Sleep until the earliest deadline, then return the due tokens; [] when nothing is scheduled"""
+        while self._heap:
+            due = self.pop_due()
+            if due:
+                return due
+            # Loops again only if the sleep ended early
+            self.sleep(self._heap[0][0] - self.clock())
+        return []
+
 # Class to manage proxies
 class ProxyManager:
     def __init__(self, proxy_file: str = "proxy.txt"):
@@ -145,14 +215,169 @@ class ProxyManager:
         except Exception as e:
             log_error(f"Failed to update proxy file: {str(e)}")
 
+# Time-based cache for responses that are the same for every account
+class TTLCache:
+    def __init__(self, ttl: int = CACHE_TTL, cache_file: Optional[str] = None, clock=time.time):
+        self.ttl = ttl
+        self.cache_file = cache_file
+        self.clock = clock
+        self.entries: Dict[str, Any] = {}  # key -> [stored_at, value]
+        self.lock = threading.Lock()
+        if cache_file:
+            self.load()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value, or None when it is missing or older than ttl seconds"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or self.clock() - entry[0] >= self.ttl:
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: Dict[str, Any]):
+        with self.lock:
+            self.entries[key] = [self.clock(), value]
+            if self.cache_file:
+                self.save()
+
+    def load(self):
+        """Read the cache file; entries that are not [stored_at, response dict] are dropped as misses"""
+        try:
+            with open(self.cache_file, 'r') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except (ValueError, OSError) as e:
+            log_warning(f"Ignoring unreadable cache file {self.cache_file}: {str(e)}")
+            return
+        if not isinstance(entries, dict):
+            log_warning(f"Ignoring cache file {self.cache_file}: not a JSON object")
+            return
+        self.entries = {key: entry for key, entry in entries.items() if self.valid_entry(entry)}
+        if len(self.entries) < len(entries):
+            log_warning(f"Dropped {len(entries) - len(self.entries)} invalid entries from {self.cache_file}")
+        log_info(f"Loaded {len(self.entries)} cached responses from {self.cache_file}")
+
+    @staticmethod
+    def valid_entry(entry: Any) -> bool:
+        return (isinstance(entry, list) and len(entry) == 2
+                and isinstance(entry[0], (int, float)) and not isinstance(entry[0], bool)
+                and isinstance(entry[1], dict))
+
+    def save(self):
+        try:
+            with open(self.cache_file, 'w') as f:
+                json.dump(self.entries, f)
+        except OSError as e:
+            log_error(f"Failed to save cache file: {str(e)}")
+
+# Class to keep per-account state between runs
+class StateStore:
+    """Last known profile summary, quest statuses, last roll time and next due time of every account,
+    kept in SQLite (WAL mode). Updates are buffered and written in one transaction per flush."""
+
+    PROFILE_FIELDS = ('id', 'name', 'email', 'refCode')
+
+    def __init__(self, path: str = STATE_FILE, batch_size: int = STATE_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS accounts (
+                token TEXT PRIMARY KEY,
+                profile TEXT,
+                quests TEXT,
+                last_roll_at TEXT,
+                next_due TEXT,
+                updated_at TEXT NOT NULL
+            )""")
+        self.connection.commit()
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Every stored account as {token: {profile, quests, last_roll_at, next_due, updated_at}}"""
+        self.flush()
+        accounts = {}
+        rows = self.connection.execute(
+            "SELECT token, profile, quests, last_roll_at, next_due, updated_at FROM accounts")
+        for token, profile, quests, last_roll_at, next_due, updated_at in rows:
+            accounts[token] = {
+                'profile': json.loads(profile) if profile else {},
+                'quests': json.loads(quests) if quests else {},
+                'last_roll_at': parse_timestamp(last_roll_at) if last_roll_at else None,
+                'next_due': parse_timestamp(next_due) if next_due else None,
+                'updated_at': parse_timestamp(updated_at),
+            }
+        return accounts
+
+    def record(self, token: str, user_data: Dict[str, Any], user_quests_data: Dict[str, Any],
+               last_roll_at: Optional[datetime], next_due: Optional[datetime]):
+        """Buffer the state seen for one account; written on the next flush"""
+        user = (user_data or {}).get('data') or {}
+        profile = {field: user[field] for field in self.PROFILE_FIELDS if field in user}
+        if user.get('auths'):
+            profile['displayName'] = user['auths'][0].get('displayName')
+        quests = {uq['questId']: {'status': uq.get('status'), 'updatedAt': uq.get('updatedAt')}
+                  for uq in (user_quests_data or {}).get('data') or []}
+        with self.lock:
+            self.pending[token] = {
+                'profile': json.dumps(profile) if profile else None,
+                'quests': json.dumps(quests) if quests else None,
+                'last_roll_at': last_roll_at.isoformat() if last_roll_at else None,
+                'next_due': next_due.isoformat() if next_due else None,
+                'updated_at': datetime.now(timezone.utc).isoformat(),
+            }
+            full = len(self.pending) >= self.batch_size
+        if full:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered updates in one transaction; fields that were not seen keep their stored value"""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            if not pending:
+                return
+            try:
+                with self.connection:
+                    self.connection.executemany("""
+                        INSERT INTO accounts (token, profile, quests, last_roll_at, next_due, updated_at)
+                        VALUES (:token, :profile, :quests, :last_roll_at, :next_due, :updated_at)
+                        ON CONFLICT(token) DO UPDATE SET
+                            profile = COALESCE(excluded.profile, profile),
+                            quests = COALESCE(excluded.quests, quests),
+                            last_roll_at = COALESCE(excluded.last_roll_at, last_roll_at),
+                            next_due = excluded.next_due,
+                            updated_at = excluded.updated_at""",
+                        [dict(state, token=token) for token, state in pending.items()])
+            except sqlite3.Error as e:
+                log_error(f"Failed to save account state: {str(e)}")
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
 # Class to manage API
 class APIClient:
-    def __init__(self, base_url: str, token_file: str = "token.txt", header_file: str = "header.json"):
+    def __init__(self, base_url: str, token_file: str = "token.txt", header_file: str = "header.json",
+                 cache_ttl: int = CACHE_TTL, cache_file: Optional[str] = CACHE_FILE):
         self.base_url = base_url
         self.token_file = token_file
         self.header_file = header_file
         self.session = requests.Session()
         self.ua = UserAgent()
+        self._headers_lock = threading.Lock()
+        # GETs of SHARED_ENDPOINTS are cached for all tokens; concurrent misses wait for one request
+        self.cache = TTLCache(cache_ttl, cache_file) if cache_ttl > 0 else None
+        self._fetch_locks = defaultdict(threading.Lock)
         
         try:
             self.session_tokens = self.load_tokens()
@@ -207,10 +432,11 @@ class APIClient:
     def get_headers(self, token: str) -> Dict[str, str]:
         """Get or generate request headers for a specific token"""
         # Use the full token as the unique key to ensure each account gets its own header
-        if token not in self.headers:
-            self.headers[token] = self.get_desktop_user_agent()
-            self.save_headers()
-            log_info(f"Generated new desktop user agent for token {token[:5]}...{token[-5:]}")
+        with self._headers_lock:
+            if token not in self.headers:
+                self.headers[token] = self.get_desktop_user_agent()
+                self.save_headers()
+                log_info(f"Generated new desktop user agent for token {token[:5]}...{token[-5:]}")
             
         return {
             "accept": "application/json",
@@ -224,6 +450,28 @@ class APIClient:
         }
 
     def make_request(self, endpoint: str, method: str = "GET", token: str = None, data: Dict = None, proxies: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        if method == "GET" and self.cache is not None and endpoint in SHARED_ENDPOINTS:
+            return self.make_shared_request(endpoint, token, proxies)
+        return self.send_request(endpoint, method, token, data, proxies)
+
+    def make_shared_request(self, endpoint: str, token: str = None, proxies: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """GET an endpoint whose response is the same for every account, using the shared cache"""
+        cached = self.cache.get(endpoint)
+        if cached is None:
+            with self._fetch_locks[endpoint]:
+                # Another account may have fetched it while we were waiting for the lock
+                cached = self.cache.get(endpoint)
+                if cached is None:
+                    response = self.send_request(endpoint, "GET", token, None, proxies)
+                    # Only successful responses are cached; errors are retried by the next account
+                    if "error" in response or "data" not in response:
+                        return response
+                    self.cache.set(endpoint, response)
+                    return response
+        log_info(f"Serving {endpoint} from cache")
+        return cached
+
+    def send_request(self, endpoint: str, method: str = "GET", token: str = None, data: Dict = None, proxies: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         url = f"{self.base_url}{endpoint}"
         if token is None:
             token = self.get_random_token()
@@ -274,12 +522,54 @@ class APIClient:
         }
         return self.make_request("/userQuests", method="POST", token=token, data=data)
 
+# API client for running several accounts concurrently under asyncio
+class AsyncAPIClient(APIClient):
+    """Awaitable versions of the APIClient calls.
+
+    Each call runs the regular blocking method on a worker thread, so responses and error
+    dicts are exactly those of make_request. All workers share one requests.Session whose
+    connection pool holds at most pool_size connections per host; with pool_block a request
+    waits for a free connection instead of opening an extra one.
+    """
+
+    def __init__(self, base_url: str, token_file: str = "token.txt", header_file: str = "header.json",
+                 pool_size: int = POOL_SIZE, **options):
+        super().__init__(base_url, token_file, header_file, **options)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, pool_block=True)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="api")
+
+    async def run_blocking(self, func, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def make_request_async(self, endpoint: str, method: str = "GET", token: str = None, data: Dict = None,
+                                 proxies: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        return await self.run_blocking(self.make_request, endpoint, method=method, token=token, data=data,
+                                       proxies=proxies)
+
+    async def roll_dice_async(self, token: str = None) -> Dict[str, Any]:
+        return await self.run_blocking(self.roll_dice, token=token)
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
 # Main class for automation
 class MagicNewtonAutomation:
-    def __init__(self):
+    def __init__(self, base_url: str = BASE_URL, token_file: str = "token.txt", proxy_file: str = "proxy.txt",
+                 header_file: str = "header.json", max_concurrency: int = MAX_CONCURRENCY,
+                 state_file: Optional[str] = STATE_FILE, **client_options):
         log_info("Initializing Magic Newton Automation")
-        self.proxy_manager = ProxyManager()
-        self.api_client = APIClient(BASE_URL)
+        self.proxy_manager = ProxyManager(proxy_file)
+        self.api_client = AsyncAPIClient(base_url, token_file, header_file, **client_options)
+        # Accounts run in parallel up to this limit; each account's own requests stay in order
+        self.max_concurrency = max(1, max_concurrency)
+        self.task_delay = (MIN_TASK_DELAY, MAX_TASK_DELAY)
+        # Time of each account's last completed roll, from userQuests or the last roll response
+        self.roll_times: Dict[str, datetime] = {}
+        self.state_store = StateStore(state_file) if state_file else None
 
     def display_user_info(self, user_data: Dict[str, Any], token: str):
         token_display = f"{token[:5]}...{token[-5:]}"
@@ -386,8 +676,10 @@ class MagicNewtonAutomation:
 
         if roll_quest:
             status = roll_quest['status']
-            roll_updated_at = datetime.fromisoformat(roll_quest['updatedAt'].replace('Z', '+00:00'))
+            roll_updated_at = parse_timestamp(roll_quest['updatedAt'])
             roll_date = roll_updated_at.date()
+            if status == "COMPLETED":
+                self.roll_times[token] = roll_updated_at
             
             if status == "COMPLETED" and roll_date == current_time.date():
                 log_info(f"🎲 Daily dice roll status: {Fore.GREEN}COMPLETED ✅")
@@ -402,10 +694,19 @@ class MagicNewtonAutomation:
             log_info(f"🎲 Daily dice roll status: {Fore.YELLOW}NOT STARTED 🆕")
             return False
 
-    def perform_rolls(self, token: str, proxies: Optional[Dict[str, str]] = None):
-        """Perform dice rolls until no more rolls are available"""
+    async def pause(self, seconds: int):
+        """Wait between tasks; the per-second countdown is only shown when accounts run one at a time"""
+        if self.max_concurrency == 1:
+            await asyncio.to_thread(countdown_timer, seconds)
+        else:
+            await asyncio.sleep(seconds)
+
+    async def perform_rolls(self, token: str, proxies: Optional[Dict[str, str]] = None) -> bool:
+        """Perform dice rolls until no more rolls are available.
+        Returns True once the server reports the day's rolls are used up."""
         token_display = f"{token[:5]}...{token[-5:]}"
         roll_count = 0
+        last_roll = None
         max_attempts = 10  # Safety limit
         
         log_info(f"Starting dice rolls for token {token_display}")
@@ -413,15 +714,15 @@ class MagicNewtonAutomation:
         while roll_count < max_attempts:
             # Random delay between rolls
             if roll_count > 0:
-                task_delay = get_random_delay(MIN_TASK_DELAY, MAX_TASK_DELAY)
-                log_info(f"Waiting {task_delay} seconds before next roll attempt...")
-                countdown_timer(task_delay)
+                task_delay = get_random_delay(*self.task_delay)
+                log_info(f"Waiting {task_delay} seconds before next roll attempt for token {token_display}...")
+                await self.pause(task_delay)
             
             # Attempt roll
             roll_count += 1
             log_info(f"Attempting dice roll #{roll_count} for token {token_display}")
             
-            roll_result = self.api_client.roll_dice(token=token)
+            roll_result = await self.api_client.roll_dice_async(token=token)
             roll_success = self.process_roll(roll_result, token)
             
             # Stop if roll failed or quest already completed
@@ -430,91 +731,201 @@ class MagicNewtonAutomation:
                     log_success(f"Successfully completed {roll_count-1} dice rolls for token {token_display}")
                 else:
                     log_warning(f"No dice rolls completed for token {token_display}")
-                break
+                if roll_result.get("error") == "Quest already completed":
+                    updated_at = last_roll.get('updatedAt') if last_roll else None
+                    self.roll_times[token] = parse_timestamp(updated_at) if updated_at else datetime.now(timezone.utc)
+                    return True
+                return False
+            last_roll = roll_result['data']
         
-        if roll_count >= max_attempts:
-            log_warning(f"Reached maximum roll attempts ({max_attempts}) for token {token_display}")
+        log_warning(f"Reached maximum roll attempts ({max_attempts}) for token {token_display}")
+        return False
+
+    def next_due(self, token: str, roll_completed: bool) -> datetime:
+        """Next time this account should be processed"""
+        completed_at = self.roll_times.get(token)
+        if roll_completed and completed_at:
+            return next_roll_window(completed_at)
+        # Rolls failed or were cut short: try again soon instead of waiting a day
+        return datetime.now(timezone.utc) + timedelta(seconds=RETRY_DELAY)
+
+    def select_proxy(self) -> Optional[Dict[str, str]]:
+        proxies = self.proxy_manager.get_proxy()
+        if proxies:
+            proxy_type = list(proxies.values())[0].split("://")[0] if "://" in list(proxies.values())[0] else "http"
+            log_info(f"Using {proxy_type} proxy: {list(proxies.values())[0]}")
+        else:
+            log_warning("No proxy available - proceeding without proxy")
+        return proxies
 
-    def run_automation(self):
-        while True:
-            try:
-                current_time = datetime.now(timezone.utc)
-                log_success(f"Current Time: {current_time.strftime('%Y-%m-%d %H:%M:%S UTC')}")
-                
-                for token in self.api_client.session_tokens:
-                    token_display = f"{token[:5]}...{token[-5:]}"
-                    log_info(f"Processing token: {token_display}")
-
-                    # Get a proxy for this request
-                    proxies = self.proxy_manager.get_proxy()
-                    if proxies:
-                        proxy_type = list(proxies.values())[0].split("://")[0] if "://" in list(proxies.values())[0] else "http"
-                        log_info(f"Using {proxy_type} proxy: {list(proxies.values())[0]}")
-                    else:
-                        log_warning("No proxy available - proceeding without proxy")
-
-                    # Get user data
-                    user_data = self.api_client.make_request(
-                        ENDPOINTS['user'],
-                        token=token,
-                        proxies=proxies
-                    )
-                    self.display_user_info(user_data, token)
-
-                    # Get quests data
-                    quests_data = self.api_client.make_request(
-                        ENDPOINTS['quests'],
-                        token=token,
-                        proxies=proxies
-                    )
-
-                    # Get user quests data
-                    user_quests_data = self.api_client.make_request(
-                        ENDPOINTS['user_quests'],
-                        token=token,
-                        proxies=proxies
-                    )
+    async def fetch_status(self, token: str, proxies: Optional[Dict[str, str]] = None):
+        """Fetch user, quests and user quests data concurrently and log how long each request took.
 
-# TODO: 完成一次性任务
-                    # Process quests
-                    self.process_quests(quests_data, user_quests_data, token)
+        The three GETs are independent, so the status pass takes about as long as the slowest one.
+        Returns (user_data, quests_data, user_quests_data).
+        """
+        token_display = f"{token[:5]}...{token[-5:]}"
 
-                    # Check if the daily dice roll is already completed
-                    roll_completed = self.check_roll_status(user_quests_data, token)
+        async def timed(endpoint: str):
+            started = time.perf_counter()
+            response = await self.api_client.make_request_async(endpoint, token=token, proxies=proxies)
+            return response, time.perf_counter() - started
 
-                    if roll_completed:
-                        log_success(f"Skipping dice rolls for token {token_display} - already completed today")
-                    else:
-                        # Perform all available rolls
-                        self.perform_rolls(token, proxies)
+        started = time.perf_counter()
+        names = ('user', 'quests', 'user_quests')
+        results = await asyncio.gather(*(timed(ENDPOINTS[name]) for name in names))
+        elapsed = time.perf_counter() - started
 
-                    # Task delay before processing next token
-                    task_delay = get_random_delay(MIN_TASK_DELAY, MAX_TASK_DELAY)
-                    log_info(f"Waiting {task_delay} seconds before processing next account")
-                    countdown_timer(task_delay)
+        timings = ", ".join(f"{ENDPOINTS[name]} {seconds * 1000:.0f} ms" for name, (_, seconds) in zip(names, results))
+        total = sum(seconds for _, seconds in results)
+        log_info(f"⏱️ Status for token {token_display}: {timings} - "
+                 f"took {elapsed * 1000:.0f} ms (sequential sum {total * 1000:.0f} ms)")
+        return tuple(response for response, _ in results)
 
-                # Update proxy file to remove used proxies after all accounts are processed
-                # self.proxy_manager.update_proxy_file()
-                
-                # Calculate next run time
-                loop_delay = get_random_delay(MIN_LOOP_DELAY, MAX_LOOP_DELAY)
-                next_run = current_time + timedelta(seconds=loop_delay)
-                log_success(f"All accounts processed. Next automatic run at: {next_run.strftime('%Y-%m-%d %H:%M:%S UTC')}")
-                countdown_timer(loop_delay)
-
-            except KeyboardInterrupt:
-                log_warning("Keyboard interrupt detected. Stopping automation...")
-                # Save headers before exiting
-                self.api_client.save_headers()
-                # Update proxy file to remove used proxies
-                #íself.proxy_manager.update_proxy_file()
-                break
-            except Exception as e:
-                log_error(f"Unexpected error occurred: {str(e)}")
-                import traceback
-                log_error(traceback.format_exc())
-                log_warning("Retrying in 10 seconds...")
-                time.sleep(10)
+    async def process_token(self, token: str) -> datetime:
+        """Run the user/quests/userQuests/roll flow for one account and return when it is due again"""
+        token_display = f"{token[:5]}...{token[-5:]}"
+        log_info(f"Processing token: {token_display}")
+
+        # Get a proxy for this request
+        proxies = self.select_proxy()
+
+        # Get user, quests and user quests data
+        user_data, quests_data, user_quests_data = await self.fetch_status(token, proxies)
+        self.display_user_info(user_data, token)
+
+# TODO: 完成一次性任务
+        # Process quests
+        self.process_quests(quests_data, user_quests_data, token)
+
+        # Check if the daily dice roll is already completed
+        roll_completed = self.check_roll_status(user_quests_data, token)
+
+        if roll_completed:
+            log_success(f"Skipping dice rolls for token {token_display} - already completed today")
+        else:
+            # Perform all available rolls
+            roll_completed = await self.perform_rolls(token, proxies)
+
+        due = self.next_due(token, roll_completed)
+        if self.state_store:
+            if roll_completed and token in self.roll_times:
+                self.record_roll(user_quests_data, self.roll_times[token])
+            # Only a finished day is worth skipping on restart; failed accounts are retried right away
+            self.state_store.record(token, user_data, user_quests_data, self.roll_times.get(token),
+                                    due if roll_completed else None)
+        return due
+
+    @staticmethod
+    def record_roll(user_quests_data: Dict[str, Any], completed_at: datetime):
+        """Mark the roll quest completed in the fetched userQuests so the stored statuses match the server"""
+        if not user_quests_data or 'data' not in user_quests_data:
+            return
+        roll_quest = next((uq for uq in user_quests_data['data'] if uq['questId'] == ROLL_QUEST_ID), None)
+        if roll_quest is None:
+            roll_quest = {'questId': ROLL_QUEST_ID}
+            user_quests_data['data'].append(roll_quest)
+        roll_quest['status'] = "COMPLETED"
+        roll_quest['updatedAt'] = completed_at.isoformat().replace('+00:00', 'Z')
+
+    def initial_schedule(self, tokens: List[str]) -> Dict[str, datetime]:
+        """When each account is first due, decided from the state store without any request:
+        accounts whose stored next window is still ahead wait for it, every other account is due now"""
+        now = datetime.now(timezone.utc)
+        schedule = {token: now for token in tokens}
+        if not self.state_store:
+            return schedule
+        accounts = self.state_store.load()
+        for token in tokens:
+            state = accounts.get(token)
+            if not state or not state['next_due'] or state['next_due'] <= now:
+                continue
+            schedule[token] = state['next_due']
+            if state['last_roll_at']:
+                self.roll_times[token] = state['last_roll_at']
+            profile = state['profile']
+            name = profile.get('email') or profile.get('displayName') or f"{token[:5]}...{token[-5:]}"
+            log_success(f"Skipping {name} - rolls already done, next due at {state['next_due'].strftime('%Y-%m-%d %H:%M:%S UTC')}")
+        return schedule
+
+    async def run_cycle(self, tokens: Optional[List[str]] = None) -> Dict[str, datetime]:
+        """Process the given tokens (default: all) once, at most max_concurrency accounts at a time.
+        Returns when each account is due again."""
+        slots = asyncio.Semaphore(self.max_concurrency)
+        if tokens is None:
+            tokens = self.api_client.session_tokens
+
+        async def run(token: str) -> datetime:
+            async with slots:
+                try:
+                    due = await self.process_token(token)
+                except Exception as e:
+                    log_error(f"Failed to process token {token[:5]}...{token[-5:]}: {str(e)}")
+                    due = datetime.now(timezone.utc) + timedelta(seconds=RETRY_DELAY)
+
+                # Task delay before this slot takes the next account
+                task_delay = get_random_delay(*self.task_delay)
+                log_info(f"Waiting {task_delay} seconds before processing next account")
+                await self.pause(task_delay)
+                return due
+
+        next_runs = await asyncio.gather(*(run(token) for token in tokens))
+        if self.state_store:
+            self.state_store.flush()
+        return dict(zip(tokens, next_runs))
+
+    def run_automation(self):
+        # Accounts the state store knows are done wait for their next window, the rest are due now;
+        # afterwards each one is rescheduled from its own last roll
+        scheduler = DeadlineScheduler()
+        for token, due_at in self.initial_schedule(self.api_client.session_tokens).items():
+            scheduler.schedule(token, due_at)
+        due = []
+        try:
+            while True:
+                try:
+                    due = scheduler.wait()
+                    if not due:
+                        log_warning("No tokens to process. Stopping automation...")
+                        break
+                    current_time = datetime.now(timezone.utc)
+                    log_success(f"Current Time: {current_time.strftime('%Y-%m-%d %H:%M:%S UTC')}")
+                    log_info(f"{len(due)} account(s) due, {len(scheduler)} waiting")
+                    
+                    next_runs = asyncio.run(self.run_cycle(due))
+                    for token, next_run in next_runs.items():
+                        scheduler.schedule(token, next_run)
+                    due = []
+
+                    # Update proxy file to remove used proxies after all accounts are processed
+                    # self.proxy_manager.update_proxy_file()
+                    
+                    next_run = scheduler.next_due()
+                    log_success(f"Due accounts processed. Next account due at: {next_run.strftime('%Y-%m-%d %H:%M:%S UTC')}")
+
+                except KeyboardInterrupt:
+                    log_warning("Keyboard interrupt detected. Stopping automation...")
+                    # Update proxy file to remove used proxies
+                    #íself.proxy_manager.update_proxy_file()
+                    break
+                except Exception as e:
+                    log_error(f"Unexpected error occurred: {str(e)}")
+                    import traceback
+                    log_error(traceback.format_exc())
+                    log_warning("Retrying in 10 seconds...")
+                    retry_at = datetime.now(timezone.utc) + timedelta(seconds=10)
+                    for token in due:
+                        scheduler.schedule(token, retry_at)
+                    due = []
+        finally:
+            self.close()
+
+    def close(self):
+        """Save headers and account state, then close the connection pool and the state database"""
+        self.api_client.save_headers()
+        self.api_client.close()
+        if self.state_store:
+            self.state_store.close()
 
 if __name__ == "__main__":
     # Display the rainbow banner
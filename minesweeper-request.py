@@ -1,23 +1,33 @@
 import requests
-import json
 import time
-import random
 from typing import Dict, Any, List, Optional, Tuple
-import sys
 import os
 from colorama import Fore, Style, init
+from bitboard import Bitboard, lowest_index, random_index
+from board_config import BoardConfig, config_from_state
+from replay_corpus import ReplayRecorder
+from solver_registry import create_solver
+from solver_stats import NULL_STATS, SolverStats
 
 # 初始化colorama
 init(autoreset=True)
 
 # 配置
-BASE_URL = "https://www.magicnewton.com/portal/api"
+# 可以用环境变量MAGICNEWTON_BASE_URL指向其他服务器，例如本地的mock_server.py
+BASE_URL = os.environ.get("MAGICNEWTON_BASE_URL", "https://www.magicnewton.com/portal/api")
 ENDPOINTS = {
     "user": "/user",
     "quests": "/quests",
     "user_quests": "/userQuests"
 }
 MINESWEEPER_QUEST_ID = "44ec9674-6125-4f88-9e18-8d6d6be8f156"
+REPLAY_DIR = "replays"  # 真实对局的回放语料库目录
+# 使用的求解器（solver_registry中注册的名称），可以用环境变量切换而不修改代码
+SOLVER_ENGINE = os.environ.get("MINESWEEPER_ENGINE", "bitboard")
+# 设置时把求解器每局的分阶段统计（solver_stats）追加写入这个JSON Lines文件
+STATS_FILE = os.environ.get("MINESWEEPER_STATS")
+# 是否使用opening_book.json中的开局库（设置为0时关闭）
+USE_OPENING_BOOK = os.environ.get("MINESWEEPER_OPENING_BOOK", "1") != "0"
 
 # 工具函数
 def log_info(message: str):
@@ -37,202 +47,160 @@ def format_separator(length: int = 70):
 
 # 扫雷游戏求解器
 class MinesweeperSolver:
-    def __init__(self, board_size: int = 10):
-        self.board_size = board_size
+    def __init__(self, rows: int = 10, cols: int = 10, stats: Optional[SolverStats] = None):
+        # 位棋盘：已揭示/未知/地雷/安全格子都是整数位掩码
+        self.bitboard = Bitboard(rows, cols)
+        # 可选的分阶段统计（update_board、analyze_board、get_next_move的耗时和计数器），默认不统计
+        self.stats = stats or NULL_STATS
         self.reset_board()
         
-    def reset_board(self):
-        # 初始化棋盘，None表示未知，数字表示周围地雷数，-1表示地雷
-        self.board = [[None for _ in range(self.board_size)] for _ in range(self.board_size)]
-        # 记录已经点击过的位置
-        self.clicked = set()
-        # 标记可能的地雷位置
-        self.potential_mines = set()
-        # 标记安全的位置
-        self.safe_moves = set()
+    def reset_board(self, rows: Optional[int] = None, cols: Optional[int] = None):
+        """清空棋盘，所有格子都是未知；给出rows/cols时改为新的棋盘尺寸"""
+        bb = self.bitboard
+        if (rows or bb.rows, cols or bb.cols) != (bb.rows, bb.cols):
+            self.bitboard = Bitboard(rows or bb.rows, cols or bb.cols)
+        self.bitboard.reset()
         
     def update_board(self, tiles: List[List[Optional[int]]]):
-        """根据API返回的棋盘状态更新内部棋盘"""
-        for y in range(len(tiles)):
-            for x in range(len(tiles[y])):
-                if tiles[y][x] is not None:
-                    self.board[y][x] = tiles[y][x]
-                    self.clicked.add((x, y))
+        """根据API返回的棋盘状态更新内部棋盘（尺寸与当前棋盘不同时按新尺寸重新开始）"""
+        started = self.stats.start()
+        rows = len(tiles)
+        cols = len(tiles[0]) if rows else 0
+        if (rows, cols) != (self.bitboard.rows, self.bitboard.cols):
+            self.reset_board(rows, cols)
+        self.bitboard.load(tiles)
         
         # 更新后分析棋盘
         self.analyze_board()
-    
-    def get_neighbors(self, x: int, y: int) -> List[Tuple[int, int]]:
-        """获取指定位置的相邻位置"""
-        neighbors = []
-        for dx in [-1, 0, 1]:
-            for dy in [-1, 0, 1]:
-                if dx == 0 and dy == 0:
-                    continue
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < self.board_size and 0 <= ny < self.board_size:
-                    neighbors.append((nx, ny))
-        return neighbors
+        self.stats.stop("update_board", started)
     
     def analyze_board(self):
         """分析棋盘，标记可能的地雷和安全位置"""
-        self.safe_moves.clear()
-        new_potential_mines = set()
+        started = self.stats.start()
+        bb = self.bitboard
+        neighbors = bb.neighbors
+        numbers = bb.numbers
+        unknown = bb.unknown
+        marked_mines = bb.mines
+        new_potential_mines = 0
+        safe_moves = 0
         
         # 分析每个已知数字周围的未点击格子
-        for y in range(self.board_size):
-            for x in range(self.board_size):
-                if self.board[y][x] is not None and self.board[y][x] > 0:
-                    # 获取周围未点击的位置
-                    unclicked_neighbors = [(nx, ny) for nx, ny in self.get_neighbors(x, y) 
-                                          if (nx, ny) not in self.clicked and self.board[ny][nx] is None]
-                    mines_needed = self.board[y][x]
-                    
-                    # 如果周围未点击的格子数量等于需要的地雷数，那么这些都是地雷
-                    if len(unclicked_neighbors) == mines_needed:
-                        for nx, ny in unclicked_neighbors:
-                            new_potential_mines.add((nx, ny))
-                    
-                    # 检查已标记的地雷
-                    marked_mines = [(nx, ny) for nx, ny in self.get_neighbors(x, y) 
-                                   if (nx, ny) in self.potential_mines]
-                    
-                    # 如果已标记的地雷数量等于需要的地雷数，其余未点击的格子都是安全的
-                    if len(marked_mines) == mines_needed:
-                        for nx, ny in unclicked_neighbors:
-                            if (nx, ny) not in self.potential_mines:
-                                self.safe_moves.add((nx, ny))
+        pending = bb.positive
+        while pending:
+            low = pending & -pending
+            pending ^= low
+            idx = low.bit_length() - 1
+            mines_needed = numbers[idx]
+            unclicked_neighbors = neighbors[idx] & unknown
+            
+            # 如果周围未点击的格子数量等于需要的地雷数，那么这些都是地雷
+            if unclicked_neighbors.bit_count() == mines_needed:
+                new_potential_mines |= unclicked_neighbors
+            
+            # 如果已标记的地雷数量等于需要的地雷数，其余未点击的格子都是安全的
+            if (neighbors[idx] & marked_mines).bit_count() == mines_needed:
+                safe_moves |= unclicked_neighbors & ~marked_mines
         
-        self.potential_mines = new_potential_mines
+        bb.mines = new_potential_mines
         
         # 如果没有找到安全的移动，尝试找到0值周围的格子（它们肯定是安全的）
-        if not self.safe_moves:
-            for y in range(self.board_size):
-                for x in range(self.board_size):
-                    if self.board[y][x] == 0:
-                        for nx, ny in self.get_neighbors(x, y):
-                            if (nx, ny) not in self.clicked and self.board[ny][nx] is None:
-                                self.safe_moves.add((nx, ny))
+        if not safe_moves:
+            safe_moves = bb.dilate(bb.zeros) & unknown
+        
+        bb.safe = safe_moves
+        stats = self.stats
+        stats.stop("analyze_board", started)
+        if stats:
+            stats.count("constraints", bb.positive.bit_count())
+            stats.count("mines", new_potential_mines.bit_count())
+            stats.count("safe", safe_moves.bit_count())
     
     def get_next_move(self) -> Tuple[int, int]:
         """获取下一步应该点击的位置"""
+        started = self.stats.start()
+        try:
+            return self._choose_move()
+        finally:
+            self.stats.stop("get_next_move", started)
+    
+    def _choose_move(self) -> Tuple[int, int]:
+        """get_next_move的选择逻辑"""
+        bb = self.bitboard
+        
         # 如果有已知安全的位置，优先选择
-        if self.safe_moves:
-            move = self.safe_moves.pop()
-            return move
+        if bb.safe:
+            idx = lowest_index(bb.safe)
+            bb.safe &= bb.safe - 1
+            return bb.coords(idx)
         
         # 如果没有确定安全的位置，使用概率策略
         # 1. 找出所有未点击且不在潜在地雷列表中的位置
-        candidates = []
-        for y in range(self.board_size):
-            for x in range(self.board_size):
-                if (x, y) not in self.clicked and (x, y) not in self.potential_mines:
-                    candidates.append((x, y))
+        unknown = bb.unknown
+        candidates = unknown & ~bb.mines
         
         if not candidates:
-            # 如果没有明显安全的选择，则尝试找边缘概率最低的位置
-            edge_tiles = []
-            for y in range(self.board_size):
-                for x in range(self.board_size):
-                    if (x, y) not in self.clicked and self.board[y][x] is None:
-                        # 检查是否是边缘（至少有一个邻居已被点击）
-                        for nx, ny in self.get_neighbors(x, y):
-                            if (nx, ny) in self.clicked:
-                                edge_tiles.append((x, y))
-                                break
-            
+            # 所有未点击的位置都是潜在地雷，只能从边缘（至少有一个邻居已被点击）选择第一个
+            edge_tiles = unknown & bb.dilate(bb.revealed)
             if edge_tiles:
-                # 计算每个边缘位置的风险评分
-                risk_scores = {}
-                for x, y in edge_tiles:
-                    # 如果位置在潜在地雷列表中，给予高风险
-                    if (x, y) in self.potential_mines:
-                        risk_scores[(x, y)] = float('inf')
-                        continue
-                    
-                    risk = 0
-                    revealed_neighbors = 0
-                    for nx, ny in self.get_neighbors(x, y):
-                        if (nx, ny) in self.clicked and self.board[ny][nx] is not None:
-                            if self.board[ny][nx] > 0:  # 数字越大风险越高
-                                risk += self.board[ny][nx]
-                            revealed_neighbors += 1
-                    
-                    if revealed_neighbors > 0:
-                        risk_scores[(x, y)] = risk / revealed_neighbors
-                    else:
-                        risk_scores[(x, y)] = 0
-                
-                # 选择风险最低的位置
-                if risk_scores:
-                    return min(risk_scores.items(), key=lambda x: x[1])[0]
+                return bb.coords(lowest_index(edge_tiles))
             
             # 如果上述策略都不奏效，随机选择一个未点击的位置
-            available_moves = []
-            for y in range(self.board_size):
-                for x in range(self.board_size):
-                    if (x, y) not in self.clicked:
-                        available_moves.append((x, y))
-            
-            if not available_moves:
+            if not unknown:
                 raise ValueError("没有可用的移动位置")
-            
-            return random.choice(available_moves)
+            return bb.coords(random_index(unknown))
         
         # 优先选择周围已有数字的位置（更多信息可用于推理）
-        informed_moves = []
-        for x, y in candidates:
-            for nx, ny in self.get_neighbors(x, y):
-                if (nx, ny) in self.clicked and self.board[ny][nx] is not None and self.board[ny][nx] > 0:
-                    informed_moves.append((x, y))
-                    break
-        
+        informed_moves = candidates & bb.dilate(bb.positive)
         if informed_moves:
-            return random.choice(informed_moves)
+            return bb.coords(random_index(informed_moves))
         
         # 如果没有更多信息，随机选择一个候选位置
-        if candidates:
-            return random.choice(candidates)
-        
-        # 最后的后备策略：随机选择一个未点击的位置
-        available_moves = []
-        for y in range(self.board_size):
-            for x in range(self.board_size):
-                if (x, y) not in self.clicked:
-                    available_moves.append((x, y))
-        
-        if not available_moves:
-            raise ValueError("没有可用的移动位置")
-        
-        return random.choice(available_moves)
+        return bb.coords(random_index(candidates))
     
     def print_board(self):
         """打印当前棋盘状态"""
-        print(f"\n{format_separator(self.board_size * 3)}")
-        print("  " + " ".join(f"{i}" for i in range(self.board_size)))
-        for y in range(self.board_size):
-            row = f"{y} "
-            for x in range(self.board_size):
-                if self.board[y][x] is None:
-                    row += "□ "
-                elif self.board[y][x] == -1:
-                    row += f"{Fore.RED}* {Style.RESET_ALL}"
-                elif self.board[y][x] == 0:
-                    row += "  "
-                else:
-                    row += f"{self.board[y][x]} "
-            print(row)
-        print(f"{format_separator(self.board_size * 3)}")
+        bb = self.bitboard
+        print_tiles([[bb.value(x, y) for x in range(bb.cols)] for y in range(bb.rows)])
+
+def print_tiles(tiles: List[List[Optional[int]]]):
+    """打印服务器格式的棋盘"""
+    cols = len(tiles[0]) if tiles else 0
+    print(f"\n{format_separator(cols * 3)}")
+    print("  " + " ".join(f"{i}" for i in range(cols)))
+    for y, tiles_row in enumerate(tiles):
+        row = f"{y} "
+        for value in tiles_row:
+            if value is None:
+                row += "□ "
+            elif value == -1:
+                row += f"{Fore.RED}* {Style.RESET_ALL}"
+            elif value == 0:
+                row += "  "
+            else:
+                row += f"{value} "
+        print(row)
+    print(f"{format_separator(cols * 3)}")
 
 # API客户端
 class MinesweeperAPIClient:
-    def __init__(self, token_file: str = "token.txt"):
+    def __init__(self, token_file: str = "token.txt", recorder: Optional[ReplayRecorder] = None,
+                 engine: str = SOLVER_ENGINE, base_url: str = BASE_URL):
         self.token_file = token_file
+        self.base_url = base_url
         self.session = requests.Session()
         self.token = self.load_token()
         self.user_id = None
         self.user_quest_id = None
-        self.solver = MinesweeperSolver()
+        # 求解器按名称从solver_registry创建，start_game得到棋盘配置后按配置重新创建
+        self.engine = engine
+        # 可选的求解器分阶段统计，每局结束时写入STATS_FILE
+        self.stats = SolverStats() if STATS_FILE else None
+        self.solver = create_solver(engine, stats=self.stats, opening_book=USE_OPENING_BOOK)
+        # 可选的回放记录器，记录每次点击前的棋盘、点击位置和结果
+        self.recorder = recorder
+        self.tiles = None
+        self.config: Optional[BoardConfig] = None  # 当前一局的棋盘配置，由start_game的响应确定
         
     def load_token(self) -> str:
         """从文件中加载token"""
@@ -261,7 +229,7 @@ class MinesweeperAPIClient:
     
     def make_request(self, endpoint: str, method: str = "GET", data: Dict = None) -> Dict[str, Any]:
         """发送API请求"""
-        url = f"{BASE_URL}{endpoint}"
+        url = f"{self.base_url}{endpoint}"
         
         try:
             if method == "GET":
@@ -316,9 +284,15 @@ class MinesweeperAPIClient:
             
             # 更新棋盘状态
             if '_minesweeper' in response['data'] and 'tiles' in response['data']['_minesweeper']:
-                self.solver.reset_board()
-                self.solver.update_board(response['data']['_minesweeper']['tiles'])
-                self.solver.print_board()
+                self.tiles = response['data']['_minesweeper']['tiles']
+                self.config = config_from_state(response['data']['_minesweeper'])
+                log_info(f"棋盘: {self.config.rows}x{self.config.cols}, 地雷: {self.config.mines or '未知'}")
+                self.solver = create_solver(self.engine, self.config.rows, self.config.cols, self.config.mines,
+                                            stats=self.stats, opening_book=USE_OPENING_BOOK)
+                self.solver.observe(self.tiles)
+                print_tiles(self.tiles)
+                if self.recorder:
+                    self.recorder.new_game()
         else:
             log_error("开始游戏失败")
             
@@ -345,13 +319,19 @@ class MinesweeperAPIClient:
         
         # 更新棋盘状态
         if 'data' in response and '_minesweeper' in response['data'] and 'tiles' in response['data']['_minesweeper']:
-            self.solver.update_board(response['data']['_minesweeper']['tiles'])
-            self.solver.print_board()
+            tiles = response['data']['_minesweeper']['tiles']
+            self.solver.observe(tiles)
+            print_tiles(tiles)
             
             # 检查游戏是否结束
             game_over = response['data']['_minesweeper'].get('gameOver', False)
             exploded = response['data']['_minesweeper'].get('exploded', False)
             
+            # 记录点击前的棋盘和这次点击的结果
+            if self.recorder and self.tiles is not None:
+                self.recorder.record(self.tiles, x, y, game_over, exploded)
+            self.tiles = tiles
+            
             if game_over:
                 if exploded:
                     log_error("踩到地雷了！游戏结束")
@@ -364,7 +344,7 @@ class MinesweeperAPIClient:
     
     def play_game(self, difficulty: str = "Easy", max_moves: int = 50):
         """自动玩一局扫雷游戏"""
-        log_info(f"开始一局{difficulty}难度的扫雷游戏")
+        log_info(f"开始一局{difficulty}难度的扫雷游戏（求解器: {self.engine}）")
         
         # 获取用户信息
         self.get_user_info()
@@ -383,7 +363,11 @@ class MinesweeperAPIClient:
             
             try:
                 # 获取下一步移动
-                x, y = self.solver.get_next_move()
+                move = self.solver.next_move()
+                if move is None:
+                    log_warning("没有可以点击的格子")
+                    break
+                x, y = move
                 
                 # 点击方块
                 response = self.click_tile(x, y)
@@ -404,6 +388,10 @@ class MinesweeperAPIClient:
         
         if move_count >= max_moves:
             log_warning(f"达到最大步数限制({max_moves})，停止游戏")
+        
+        if self.stats is not None:
+            self.stats.end_game(engine=self.engine, difficulty=difficulty, moves=move_count)
+            self.stats.dump(STATS_FILE)
 
 # 主函数
 def main():
@@ -412,8 +400,9 @@ def main():
     print(f"{Fore.GREEN}{'=' * 70}\n")
     
     try:
-        client = MinesweeperAPIClient()
-        client.play_game(difficulty="Easy")
+        with ReplayRecorder(REPLAY_DIR) as recorder:
+            client = MinesweeperAPIClient(recorder=recorder)
+            client.play_game(difficulty="Easy")
     except KeyboardInterrupt:
         log_warning("检测到键盘中断，停止程序...")
     except Exception as e:
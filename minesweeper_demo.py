@@ -123,8 +123,8 @@ def play_game():
         # 获取当前棋盘状态
         current_board = game.get_board_for_solver()
         
-        # 获取安全坐标
-        safe_coordinates = get_safe_moves(current_board)
+        # 获取安全坐标（地雷总数已知，内部格子也有精确概率）
+        safe_coordinates = get_safe_moves(current_board, total_mines=game.num_mines)
         
         if not safe_coordinates:
             print("无法确定安全坐标，游戏结束")
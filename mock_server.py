@@ -0,0 +1,347 @@
+"""
+本地模拟的Magic Newton服务器，用于集成测试和压力测试，不访问magicnewton.com
+
+实现的接口（路径前缀默认为/portal/api，与BASE_URL相同）:
+    GET  /user        -- {"data": 用户资料}
+    GET  /quests      -- {"data": 任务目录}
+    GET  /userQuests  -- {"data": 当前用户的任务记录}
+    POST /userQuests  -- 按questId处理:
+        掷骰子任务    每天最多rolls_per_day次，每次在_diceRolls中追加点数；次数用完后状态为COMPLETED，
+                      当天再掷返回400 "Quest already completed"
+        扫雷任务      metadata.action为START（difficulty）时开始新的一局，CLICK（userQuestId, x, y）时点击，
+                      返回的data["_minesweeper"]为{"tiles", "gameOver", "exploded"}；对局由SimulatedGame模拟。
+                      每天完成一局，当天完成后START和CLICK都返回400 "Quest already completed"
+        其他任务      第一次提交时完成，之后返回400 "Quest already completed"
+
+用户按cookie中的__Secure-next-auth.session-token区分，第一次出现的token自动创建用户。
+可以配置每个请求的延迟和随机失败（返回500），以及随机数种子。
+
+用法:
+    python mock_server.py --port 8080 --latency 0.05 --error-rate 0.1
+    MAGICNEWTON_BASE_URL=http://127.0.0.1:8080/portal/api python main.py
+
+在测试中:
+    with MockServer(latency=0.01) as server:
+        client = MinesweeperAPIClient(base_url=server.url)
+"""
+import argparse
+import json
+from collections import deque
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from board_config import DIFFICULTIES, config_for
+from simulator import SimulatedGame
+
+ROLL_QUEST_ID = "f56c760b-2186-40cb-9cbc-3af4a3dc20e2"
+MINESWEEPER_QUEST_ID = "44ec9674-6125-4f88-9e18-8d6d6be8f156"
+API_PREFIX = "/portal/api"
+COOKIE_NAME = "__Secure-next-auth.session-token"
+
+QUESTS = [
+    {"id": ROLL_QUEST_ID, "title": "Daily Dice Roll"},
+    {"id": MINESWEEPER_QUEST_ID, "title": "Minesweeper"},
+    {"id": "a1f1b8c6-0f51-4c45-9d0e-6a0c1c7d0001", "title": "Follow X"},
+    {"id": "a1f1b8c6-0f51-4c45-9d0e-6a0c1c7d0002", "title": "Follow Discord"},
+    {"id": "a1f1b8c6-0f51-4c45-9d0e-6a0c1c7d0003", "title": "Connect Guild"},
+]
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def _timestamp(moment):
+    """与服务器相同的ISO时间格式，如2025-03-01T08:00:00.000Z"""
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.") + f"{moment.microsecond // 1000:03d}Z"
+
+
+class MockState:
+    """
+    服务器的全部状态：用户、任务记录和进行中的扫雷对局，所有方法在锁内执行
+
+    方法返回(HTTP状态码, JSON响应体)；响应体引用内部的记录，需要在锁内序列化
+    """
+
+    def __init__(self, rolls_per_day=5, seed=None, clock=_now):
+        self.rolls_per_day = rolls_per_day
+        self.rng = random.Random(seed)
+        self.clock = clock
+        self.users = {}        # token -> 用户资料
+        self.user_quests = {}  # token -> {questId: 任务记录}
+        self.games = {}        # userQuestId -> 进行中的SimulatedGame，结束或被新的一局替换时删除
+        self.lock = threading.Lock()
+
+    def user(self, token):
+        if token not in self.users:
+            index = len(self.users) + 1
+            self.users[token] = {
+                "id": str(uuid.UUID(int=self.rng.getrandbits(128))),
+                "name": f"user{index}",
+                "email": f"user{index}@example.com",
+                "refCode": f"REF{index:05d}",
+                "auths": [{"displayName": f"User {index}"}],
+            }
+            self.user_quests[token] = {}
+        return self.users[token]
+
+    def get_user(self, token):
+        return 200, {"data": self.user(token)}
+
+    def get_quests(self, token):
+        return 200, {"data": QUESTS}
+
+    def get_user_quests(self, token):
+        self.user(token)
+        return 200, {"data": list(self.user_quests[token].values())}
+
+    def post_user_quest(self, token, body):
+        self.user(token)
+        quest_id = body.get("questId")
+        metadata = body.get("metadata") or {}
+        if quest_id == ROLL_QUEST_ID:
+            return self._roll(token)
+        if quest_id == MINESWEEPER_QUEST_ID:
+            return self._minesweeper(token, metadata)
+        if quest_id not in {quest["id"] for quest in QUESTS}:
+            return 404, {"message": "Quest not found"}
+        record = self.user_quests[token].get(quest_id)
+        if record is not None:
+            return 400, {"message": "Quest already completed"}
+        record = self._record(token, quest_id, "COMPLETED")
+        return 200, {"data": record}
+
+    def _record(self, token, quest_id, status):
+        now = _timestamp(self.clock())
+        record = {"id": str(uuid.UUID(int=self.rng.getrandbits(128))), "questId": quest_id,
+                  "userId": self.users[token]["id"], "status": status, "credits": 0,
+                  "createdAt": now, "updatedAt": now}
+        self.user_quests[token][quest_id] = record
+        return record
+
+    def _roll(self, token):
+        now = self.clock()
+        record = self.user_quests[token].get(ROLL_QUEST_ID)
+        if record is not None and record["updatedAt"][:10] != now.strftime("%Y-%m-%d"):
+            # 新的一天，重新开始掷骰子
+            record = None
+        if record is None:
+            record = self._record(token, ROLL_QUEST_ID, "PENDING")
+            record["_diceRolls"] = []
+        elif record["status"] == "COMPLETED":
+            return 400, {"message": "Quest already completed"}
+
+        value = self.rng.randint(1, 6)
+        record["_diceRolls"].append(value)
+        record["credits"] += value
+        record["updatedAt"] = _timestamp(now)
+        if len(record["_diceRolls"]) >= self.rolls_per_day:
+            record["status"] = "COMPLETED"
+        return 200, {"data": record}
+
+    def _minesweeper(self, token, metadata):
+        action = metadata.get("action")
+        record = self.user_quests[token].get(MINESWEEPER_QUEST_ID)
+        if action == "START":
+            if record is not None and record["status"] == "COMPLETED" and \
+                    record["updatedAt"][:10] == self.clock().strftime("%Y-%m-%d"):
+                return 400, {"message": "Quest already completed"}
+            try:
+                rows, cols, mines = config_for(metadata.get("difficulty", "Easy"))
+            except ValueError as e:
+                return 400, {"message": str(e)}
+            if record is not None:
+                self.games.pop(record["id"], None)
+            record = self._record(token, MINESWEEPER_QUEST_ID, "PENDING")
+            game = SimulatedGame(rows, cols, mines, seed=self.rng.getrandbits(32))
+            self.games[record["id"]] = game
+            record["_minesweeper"] = game.state()
+            return 200, {"data": record}
+        if action == "CLICK":
+            if record is None or record["id"] != metadata.get("userQuestId"):
+                return 400, {"message": "Game not found"}
+            if record["status"] == "COMPLETED":
+                return 400, {"message": "Quest already completed"}
+            game = self.games[record["id"]]
+            x, y = metadata.get("x"), metadata.get("y")
+            if not (isinstance(x, int) and isinstance(y, int) and 0 <= x < game.cols and 0 <= y < game.rows):
+                return 400, {"message": "Invalid tile"}
+            record["_minesweeper"] = game.click(x, y)
+            record["updatedAt"] = _timestamp(self.clock())
+            if game.game_over:
+                record["status"] = "COMPLETED"
+                record["credits"] = 10 if game.win else 0
+                del self.games[record["id"]]
+            return 200, {"data": record}
+        return 400, {"message": f"Unknown action: {action}"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """把请求交给server.state处理，按server的配置注入延迟和失败"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _dispatch(self, method):
+        server = self.server
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if server.latency:
+            time.sleep(server.latency() if callable(server.latency) else server.latency)
+
+        path = self.path.split("?", 1)[0]
+        if server.prefix and path.startswith(server.prefix):
+            path = path[len(server.prefix):]
+        token = self._token()
+        with server.state.lock:
+            server.requests += 1
+            server.history.append((method, path, token))
+            inject = server.error_rate and server.state.rng.random() < server.error_rate
+        if inject:
+            status, payload = 500, {"message": "Injected failure"}
+        elif token is None:
+            status, payload = 401, {"message": "Unauthorized"}
+        else:
+            with server.state.lock:
+                status, body = self._route(method, path, token, raw)
+                payload = json.dumps(body)
+        self._send(status, payload)
+
+    def _route(self, method, path, token, raw):
+        state = self.server.state
+        routes = {
+            ("GET", "/user"): state.get_user,
+            ("GET", "/quests"): state.get_quests,
+            ("GET", "/userQuests"): state.get_user_quests,
+        }
+        if (method, path) in routes:
+            return routes[(method, path)](token)
+        if (method, path) == ("POST", "/userQuests"):
+            try:
+                body = json.loads(raw or b"{}")
+            except ValueError:
+                return 400, {"message": "Invalid JSON"}
+            return state.post_user_quest(token, body)
+        return 404, {"message": "Not found"}
+
+    def _token(self):
+        for part in (self.headers.get("Cookie") or "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == COOKIE_NAME and value:
+                return value
+        return None
+
+    def _send(self, status, payload):
+        """payload为响应体或者已经序列化的JSON字符串"""
+        if not isinstance(payload, str):
+            payload = json.dumps(payload)
+        payload = payload.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class MockServer:
+    """
+    在后台线程中运行的模拟服务器
+
+    参数:
+    host, port -- 监听地址，port为0时由系统分配空闲端口
+    latency -- 每个请求的延迟（秒），可以是返回秒数的函数，例如lambda: random.uniform(0.05, 0.2)
+    error_rate -- 每个请求返回500的概率
+    rolls_per_day -- 每天可以掷骰子的次数
+    seed -- 用户ID、骰子点数、地雷布局和失败注入的随机数种子
+    prefix -- 接口的路径前缀
+    history_size -- history保留的最近请求数，长时间的压力测试中内存不会一直增长
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, error_rate=0.0, rolls_per_day=5, seed=None,
+                 prefix=API_PREFIX, verbose=False, history_size=10000):
+        self.httpd = ThreadingHTTPServer((host, port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = self.state = MockState(rolls_per_day, seed)
+        self.httpd.latency = latency
+        self.httpd.error_rate = error_rate
+        self.httpd.prefix = prefix
+        self.httpd.verbose = verbose
+        self.httpd.requests = 0
+        self.httpd.history = deque(maxlen=history_size)
+        self._thread = None
+
+    @property
+    def url(self):
+        """客户端使用的BASE_URL"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{self.httpd.prefix}"
+
+    @property
+    def requests(self):
+        """收到的请求总数"""
+        return self.httpd.requests
+
+    @property
+    def history(self):
+        """按收到的顺序记录的最近history_size个请求(方法, 路径, token)的列表快照"""
+        with self.state.lock:
+            return list(self.httpd.history)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地模拟的Magic Newton服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="在延迟上增加0到jitter秒的随机量")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="请求返回500的概率")
+    parser.add_argument("--rolls-per-day", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    latency = args.latency
+    if args.jitter:
+        latency = lambda: args.latency + random.uniform(0, args.jitter)
+    server = MockServer(args.host, args.port, latency, args.error_rate, args.rolls_per_day, args.seed,
+                        verbose=True)
+    print(f"模拟服务器: {server.url}（难度: {', '.join(DIFFICULTIES)}）")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+开局库：每种棋盘配置的最佳第一下，以及常见开局棋盘的下一步
+
+每局都从空棋盘开始，第一下之后的棋盘也只有有限的几种常见形状，每局都重新分析这些棋盘是浪费。
+开局库离线用simulator.SimulatedGame模拟生成:
+    1. 对每个候选的第一下（按对称性只考虑左上的四分之一）模拟若干局，统计第一下揭示的格子数；
+       揭示最多的几个候选，以及中间位置和角落再用求解器各玩若干局（所有候选使用相同的种子）。
+       默认点中间；只有候选胜率的Wilson区间下限高于中间位置的上限时才换成该候选
+       （有多个时取胜率最高的，相同时按揭示的格子数），胜率相差在噪声以内时不换
+    2. 从选出的第一下模拟大量开局，统计第一下之后的棋盘，出现次数最多的棋盘用求解器
+       （已知地雷总数，得到精确概率）算出下一步。常见的主要是没有连锁揭示的小开局，
+       这时求解器往往只能猜，开局库省掉的正是这一步的枚举
+
+生成的表按"行x列x地雷数"存放，棋盘用pattern_key压缩成16位十六进制的键，坐标与服务器相同为(x, y)。
+
+用法:
+    python opening_book.py --difficulty Easy Medium --output opening_book.json
+
+求解器通过opening_book参数使用开局库，default_book()在第一次使用时才读取DEFAULT_PATH。
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import time
+from collections import Counter
+
+import numpy as np
+
+from board_codec import UNKNOWN, tiles_to_array
+from board_config import DIFFICULTIES, config_for
+from simulator import SimulatedGame
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.json")
+
+_DEFAULT_BOOK = None
+
+
+def config_key(rows, cols, mines):
+    """开局库中一种棋盘配置的键"""
+    return f"{rows}x{cols}x{mines}"
+
+
+def pattern_key(board):
+    """int8棋盘（或服务器格式的tiles）的紧凑键：尺寸和内容的8字节blake2b摘要"""
+    board = np.ascontiguousarray(tiles_to_array(board))
+    digest = hashlib.blake2b(board.tobytes(), digest_size=8)
+    digest.update(np.array(board.shape, dtype=np.int16).tobytes())
+    return digest.hexdigest()
+
+
+class OpeningBook:
+    """
+    开局库的查询接口
+
+    参数:
+    entries -- {config_key: {"first": [x, y], "follow_ups": {pattern_key: [x, y]}, ...}}，
+               其余字段（开局大小、胜率、覆盖率等）只用于记录生成时的统计
+    """
+
+    def __init__(self, entries=None):
+        self.entries = entries or {}
+
+    @classmethod
+    def load(cls, path=DEFAULT_PATH):
+        """读取开局库文件，文件不存在时返回空的开局库"""
+        if not os.path.exists(path):
+            return cls()
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def save(self, path=DEFAULT_PATH):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, separators=(",", ":"), sort_keys=True)
+
+    def __bool__(self):
+        return bool(self.entries)
+
+    def first_click(self, rows, cols, mines):
+        """这种配置的第一下(x, y)，没有收录时返回None"""
+        entry = self.entries.get(config_key(rows, cols, mines))
+        return tuple(entry["first"]) if entry else None
+
+    def follow_up(self, board, mines):
+        """
+        棋盘在开局库中时返回下一步的(x, y)，否则返回None
+
+        参数:
+        board -- int8棋盘或服务器格式的tiles
+        mines -- 整局的地雷总数，未知时不查询
+        """
+        if mines is None:
+            return None
+        board = tiles_to_array(board)
+        entry = self.entries.get(config_key(*board.shape, mines))
+        if not entry:
+            return None
+        move = entry["follow_ups"].get(pattern_key(board))
+        return tuple(move) if move else None
+
+    def lookup(self, board, mines):
+        """
+        求解器在分析之前调用：空棋盘返回第一下，收录的开局棋盘返回下一步，都是(x, y)；
+        其他棋盘、地雷总数未知或者给出的格子已经揭示时返回None
+        """
+        if mines is None or not self.entries:
+            return None
+        board = tiles_to_array(board)
+        if (board == UNKNOWN).all():
+            move = self.first_click(*board.shape, mines)
+        else:
+            move = self.follow_up(board, mines)
+        if move is None or board[move[1], move[0]] != UNKNOWN:
+            return None
+        return move
+
+
+def resolve_book(opening_book):
+    """求解器的opening_book参数：True表示default_book()，None/False表示不使用，否则原样返回"""
+    if opening_book is True:
+        return default_book()
+    return opening_book or None
+
+
+def default_book():
+    """DEFAULT_PATH中的开局库，第一次调用时读取，之后复用；文件不存在时为空的开局库"""
+    global _DEFAULT_BOOK
+    if _DEFAULT_BOOK is None:
+        _DEFAULT_BOOK = OpeningBook.load()
+    return _DEFAULT_BOOK
+
+
+def _canonical(move, rows, cols):
+    """把(x, y)按对称性映射到左上四分之一"""
+    x, y = move
+    return min(x, cols - 1 - x), min(y, rows - 1 - y)
+
+
+def opening_sizes(rows, cols, mines, games=500, seed=0):
+    """
+    每个候选第一下的平均揭示格子数
+
+    按对称性只模拟左上四分之一（含中线）的格子，所有候选使用相同的种子
+
+    返回:
+    dict -- {(x, y): 平均揭示的格子数}
+    """
+    seeds = np.random.SeedSequence(seed).generate_state(games).tolist()
+    sizes = {}
+    for y in range((rows + 1) // 2):
+        for x in range((cols + 1) // 2):
+            total = 0
+            for game_seed in seeds:
+                game = SimulatedGame(rows, cols, mines, seed=game_seed)
+                game.click(x, y)
+                total += int((game.board >= 0).sum())
+            sizes[(x, y)] = total / games
+    return sizes
+
+
+def win_rate(solver_name, rows, cols, mines, first, games=200, seed=0):
+    """用tournament.play_game从first开始玩games局的胜率"""
+    # 求解器模块会导入本模块，所以在函数内导入
+    from tournament import game_seeds, play_game
+
+    wins = sum(play_game(solver_name, game_seed, rows, cols, mines, first_click=first)[0]
+               for game_seed in game_seeds(seed, games))
+    return wins / games
+
+
+def significant_first_click(rates, center, games, tie_break=None):
+    """
+    在rates（{(x, y): 胜率}，每个候选games局）中选第一下：默认是center，
+    候选胜率的95% Wilson区间下限高于center的上限时才换成它；有多个时取胜率最高的，相同时按tie_break
+    """
+    from tournament import wilson_interval
+
+    def interval(move):
+        return wilson_interval(round(rates[move] * games), games)
+
+    center_high = interval(center)[1]
+    better = [move for move in rates if move != center and interval(move)[0] > center_high]
+    if not better:
+        return center
+    return max(better, key=lambda move: (rates[move], tie_break(move) if tie_break else 0))
+
+
+def best_follow_up(board, mines):
+    """已知地雷总数时精确求解器给出的下一步(x, y)"""
+    from MineSweeper import MinesweeperSolver
+
+    rows, cols = board.shape
+    # 求解器在概率相同的格子之间随机选择，固定种子让生成的开局库可以复现
+    random.seed(0)
+    solver = MinesweeperSolver(total_mines=mines, rows=rows, cols=cols)
+    solver.update_board(board)
+    i, j = solver.get_next_move()
+    return [j, i]
+
+
+def build_entry(rows, cols, mines, solver_name="incremental", games=200, openings=20000,
+                patterns=512, candidates=4, seed=0):
+    """
+    生成一种棋盘配置的开局库条目
+
+    参数:
+    solver_name -- 评估第一下胜率使用的求解器（solver_registry中的名称）
+    games -- 每个候选第一下评估胜率的局数，局数少时胜率的差别不显著，第一下总是中间位置
+    openings -- 统计开局棋盘时模拟的局数
+    patterns -- 收录的开局棋盘数量上限，只收录出现不止一次的棋盘
+    candidates -- 除中间位置和角落外参与胜率评估的候选数量（按平均揭示格子数排序）
+    """
+    sizes = opening_sizes(rows, cols, mines, seed=seed)
+    center = (cols // 2, rows // 2)
+    ranked = sorted(sizes, key=lambda move: -sizes[move])[:candidates]
+    # 角落揭示的格子少，但开局的形状固定，也参与评估
+    for move in (center, (0, 0)):
+        if move not in ranked:
+            ranked.append(move)
+    rates = {move: win_rate(solver_name, rows, cols, mines, move, games, seed) for move in ranked}
+    first = significant_first_click(rates, center, games,
+                                    tie_break=lambda move: sizes[_canonical(move, rows, cols)])
+
+    counts = Counter()
+    boards = {}
+    for game_seed in np.random.SeedSequence(seed + 1).generate_state(openings).tolist():
+        game = SimulatedGame(rows, cols, mines, seed=game_seed)
+        game.click(*first)
+        if game.game_over:
+            continue
+        key = pattern_key(game.board)
+        counts[key] += 1
+        boards.setdefault(key, game.board)
+
+    common = [(key, count) for key, count in counts.most_common(patterns) if count > 1]
+    follow_ups = {key: best_follow_up(boards[key], mines) for key, _ in common}
+    return {
+        "first": list(first),
+        "opening_size": sizes[_canonical(first, rows, cols)],
+        "games": games,
+        "win_rate": rates[first],
+        "center_win_rate": rates[center],
+        "best_win_rate": max(rates.values()),
+        "coverage": sum(count for _, count in common) / openings,
+        "follow_ups": follow_ups,
+    }
+
+
+def build_book(configs, **options):
+    """为configs中的每个BoardConfig生成条目，返回OpeningBook"""
+    return OpeningBook({config_key(*config): build_entry(*config, **options) for config in configs})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成扫雷开局库")
+    parser.add_argument("--difficulty", nargs="+", choices=list(DIFFICULTIES), default=["Easy"])
+    parser.add_argument("--solver", default="incremental")
+    parser.add_argument("--games", type=int, default=200)
+    parser.add_argument("--openings", type=int, default=20000)
+    parser.add_argument("--patterns", type=int, default=512)
+    parser.add_argument("--candidates", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    book = OpeningBook.load(args.output)
+    for difficulty in args.difficulty:
+        config = config_for(difficulty)
+        start = time.perf_counter()
+        entry = build_entry(*config, solver_name=args.solver, games=args.games, openings=args.openings,
+                            patterns=args.patterns, candidates=args.candidates, seed=args.seed)
+        book.entries[config_key(*config)] = entry
+        print(f"{difficulty}: 第一下 {tuple(entry['first'])}, 平均揭示 {entry['opening_size']:.1f} 格, "
+              f"胜率 {entry['win_rate']:.1%} (中间 {entry['center_win_rate']:.1%}), "
+              f"收录 {len(entry['follow_ups'])} 个开局, 覆盖 {entry['coverage']:.1%}, "
+              f"耗时 {time.perf_counter() - start:.1f} 秒")
+    book.save(args.output)
+
+
+if __name__ == "__main__":
+    main()
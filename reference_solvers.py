@@ -0,0 +1,98 @@
+"""
+参考实现：改写为更快的数据结构之前的原始求解器，只用于测试对照和基准测试
+"""
+import random
+
+
+class SetBoardSolver:
+    """
+    minesweeper-request.py 中原来基于列表和(x, y)集合的求解器
+
+    保留原实现的逻辑，作为位棋盘求解器的正确性参照（test_bitboard.py）和性能对照（benchmarks.py）
+    """
+
+    def __init__(self, board_size=10):
+        self.board_size = board_size
+        self.reset_board()
+
+    def reset_board(self):
+        self.board = [[None for _ in range(self.board_size)] for _ in range(self.board_size)]
+        self.clicked = set()
+        self.potential_mines = set()
+        self.safe_moves = set()
+
+    def update_board(self, tiles):
+        for y in range(len(tiles)):
+            for x in range(len(tiles[y])):
+                if tiles[y][x] is not None:
+                    self.board[y][x] = tiles[y][x]
+                    self.clicked.add((x, y))
+        self.analyze_board()
+
+    def get_neighbors(self, x, y):
+        neighbors = []
+        for dx in [-1, 0, 1]:
+            for dy in [-1, 0, 1]:
+                if dx == 0 and dy == 0:
+                    continue
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < self.board_size and 0 <= ny < self.board_size:
+                    neighbors.append((nx, ny))
+        return neighbors
+
+    def analyze_board(self):
+        self.safe_moves.clear()
+        new_potential_mines = set()
+        for y in range(self.board_size):
+            for x in range(self.board_size):
+                if self.board[y][x] is not None and self.board[y][x] > 0:
+                    unclicked_neighbors = [(nx, ny) for nx, ny in self.get_neighbors(x, y)
+                                           if (nx, ny) not in self.clicked and self.board[ny][nx] is None]
+                    mines_needed = self.board[y][x]
+                    if len(unclicked_neighbors) == mines_needed:
+                        for nx, ny in unclicked_neighbors:
+                            new_potential_mines.add((nx, ny))
+                    marked_mines = [(nx, ny) for nx, ny in self.get_neighbors(x, y)
+                                    if (nx, ny) in self.potential_mines]
+                    if len(marked_mines) == mines_needed:
+                        for nx, ny in unclicked_neighbors:
+                            if (nx, ny) not in self.potential_mines:
+                                self.safe_moves.add((nx, ny))
+        self.potential_mines = new_potential_mines
+        if not self.safe_moves:
+            for y in range(self.board_size):
+                for x in range(self.board_size):
+                    if self.board[y][x] == 0:
+                        for nx, ny in self.get_neighbors(x, y):
+                            if (nx, ny) not in self.clicked and self.board[ny][nx] is None:
+                                self.safe_moves.add((nx, ny))
+
+    def get_next_move(self):
+        if self.safe_moves:
+            return self.safe_moves.pop()
+        candidates = []
+        for y in range(self.board_size):
+            for x in range(self.board_size):
+                if (x, y) not in self.clicked and (x, y) not in self.potential_mines:
+                    candidates.append((x, y))
+        if not candidates:
+            for y in range(self.board_size):
+                for x in range(self.board_size):
+                    if (x, y) not in self.clicked and self.board[y][x] is None:
+                        for nx, ny in self.get_neighbors(x, y):
+                            if (nx, ny) in self.clicked:
+                                return (x, y)
+            available_moves = [(x, y) for y in range(self.board_size) for x in range(self.board_size)
+                               if (x, y) not in self.clicked]
+            if not available_moves:
+                raise ValueError("没有可用的移动位置")
+            return random.choice(available_moves)
+        informed_moves = []
+        for x, y in candidates:
+            for nx, ny in self.get_neighbors(x, y):
+                if (nx, ny) in self.clicked and self.board[ny][nx] is not None and self.board[ny][nx] > 0:
+                    informed_moves.append((x, y))
+                    break
+        if informed_moves:
+            return random.choice(informed_moves)
+        return random.choice(candidates)
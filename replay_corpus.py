@@ -0,0 +1,159 @@
+"""
+真实对局的二进制回放语料库
+
+语料库是一个目录，包含两个只追加的文件:
+    boards.bin -- 所有棋盘的int8字节（board_codec格式），逐条首尾相接
+    index.bin  -- 每条记录一个INDEX_DTYPE结构：棋盘在boards.bin中的偏移、尺寸、点击位置和结果
+
+每条记录是(点击前的棋盘, 点击的(x, y), 点击后的gameOver/exploded)。读取时两个文件都用np.memmap
+映射，按需访问，不会把整个语料库读进内存。
+"""
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from board_codec import tiles_to_array
+
+INDEX_DTYPE = np.dtype([
+    ("offset", "<i8"),    # 棋盘在boards.bin中的字节偏移
+    ("game", "<i4"),      # 对局编号，同一局的记录连续存放
+    ("rows", "<i2"),
+    ("cols", "<i2"),
+    ("x", "<i2"),         # 点击的列
+    ("y", "<i2"),         # 点击的行
+    ("game_over", "?"),
+    ("exploded", "?"),
+])
+
+BOARDS_FILE = "boards.bin"
+INDEX_FILE = "index.bin"
+
+ReplayRecord = namedtuple("ReplayRecord", ["board", "game", "x", "y", "game_over", "exploded"])
+
+
+class ReplayRecorder:
+    """
+    把对局中的每一次点击追加到语料库
+
+    用法:
+        with ReplayRecorder("replays") as recorder:
+            recorder.new_game()
+            recorder.record(tiles, x, y, game_over, exploded)
+    """
+
+    def __init__(self, path):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        index_path = os.path.join(path, INDEX_FILE)
+        boards_path = os.path.join(path, BOARDS_FILE)
+        # 上次写入中断时两个文件可能不一致，按索引截断到最后一条完整的记录
+        count = os.path.getsize(index_path) // INDEX_DTYPE.itemsize if os.path.exists(index_path) else 0
+        if count:
+            last = np.fromfile(index_path, dtype=INDEX_DTYPE, count=1, offset=(count - 1) * INDEX_DTYPE.itemsize)[0]
+            self._offset = int(last["offset"]) + int(last["rows"]) * int(last["cols"])
+            self.game = int(last["game"])
+        else:
+            self._offset = 0
+            self.game = -1
+        self._index = open(index_path, "ab")
+        self._index.truncate(count * INDEX_DTYPE.itemsize)
+        self._boards = open(boards_path, "ab")
+        self._boards.truncate(self._offset)
+
+    def new_game(self):
+        """开始新的一局，之后的记录使用新的对局编号"""
+        self.game += 1
+        return self.game
+
+    def record(self, tiles, x, y, game_over=False, exploded=False):
+        """
+        追加一条记录
+
+        参数:
+        tiles -- 点击前的棋盘，服务器格式的tiles或int8数组
+        x, y -- 点击的列和行（与服务器CLICK接口相同）
+        game_over, exploded -- 点击后服务器返回的状态
+        """
+        if self.game < 0:
+            self.new_game()
+        board = np.ascontiguousarray(tiles_to_array(tiles))
+        rows, cols = board.shape
+        entry = np.array([(self._offset, self.game, rows, cols, x, y, game_over, exploded)], dtype=INDEX_DTYPE)
+        # 先写棋盘再写索引，索引中出现的记录一定有完整的棋盘
+        self._boards.write(board.tobytes())
+        self._boards.flush()
+        self._index.write(entry.tobytes())
+        self._index.flush()
+        self._offset += rows * cols
+
+    def close(self):
+        self._boards.close()
+        self._index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ReplayCorpus:
+    """
+    用内存映射读取语料库，支持len、下标访问和按批次遍历
+    """
+
+    def __init__(self, path):
+        self.path = path
+        index_path = os.path.join(path, INDEX_FILE)
+        boards_path = os.path.join(path, BOARDS_FILE)
+        count = os.path.getsize(index_path) // INDEX_DTYPE.itemsize if os.path.exists(index_path) else 0
+        if count:
+            self.index = np.memmap(index_path, dtype=INDEX_DTYPE, mode="r", shape=(count,))
+            self._boards = np.memmap(boards_path, dtype=np.int8, mode="r")
+        else:
+            self.index = np.zeros(0, dtype=INDEX_DTYPE)
+            self._boards = np.zeros(0, dtype=np.int8)
+
+    def __len__(self):
+        return len(self.index)
+
+    def board(self, k):
+        """第k条记录点击前的int8棋盘（只读的内存映射视图）"""
+        entry = self.index[k]
+        offset, rows, cols = int(entry["offset"]), int(entry["rows"]), int(entry["cols"])
+        return self._boards[offset:offset + rows * cols].reshape(rows, cols)
+
+    def __getitem__(self, k):
+        entry = self.index[k]
+        return ReplayRecord(self.board(k), int(entry["game"]), int(entry["x"]), int(entry["y"]),
+                            bool(entry["game_over"]), bool(entry["exploded"]))
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def batches(self, batch_size=1024):
+        """
+        按顺序每次取出最多batch_size个相同尺寸的棋盘，供get_safe_moves_batch这样的批量求解器使用
+
+        生成(记录下标数组, (K, H, W)的int8数组)；尺寸变化时提前结束当前批次，
+        每批只把这一批的棋盘复制到内存
+        """
+        index = self.index
+        start = 0
+        while start < len(index):
+            rows, cols = int(index["rows"][start]), int(index["cols"][start])
+            stop = min(start + batch_size, len(index))
+            same = (index["rows"][start:stop] == rows) & (index["cols"][start:stop] == cols)
+            if not same.all():
+                stop = start + int(np.argmin(same))
+            offsets = index["offset"][start:stop]
+            cells = rows * cols
+            if offsets[-1] - offsets[0] == (stop - start - 1) * cells:
+                # 连续存放（正常情况），直接切片
+                boards = np.array(self._boards[offsets[0]:offsets[0] + (stop - start) * cells])
+            else:
+                boards = np.concatenate([self._boards[offset:offset + cells] for offset in offsets])
+            yield np.arange(start, stop), boards.reshape(stop - start, rows, cols)
+            start = stop
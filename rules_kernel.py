@@ -0,0 +1,154 @@
+import numpy as np
+from board_codec import UNKNOWN, MINE, tiles_to_array
+
+# 8个相邻方向，按行优先顺序排列
+NEIGHBOR_OFFSETS = tuple((di, dj) for di in (-1, 0, 1) for dj in (-1, 0, 1) if (di, dj) != (0, 0))
+
+
+def _pad(values, width=1):
+    """在最后两个维度四周补0，支持前置批次维度（比np.pad开销小得多）"""
+    rows, cols = values.shape[-2:]
+    padded = np.zeros(values.shape[:-2] + (rows + 2 * width, cols + 2 * width), dtype=values.dtype)
+    padded[..., width:width + rows, width:width + cols] = values
+    return padded
+
+
+def _window(padded, di, dj, shape, width=1):
+    """从补0后的数组中取出偏移(di, dj)的视图：结果[i, j] = 原数组[i + di, j + dj]，越界为0"""
+    rows, cols = shape[-2:]
+    return padded[..., width + di:width + di + rows, width + dj:width + dj + cols]
+
+
+def neighbor_sum(values, dtype=None):
+    """
+    对每个格子求8个相邻格子的值之和（越界视为0），支持(..., H, W)的批量数组
+
+    按行优先的方向顺序累加，浮点结果与按行优先逐格循环累加完全一致
+    """
+    padded = _pad(values)
+    total = np.zeros(values.shape, dtype=dtype or values.dtype)
+    for di, dj in NEIGHBOR_OFFSETS:
+        total += _window(padded, di, dj, values.shape)
+    return total
+
+
+def neighbor_count(mask):
+    """
+    统计每个格子的8个相邻格子中有多少个在mask中
+
+    整数求和与顺序无关，这里用可分离的3x3盒式求和（先按行再按列）减去中心格子
+    """
+    values = mask.astype(np.int8)
+    padded = _pad(values)
+    horizontal = padded[..., :, :-2] + padded[..., :, 1:-1] + padded[..., :, 2:]
+    box = horizontal[..., :-2, :] + horizontal[..., 1:-1, :] + horizontal[..., 2:, :]
+    return box - values
+
+
+def adjacent(mask):
+    """返回与mask中任意格子相邻的格子（不包含mask本身，除非它也与其他格子相邻）"""
+    return neighbor_count(mask) > 0
+
+
+class RulesResult:
+    """
+    整个棋盘的邻域规则计算结果，所有数组形状与棋盘相同
+
+    属性:
+    unknown -- 未知格子
+    unknown_count -- 每个格子周围未知且未标记为地雷的格子数量
+    flagged_count -- 每个格子周围已知地雷的数量（棋盘上的MINE以及known_mines）
+    mine_mask -- 由 "剩余地雷数 == 未知邻居数" 推出的地雷（包括已标记的）
+    safe_mask -- 由 "已知地雷数 == 数字" 推出的安全格子
+    zero_safe_mask -- 0周围的未知格子
+    """
+
+    def __init__(self, unknown, unknown_count, flagged_count, mine_mask, safe_mask, zero_safe_mask):
+        self.unknown = unknown
+        self.unknown_count = unknown_count
+        self.flagged_count = flagged_count
+        self.mine_mask = mine_mask
+        self.safe_mask = safe_mask
+        self.zero_safe_mask = zero_safe_mask
+
+
+def analyze_rules(board, known_mines=None):
+    """
+    一次性计算整个棋盘（或一批棋盘）的简单规则
+
+    参数:
+    board -- int8棋盘，形状为(H, W)或(N, H, W)；二维的tiles列表会先经过tiles_to_array转换
+    known_mines -- 可选的布尔数组，已经推出是地雷的未知格子
+
+    返回:
+    RulesResult
+    """
+    if not isinstance(board, np.ndarray) or board.dtype != np.int8:
+        board = tiles_to_array(board)
+
+    unknown = board == UNKNOWN
+    flagged = board == MINE
+    if known_mines is not None:
+        flagged = flagged | (known_mines & unknown)
+    hidden = unknown & ~flagged
+
+    unknown_count = neighbor_count(hidden)
+    flagged_count = neighbor_count(flagged)
+    numbers = board > 0
+    remaining = board - flagged_count
+
+    mine_sources = numbers & (remaining == unknown_count)
+    safe_sources = numbers & (remaining == 0)
+
+    return RulesResult(
+        unknown,
+        unknown_count,
+        flagged_count,
+        unknown & adjacent(mine_sources),
+        hidden & adjacent(safe_sources),
+        unknown & adjacent(board == 0),
+    )
+
+
+def pair_subset_mines(board):
+    """
+    相邻数字对的子集规则（向量化）
+
+    对每一对相邻的数字a、b（a > b），如果b的未知邻居都是a的未知邻居，
+    并且只属于a的未知邻居数量等于a - b，那么这些格子都是地雷。
+    对8个方向分别用平移后的数组一次性比较整个棋盘，返回地雷的布尔数组
+    """
+    unknown = board == UNKNOWN
+    unknown_int = unknown.astype(np.int8)
+    shape = board.shape
+    numbers = board > 0
+    own_count = neighbor_count(unknown)
+
+    padded_board = _pad(board, 2)
+    padded_unknown = _pad(unknown_int, 2)
+    padded_count = _pad(own_count, 2)
+
+    mines = np.zeros(shape, dtype=bool)
+    for di, dj in NEIGHBOR_OFFSETS:
+        other = _window(padded_board, di, dj, shape, 2)
+        other_count = _window(padded_count, di, dj, shape, 2)
+
+        # 两个数字的3x3区域的交集是一个矩形，统计其中的未知格子
+        overlap = np.zeros(shape, dtype=np.int8)
+        for oi in range(max(-1, di - 1), min(1, di + 1) + 1):
+            for oj in range(max(-1, dj - 1), min(1, dj + 1) + 1):
+                overlap += _window(padded_unknown, oi, oj, shape, 2)
+
+        matched = (numbers & (other > 0) & (board > other)
+                   & (other_count == overlap)
+                   & (own_count - overlap == board - other))
+        if not matched.any():
+            continue
+
+        # 标记只属于第一个数字的未知邻居
+        padded_matched = _pad(matched, 2)
+        for oi, oj in NEIGHBOR_OFFSETS:
+            if max(abs(oi - di), abs(oj - dj)) > 1:
+                mines |= _window(padded_matched, -oi, -oj, shape, 2)
+
+    return mines & unknown
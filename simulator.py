@@ -0,0 +1,115 @@
+import numpy as np
+from board_codec import empty_board
+from frontier_solver import neighbor_table
+from rules_kernel import neighbor_count
+
+
+class SimulatedGame:
+    """
+    与服务器行为一致的扫雷模拟器，用于大量模拟对局
+
+    第一次点击时放置地雷（点击位置及其周围8格不放地雷，与minesweeper_demo.MinesweeperGame相同），
+    同时一次性算好每个格子周围的地雷数。点到0时与服务器一样连带揭示整个0区域及其边界，
+    区域沿着frontier_solver.neighbor_table的扁平邻居表扩张，只访问区域内及边界上的格子。
+
+    坐标与服务器的CLICK接口相同：x为列，y为行，对应tiles[y][x]。
+
+    属性:
+    board -- int8可见棋盘（未揭示为UNKNOWN），可以直接交给求解器
+    tiles -- 服务器格式的tiles（未揭示为None）
+    mines -- 地雷位置的布尔数组，第一次点击之前为None
+    counts -- 每个格子周围的地雷数，第一次点击之前为None
+    """
+
+    def __init__(self, rows=10, cols=10, num_mines=10, seed=None):
+        self.rows = rows
+        self.cols = cols
+        self.num_mines = num_mines
+        self.rng = np.random.default_rng(seed)
+        self.mines = None
+        self.counts = None
+        self.board = empty_board(rows, cols)
+        self.tiles = [[None] * cols for _ in range(rows)]
+        self.game_over = False
+        self.exploded = False
+        self.clicks = 0
+        self._hidden_safe = rows * cols
+
+    @property
+    def win(self):
+        return self.game_over and not self.exploded
+
+    def place_mines(self, x, y):
+        """随机放置地雷，第一次点击的格子及其周围的格子不放地雷"""
+        excluded = np.zeros((self.rows, self.cols), dtype=bool)
+        excluded[max(y - 1, 0):y + 2, max(x - 1, 0):x + 2] = True
+        candidates = np.flatnonzero(~excluded)
+        chosen = self.rng.choice(candidates, size=min(self.num_mines, len(candidates)), replace=False)
+
+        self.mines = np.zeros((self.rows, self.cols), dtype=bool)
+        self.mines.flat[chosen] = True
+        self.counts = neighbor_count(self.mines).astype(np.int8)
+        self._flat_counts = self.counts.ravel().tolist()
+        self._hidden_safe = self.rows * self.cols - len(chosen)
+
+    def click(self, x, y):
+        """
+        点击第y行第x列的格子
+
+        返回:
+        dict -- 与服务器响应中data["_minesweeper"]形状相同：{"tiles", "gameOver", "exploded"}
+        """
+        if self.game_over:
+            return self.state()
+        if self.mines is None:
+            self.place_mines(x, y)
+
+        self.clicks += 1
+        if self.mines[y, x]:
+            self.game_over = True
+            self.exploded = True
+        elif self.board[y, x] < 0:
+            if self.counts[y, x] == 0:
+                self._reveal_region(x, y)
+            else:
+                self._reveal_cell(y, x)
+            if self._hidden_safe == 0:
+                self.game_over = True
+        return self.state()
+
+    def state(self):
+        """当前的tiles和游戏状态，tiles为快照，不会随之后的点击改变"""
+        return {
+            "tiles": [row[:] for row in self.tiles],
+            "gameOver": self.game_over,
+            "exploded": self.exploded,
+        }
+
+    def _reveal_cell(self, i, j):
+        value = int(self.counts[i, j])
+        self.board[i, j] = value
+        self.tiles[i][j] = value
+        self._hidden_safe -= 1
+
+    def _reveal_region(self, x, y):
+        """从0格子开始揭示相连的所有0，以及它们周围的一圈格子"""
+        cols = self.cols
+        counts = self._flat_counts
+        neighbors = neighbor_table(self.rows, cols)
+        tiles = self.tiles
+        start = y * cols + x
+        tiles[y][x] = 0
+        region = [start]
+        stack = [start]
+        while stack:
+            for idx in neighbors[stack.pop()]:
+                i, j = divmod(idx, cols)
+                if tiles[i][j] is not None:
+                    continue
+                value = counts[idx]
+                tiles[i][j] = value
+                region.append(idx)
+                if value == 0:
+                    stack.append(idx)
+        self.board.flat[region] = self.counts.flat[region]
+        self._hidden_safe -= len(region)
@@ -0,0 +1,176 @@
+"""
+统一的求解器接口和按名称创建求解器的注册表
+
+所有引擎都实现同样的三个方法:
+    observe(tiles)   -- 传入服务器格式的tiles（或int8棋盘），可以是新的一局
+    next_move()      -- 下一步点击的(x, y) = (列, 行)，与服务器CLICK接口和SimulatedGame.click相同；
+                        没有可点击的格子时返回None
+    probabilities()  -- 与棋盘形状相同的浮点数组，每个格子是地雷的概率（已揭示的格子为0）；
+                        引擎不提供估计的格子为NaN
+
+用法:
+    solver = create_solver("minesweeper", total_mines=10)
+    solver.observe(tiles)
+    x, y = solver.next_move()
+
+引擎名称可以来自配置或环境变量，调用方不需要知道具体实现。
+"""
+import importlib
+
+import numpy as np
+
+from board_codec import UNKNOWN, tiles_to_array
+from boardresolver import estimate_probabilities, get_safe_move
+from MineSweeper import MinesweeperSolver
+from opening_book import resolve_book
+from solver_stats import NULL_STATS
+
+_REGISTRY = {}
+
+
+def register_solver(name):
+    """类装饰器：以name注册一个引擎，构造参数为(rows, cols, total_mines, **options)"""
+    def decorator(cls):
+        _REGISTRY[name] = cls
+        return cls
+    return decorator
+
+
+def available_solvers():
+    """所有已注册的引擎名称"""
+    return list(_REGISTRY)
+
+
+def create_solver(name, rows=10, cols=10, total_mines=None, **options):
+    """
+    按名称创建引擎
+
+    参数:
+    rows, cols -- 初始棋盘尺寸；observe收到其他尺寸的棋盘时引擎会按新尺寸重新开始
+    total_mines -- 可选的整局地雷总数，支持它的引擎用来改进概率
+    options -- 传给具体引擎的其他参数；所有引擎都接受stats（solver_stats.SolverStats），
+               记录求解器各阶段的耗时和计数器，以及opening_book（opening_book.OpeningBook，
+               True表示默认的开局库），知道total_mines时开局先查开局库
+
+    未注册的名称抛出ValueError
+    """
+    try:
+        cls = _REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"未知的求解器: {name}，可用的有: {', '.join(_REGISTRY)}") from None
+    return cls(rows, cols, total_mines, **options)
+
+
+@register_solver("minesweeper")
+class FrontierEngine:
+    """MineSweeper.MinesweeperSolver：前沿枚举的精确概率，options传给MinesweeperSolver（如incremental）"""
+
+    def __init__(self, rows, cols, total_mines, **options):
+        self.solver = MinesweeperSolver(total_mines=total_mines, rows=rows, cols=cols, **options)
+
+    def observe(self, tiles):
+        self.solver.update_board(tiles)
+
+    def next_move(self):
+        move = self.solver.get_next_move()
+        return None if move is None else (move[1], move[0])
+
+    def probabilities(self):
+        self.solver.refresh_probabilities()
+        probabilities = self.solver.probability_map.copy()
+        probabilities[self.solver.known_board >= 0] = 0.0
+        for i, j in self.solver.potential_mines:
+            probabilities[i, j] = 1.0
+        return probabilities
+
+
+@register_solver("incremental")
+class IncrementalEngine(FrontierEngine):
+    """增量模式的MinesweeperSolver，大棋盘上每步更快"""
+
+    def __init__(self, rows, cols, total_mines, **options):
+        super().__init__(rows, cols, total_mines, incremental=True, **options)
+
+
+@register_solver("boardresolver")
+class BoardResolverEngine:
+    """boardresolver.get_safe_move：无状态的简化版解析器，stats只记录observe和next_move两个阶段"""
+
+    def __init__(self, rows, cols, total_mines, stats=None, opening_book=None):
+        self.total_mines = total_mines
+        self.board = np.full((rows, cols), UNKNOWN, dtype=np.int8)
+        self.stats = stats or NULL_STATS
+        self.opening_book = opening_book
+
+    def observe(self, tiles):
+        started = self.stats.start()
+        self.board = tiles_to_array(tiles)
+        self.stats.stop("update_board", started)
+
+    def next_move(self):
+        started = self.stats.start()
+        book = self.opening_book = resolve_book(self.opening_book)
+        move = book.lookup(self.board, self.total_mines) if book else None
+        if move is None:
+            move = get_safe_move(self.board, total_mines=self.total_mines)
+            move = None if move is None else (move[1], move[0])
+        self.stats.stop("get_next_move", started)
+        return move
+
+    def probabilities(self):
+        return estimate_probabilities(self.board, total_mines=self.total_mines)
+
+
+@register_solver("bitboard")
+class BitboardEngine:
+    """minesweeper-request.py中的位棋盘求解器：只区分确定的地雷和确定安全的格子"""
+
+    def __init__(self, rows, cols, total_mines, stats=None, opening_book=None):
+        # 文件名带连字符，只能通过importlib导入；在这里导入以避免与该文件的循环导入
+        minesweeper_request = importlib.import_module("minesweeper-request")
+        self.solver = minesweeper_request.MinesweeperSolver(rows, cols, stats=stats)
+        self.total_mines = total_mines
+        self.opening_book = opening_book
+        self._book_move = None
+
+    def observe(self, tiles):
+        board = tiles_to_array(tiles)
+        rows, cols = board.shape
+        bb = self.solver.bitboard
+        revealed = _to_mask(board != UNKNOWN)
+        # 尺寸变化，或者已揭示的格子变回未知，说明是新的一局
+        if (rows, cols) != (bb.rows, bb.cols) or bb.revealed & ~revealed:
+            self.solver.reset_board(rows, cols)
+        self.solver.update_board(tiles if isinstance(tiles, list) else
+                                 [[None if value == UNKNOWN else value for value in row] for row in board.tolist()])
+        # 位棋盘的分析只需要几微秒，照常载入以保证probabilities()是最新的，只由开局库决定下一步
+        book = self.opening_book = resolve_book(self.opening_book)
+        self._book_move = book.lookup(board, self.total_mines) if book else None
+
+    def next_move(self):
+        if self._book_move is not None:
+            move, self._book_move = self._book_move, None
+            return move
+        try:
+            return self.solver.get_next_move()
+        except ValueError:
+            return None
+
+    def probabilities(self):
+        bb = self.solver.bitboard
+        cells = bb.rows * bb.cols
+        probabilities = np.full(cells, np.nan)
+        probabilities[_from_mask(bb.mines, cells)] = 1.0
+        probabilities[_from_mask(bb.revealed | bb.safe, cells)] = 0.0
+        return probabilities.reshape(bb.rows, bb.cols)
+
+
+def _to_mask(cells):
+    """布尔数组（行优先）转换为位棋盘的整数掩码"""
+    return int.from_bytes(np.packbits(cells.ravel(), bitorder="little").tobytes(), "little")
+
+
+def _from_mask(mask, count):
+    """位棋盘的整数掩码转换为长度为count的布尔数组"""
+    data = np.frombuffer(mask.to_bytes((count + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(data, bitorder="little")[:count].astype(bool)
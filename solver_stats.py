@@ -0,0 +1,95 @@
+"""
+求解器的分阶段性能统计
+
+求解器在各阶段的开始和结束调用start/stop，在关键位置调用count累加计数器:
+    stats = SolverStats()
+    solver = MinesweeperSolver(stats=stats)
+    ...
+    stats.summary()           # 当前一局的统计
+    stats.end_game(win=True)  # 保存当前一局并清零
+    stats.dump("stats.jsonl") # 每局一行JSON，写入后清空games
+
+阶段的耗时为纳秒，阶段可以嵌套（例如update_board包含calculate_probabilities），
+每个阶段的耗时包含它调用的其他阶段。求解器默认使用NULL_STATS，所有方法都是空操作，
+关闭统计时每个阶段只多两次空方法调用。
+"""
+import json
+import time
+from collections import defaultdict
+
+
+class SolverStats:
+    """
+    按阶段累计耗时和调用次数，并累加任意命名的计数器
+
+    属性:
+    timings -- {阶段: 累计纳秒}
+    calls -- {阶段: 调用次数}
+    counters -- {名称: 累计值}，如constraints、components、configurations、cache_hits
+    games -- end_game保存的每局统计
+    """
+
+    def __init__(self):
+        self.timings = defaultdict(int)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.games = []
+
+    def start(self):
+        """阶段开始，返回传给stop的时间戳"""
+        return time.perf_counter_ns()
+
+    def stop(self, phase, started):
+        """阶段结束，累计从started开始的耗时"""
+        self.timings[phase] += time.perf_counter_ns() - started
+        self.calls[phase] += 1
+
+    def count(self, name, n=1):
+        """计数器name加n"""
+        self.counters[name] += n
+
+    def summary(self):
+        """当前一局的统计：{"timings_ns": ..., "calls": ..., "counters": ...}"""
+        return {
+            "timings_ns": dict(self.timings),
+            "calls": dict(self.calls),
+            "counters": dict(self.counters),
+        }
+
+    def end_game(self, **info):
+        """
+        结束当前一局：把统计连同info（如胜负、点击数）存入games并清零，返回这一局的统计
+        """
+        game = self.summary()
+        game.update(info)
+        self.games.append(game)
+        self.timings.clear()
+        self.calls.clear()
+        self.counters.clear()
+        return game
+
+    def dump(self, path):
+        """把games中的每局统计追加写入path，每局一行JSON；写入后清空games，多次调用不会重复写入"""
+        with open(path, "a", encoding="utf-8") as f:
+            for game in self.games:
+                f.write(json.dumps(game, ensure_ascii=False) + "\n")
+        self.games.clear()
+
+
+class _NullStats:
+    """关闭统计时使用的空实现，接口与SolverStats相同"""
+
+    def __bool__(self):
+        return False
+
+    def start(self):
+        return 0
+
+    def stop(self, phase, started):
+        pass
+
+    def count(self, name, n=1):
+        pass
+
+
+NULL_STATS = _NullStats()
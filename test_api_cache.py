@@ -0,0 +1,104 @@
+import json
+import os
+import tempfile
+import unittest
+from main import ENDPOINTS, APIClient, TTLCache
+from mock_server import MockServer
+
+TOKENS = ["token-a-abcdefghijklmnop", "token-b-abcdefghijklmnop"]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAPICache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.token_file = os.path.join(self.tmp.name, "token.txt")
+        with open(self.token_file, "w") as f:
+            f.write("\n".join(TOKENS) + "\n")
+        self.server = MockServer(seed=0).start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def client(self, **options):
+        return APIClient(self.server.url, self.token_file, os.path.join(self.tmp.name, "header.json"), **options)
+
+    def quest_requests(self):
+        return sum(path == ENDPOINTS["quests"] for _, path, _ in self.server.history)
+
+    def test_catalog_fetched_once_for_all_tokens(self):
+        """测试任务目录只请求一次，其他账号从缓存得到相同的响应；用户相关的接口不缓存"""
+        client = self.client()
+        first = client.make_request(ENDPOINTS["quests"], token=TOKENS[0])
+        second = client.make_request(ENDPOINTS["quests"], token=TOKENS[1])
+        self.assertEqual(first, second)
+        self.assertEqual(self.quest_requests(), 1)
+        client.make_request(ENDPOINTS["user"], token=TOKENS[0])
+        client.make_request(ENDPOINTS["user"], token=TOKENS[0])
+        self.assertEqual(sum(path == ENDPOINTS["user"] for _, path, _ in self.server.history), 2)
+
+    def test_ttl_and_disabled_cache(self):
+        """测试缓存过期后重新请求，ttl为0时不缓存"""
+        client = self.client(cache_ttl=60)
+        clock = client.cache.clock = FakeClock()
+        client.make_request(ENDPOINTS["quests"], token=TOKENS[0])
+        clock.now += 59
+        client.make_request(ENDPOINTS["quests"], token=TOKENS[0])
+        self.assertEqual(self.quest_requests(), 1)
+        clock.now += 1
+        client.make_request(ENDPOINTS["quests"], token=TOKENS[0])
+        self.assertEqual(self.quest_requests(), 2)
+
+        uncached = self.client(cache_ttl=0)
+        uncached.make_request(ENDPOINTS["quests"], token=TOKENS[0])
+        uncached.make_request(ENDPOINTS["quests"], token=TOKENS[0])
+        self.assertEqual(self.quest_requests(), 4)
+
+    def test_errors_are_not_cached(self):
+        """测试失败的响应不进入缓存"""
+        with MockServer(error_rate=1.0, seed=0) as failing:
+            client = APIClient(failing.url, self.token_file, os.path.join(self.tmp.name, "header.json"))
+            self.assertEqual(client.make_request(ENDPOINTS["quests"], token=TOKENS[0])["status_code"], 500)
+            self.assertIsNone(client.cache.get(ENDPOINTS["quests"]))
+
+    def test_cache_file_survives_restart(self):
+        """测试缓存文件在下一次运行时继续使用，损坏的文件被忽略"""
+        path = os.path.join(self.tmp.name, "cache.json")
+        self.client(cache_file=path).make_request(ENDPOINTS["quests"], token=TOKENS[0])
+        restarted = self.client(cache_file=path)
+        response = restarted.make_request(ENDPOINTS["quests"], token=TOKENS[1])
+        self.assertIn("data", response)
+        self.assertEqual(self.quest_requests(), 1)
+
+        with open(path, "w") as f:
+            f.write("{broken")
+        self.assertIsNone(TTLCache(60, path).get(ENDPOINTS["quests"]))
+
+    def test_invalid_entries_are_misses(self):
+        """测试缓存文件中形状不对的条目在读取时丢弃，当作未命中；格式正确的条目照常使用"""
+        path = os.path.join(self.tmp.name, "cache.json")
+        clock = FakeClock()
+        with open(path, "w") as f:
+            json.dump({"/quests": [clock.now, {"data": []}], "/short": [clock.now], "/value": [clock.now, "text"],
+                       "/time": ["yesterday", {"data": []}], "/flag": [True, {"data": []}], "/null": None}, f)
+        cache = TTLCache(60, path, clock=clock)
+        self.assertEqual(list(cache.entries), ["/quests"])
+        self.assertEqual(cache.get("/quests"), {"data": []})
+        for key in ("/short", "/value", "/time", "/flag", "/null"):
+            self.assertIsNone(cache.get(key))
+
+        with open(path, "w") as f:
+            json.dump([[clock.now, {"data": []}]], f)
+        self.assertEqual(TTLCache(60, path, clock=clock).entries, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import asyncio
+import time
+import unittest
+from automation_testcase import AutomationTestCase
+from main import AsyncAPIClient
+from mock_server import ROLL_QUEST_ID, MockServer
+
+TOKENS = [f"token-{k}-abcdefghijklmnop" for k in range(4)]
+
+
+class TestAsyncClient(AutomationTestCase):
+    tokens = TOKENS
+
+    def run_cycle(self, max_concurrency):
+        """在新的模拟服务器上跑一轮，返回(耗时, 服务器)"""
+        with MockServer(latency=0.05, seed=0) as server:
+            automation = self.automation(server, max_concurrency=max_concurrency)
+            start = time.perf_counter()
+            asyncio.run(automation.run_cycle())
+            elapsed = time.perf_counter() - start
+            automation.api_client.close()
+        return elapsed, server
+
+    def test_accounts_run_concurrently_in_order(self):
+        """测试多个账号并行处理，每个账号都在三个查询之后才掷骰子，所有账号都掷完骰子"""
+        serial, serial_server = self.run_cycle(1)
+        parallel, server = self.run_cycle(4)
+        self.assertLess(parallel, serial / 2)
+
+        for history in (serial_server.history, server.history):
+            # 任务目录对所有账号相同，整轮只请求一次
+            self.assertEqual(sum(path == "/quests" for _, path, _ in history), 1)
+            for token in TOKENS:
+                calls = [(method, path) for method, path, who in history if who == token and path != "/quests"]
+                # 查询同时发出，顺序不固定；掷骰子一定在它们之后
+                self.assertEqual(sorted(calls[:2]), [("GET", "/user"), ("GET", "/userQuests")])
+                self.assertEqual(calls[2:], [("POST", "/userQuests")] * (server.state.rolls_per_day + 1))
+        for token in TOKENS:
+            roll = server.state.user_quests[token][ROLL_QUEST_ID]
+            self.assertEqual(roll["status"], "COMPLETED")
+
+    def test_status_requests_overlap(self):
+        """测试一个账号的三个查询同时进行，总耗时接近最慢的一个而不是三者之和"""
+        with MockServer(latency=0.2, seed=0) as server:
+            automation = self.automation(server, max_concurrency=1)
+            start = time.perf_counter()
+            user, quests, user_quests = asyncio.run(automation.fetch_status(TOKENS[0]))
+            elapsed = time.perf_counter() - start
+            automation.api_client.close()
+        self.assertLess(elapsed, 0.5)
+        self.assertIn("id", user["data"])
+        self.assertTrue(quests["data"])
+        self.assertEqual(user_quests, {"data": []})
+
+    def test_async_matches_blocking_contract(self):
+        """测试异步调用返回与make_request相同的响应和错误字典"""
+        with MockServer(seed=0) as server:
+            client = AsyncAPIClient(server.url, self.token_file, self.path("header.json"))
+
+            async def gather():
+                return await asyncio.gather(*(client.make_request_async("/user", token=token) for token in TOKENS))
+
+            users = asyncio.run(gather())
+            self.assertEqual([user["data"]["id"] for user in users],
+                             [client.make_request("/user", token=token)["data"]["id"] for token in TOKENS])
+            for _ in range(server.state.rolls_per_day):
+                asyncio.run(client.roll_dice_async(TOKENS[0]))
+            self.assertEqual(asyncio.run(client.roll_dice_async(TOKENS[0])),
+                             {"error": "Quest already completed", "status_code": 400})
+            client.close()
+
+        with MockServer(error_rate=1.0, seed=0) as failing:
+            client = AsyncAPIClient(failing.url, self.token_file, self.path("header.json"))
+            response = asyncio.run(client.make_request_async("/quests", token=TOKENS[0]))
+            self.assertEqual(response["status_code"], 500)
+            self.assertIn("error", response)
+            client.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
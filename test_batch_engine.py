@@ -0,0 +1,66 @@
+import unittest
+import numpy as np
+from batch_engine import BatchGames
+from board_codec import UNKNOWN
+from test_simulator import flood_fill
+
+
+class TestBatchGames(unittest.TestCase):
+    def test_first_click_is_safe(self):
+        """测试每局第一次点击的格子及其周围没有地雷，地雷数量正确"""
+        engine = BatchGames(200, rows=8, cols=12, num_mines=20, seed=1)
+        moves = np.stack([np.arange(200) % 8, np.arange(200) % 12], axis=1)
+        engine.step(moves)
+        self.assertFalse(engine.exploded.any())
+        self.assertTrue((engine.mines.sum(axis=(1, 2)) == 20).all())
+        for k, (i, j) in enumerate(moves.tolist()):
+            self.assertFalse(engine.mines[k, max(i - 1, 0):i + 2, max(j - 1, 0):j + 2].any())
+
+    def test_cascade_matches_flood_fill(self):
+        """测试整批揭示的格子与逐局的参考实现一致"""
+        engine = BatchGames(100, num_mines=15, seed=2)
+        engine.step(np.full((100, 2), 5))
+        for k in range(100):
+            expected = flood_fill(engine.mines[k], engine.counts[k], 5, 5)
+            revealed = {tuple(cell) for cell in np.argwhere(engine.boards[k] != UNKNOWN).tolist()}
+            self.assertEqual(revealed, expected)
+            np.testing.assert_array_equal(engine.boards[k][engine.boards[k] != UNKNOWN],
+                                          engine.counts[k][engine.boards[k] != UNKNOWN])
+
+    def test_step_skips_finished_games(self):
+        """测试点到地雷的局结束，之后的点击和(-1, -1)都不改变棋盘"""
+        engine = BatchGames(2, num_mines=10, seed=3)
+        engine.step(np.array([[5, 5], [5, 5]]))
+        mine = np.argwhere(engine.mines[0])[0]
+        engine.step(np.array([mine, [-1, -1]]))
+        self.assertTrue(engine.exploded[0])
+        self.assertTrue(engine.game_over[0])
+        self.assertFalse(engine.game_over[1])
+
+        boards = engine.boards.copy()
+        clicks = engine.clicks.copy()
+        engine.step(np.array([[0, 0], [-1, -1]]))
+        np.testing.assert_array_equal(engine.boards, boards)
+        np.testing.assert_array_equal(engine.clicks, clicks)
+
+    def test_layout_independent_of_batch(self):
+        """测试每局的布局只由种子和局号决定，分批运行结果相同"""
+        whole = BatchGames(10, seed=4)
+        part = BatchGames(4, seed=4, start=6)
+        whole.step(np.full((10, 2), 3))
+        part.step(np.full((4, 2), 3))
+        np.testing.assert_array_equal(whole.mines[6:], part.mines)
+        self.assertFalse((whole.mines[0] == whole.mines[1]).all())
+
+    def test_run_to_completion(self):
+        """测试用get_safe_moves_batch跑完所有对局，获胜的局揭示了所有安全格子"""
+        engine = BatchGames(50, seed=5)
+        wins = engine.run()
+        self.assertTrue(engine.game_over.all())
+        self.assertGreater(wins.mean(), 0.5)
+        revealed = engine.boards != UNKNOWN
+        np.testing.assert_array_equal(revealed[wins], ~engine.mines[wins])
+
+
+if __name__ == "__main__":
+    unittest.main()
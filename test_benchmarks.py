@@ -0,0 +1,42 @@
+import unittest
+from benchmarks import board_sets, compare_baseline
+from board_codec import UNKNOWN
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_board_sets_are_fixed(self):
+        """测试套件的棋盘集合由种子确定，各阶段的局面符合定义"""
+        first = board_sets(per_set=5, seed=1)
+        second = board_sets(per_set=5, seed=1)
+        for name in first:
+            self.assertEqual(len(first[name]), 5)
+            for a, b in zip(first[name], second[name]):
+                self.assertTrue((a == b).all())
+        for board in first["near_endgame"]:
+            self.assertLessEqual(int((board == UNKNOWN).sum()) - 10, 5)
+
+    def test_compare_baseline(self):
+        """测试只报告超过阈值的变慢，基线中没有的条目不比较"""
+        baseline = {"a": 100.0, "b": 100.0}
+        results = {"a": 124.0, "b": 130.0, "c": 1000.0}
+        self.assertEqual(compare_baseline(results, baseline, 0.25), [("b", 100.0, 130.0)])
+        self.assertEqual(compare_baseline(results, baseline, 0.5), [])
+
+    def test_noise_floor(self):
+        """测试只有几微秒的路径上，相对变化超过阈值但绝对差别在噪声以内时不算回退"""
+        baseline = {"fast": 3.0, "slow": 300.0}
+        results = {"fast": 4.5, "slow": 450.0}
+        self.assertEqual(compare_baseline(results, baseline, 0.25), [("slow", 300.0, 450.0)])
+        self.assertEqual(compare_baseline(results, baseline, 0.25, noise_floor=0.0),
+                         [("fast", 3.0, 4.5), ("slow", 300.0, 450.0)])
+
+    def test_scale_by_machine_speed(self):
+        """测试整台机器变慢时基线按校准的比例缩放，变慢的比例以内不算回退"""
+        baseline = {"a": 100.0}
+        self.assertEqual(compare_baseline({"a": 140.0}, baseline, 0.25), [("a", 100.0, 140.0)])
+        self.assertEqual(compare_baseline({"a": 140.0}, baseline, 0.25, scale=1.2), [])
+        self.assertEqual(compare_baseline({"a": 160.0}, baseline, 0.25, scale=1.2), [("a", 120.0, 160.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
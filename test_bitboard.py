@@ -0,0 +1,81 @@
+import unittest
+import importlib
+import random
+from bitboard import Bitboard, neighbor_masks, random_index
+from reference_solvers import SetBoardSolver
+
+minesweeper_request = importlib.import_module("minesweeper-request")
+
+
+def mask_to_set(bb, mask):
+    """把位掩码转换为(x, y)集合"""
+    return {bb.coords(idx) for idx in range(bb.rows * bb.cols) if (mask >> idx) & 1}
+
+
+class TestBitboard(unittest.TestCase):
+    def test_neighbor_masks(self):
+        """测试相邻格子掩码：角落3个、边缘5个、内部8个"""
+        masks = neighbor_masks(10, 10)
+        self.assertEqual(masks[0].bit_count(), 3)
+        self.assertEqual(masks[5].bit_count(), 5)
+        self.assertEqual(masks[55].bit_count(), 8)
+
+    def test_dilate_matches_neighbor_masks(self):
+        """测试膨胀运算与逐格相邻掩码一致，且不会跨行"""
+        bb = Bitboard(10, 10)
+        for idx in range(100):
+            self.assertEqual(bb.dilate(1 << idx), bb.neighbors[idx] | (1 << idx))
+
+    def test_load_only_tracks_new_cells(self):
+        """测试load只返回新揭示的格子"""
+        bb = Bitboard(10, 10)
+        tiles = [[None for _ in range(10)] for _ in range(10)]
+        tiles[3][4] = 1
+        self.assertEqual(bb.load(tiles), 1 << 34)
+        tiles[0][0] = 0
+        self.assertEqual(bb.load(tiles), 1)
+        self.assertEqual(bb.value(4, 3), 1)
+        self.assertIsNone(bb.value(5, 5))
+
+    def test_random_index_stays_in_mask(self):
+        """测试随机选择的格子一定在掩码内"""
+        mask = (1 << 3) | (1 << 17) | (1 << 99)
+        for _ in range(50):
+            self.assertTrue((mask >> random_index(mask)) & 1)
+
+    def test_analysis_matches_set_solver(self):
+        """测试位棋盘求解器的分析结果与原集合实现一致"""
+        rng = random.Random(7)
+        for _ in range(30):
+            mines = set(rng.sample([(x, y) for x in range(10) for y in range(10)], 15))
+            tiles = [[None for _ in range(10)] for _ in range(10)]
+            bit_solver = minesweeper_request.MinesweeperSolver()
+            set_solver = SetBoardSolver()
+            for _ in range(4):
+                for _ in range(10):
+                    x, y = rng.randrange(10), rng.randrange(10)
+                    if (x, y) not in mines:
+                        tiles[y][x] = sum((x + dx, y + dy) in mines
+                                          for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+                bit_solver.update_board(tiles)
+                set_solver.update_board(tiles)
+                bb = bit_solver.bitboard
+                self.assertEqual(mask_to_set(bb, bb.mines), set_solver.potential_mines)
+                self.assertEqual(mask_to_set(bb, bb.safe), set_solver.safe_moves)
+                self.assertEqual(mask_to_set(bb, bb.revealed), set_solver.clicked)
+
+
+    def test_request_solver_follows_board_size(self):
+        """测试位棋盘求解器在收到不同尺寸的棋盘时按新尺寸重新开始"""
+        solver = minesweeper_request.MinesweeperSolver()
+        tiles = [[None] * 30 for _ in range(16)]
+        tiles[15][29] = 0
+        solver.update_board(tiles)
+        self.assertEqual((solver.bitboard.rows, solver.bitboard.cols), (16, 30))
+        self.assertIn(solver.get_next_move(), {(28, 14), (29, 14), (28, 15)})
+
+        solver.reset_board(9, 9)
+        self.assertEqual(solver.bitboard.full.bit_length(), 81)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+import numpy as np
+from board_codec import UNKNOWN, MINE, tiles_to_array, array_to_tiles, empty_board
+
+
+class TestBoardCodec(unittest.TestCase):
+    def test_tiles_to_int8(self):
+        """测试null/数字的tiles转换为带哨兵值的int8数组"""
+        tiles = [[None, 0, 1],
+                 [2, None, -1],
+                 [8, 3, None]]
+        board = tiles_to_array(tiles)
+        self.assertEqual(board.dtype, np.int8)
+        self.assertEqual(board.shape, (3, 3))
+        self.assertEqual(board[0, 0], UNKNOWN)
+        self.assertEqual(board[0, 2], 1)
+        self.assertEqual(board[1, 2], MINE)
+        self.assertEqual(board[2, 0], 8)
+
+    def test_int8_passthrough(self):
+        """测试已经是int8的数组不会被复制"""
+        board = empty_board(10, 10)
+        self.assertIs(tiles_to_array(board), board)
+
+    def test_object_array_input(self):
+        """测试numpy对象数组也能转换为int8"""
+        board = np.full((10, 10), None)
+        board[4, 4] = 2
+        converted = tiles_to_array(board)
+        self.assertEqual(converted.dtype, np.int8)
+        self.assertEqual(converted[4, 4], 2)
+        self.assertEqual(int((converted == UNKNOWN).sum()), 99)
+
+    def test_round_trip(self):
+        """测试int8棋盘可以转换回服务器格式"""
+        tiles = [[None, 0], [1, None]]
+        self.assertEqual(array_to_tiles(tiles_to_array(tiles)), tiles)
+
+    def test_non_square(self):
+        """测试非正方形棋盘"""
+        tiles = [[None] * 30 for _ in range(16)]
+        self.assertEqual(tiles_to_array(tiles).shape, (16, 30))
+
+
+if __name__ == "__main__":
+    unittest.main()
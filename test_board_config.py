@@ -0,0 +1,25 @@
+import unittest
+from board_config import BoardConfig, config_for, config_from_state
+from simulator import SimulatedGame
+
+
+class TestBoardConfig(unittest.TestCase):
+    def test_config_for(self):
+        """测试难度名称不区分大小写，未知难度抛出ValueError"""
+        self.assertEqual(config_for("hard"), BoardConfig(16, 30, 99))
+        with self.assertRaises(ValueError):
+            config_for("Impossible")
+
+    def test_config_from_state(self):
+        """测试尺寸取自tiles，地雷数只取响应中的字段，尺寸与难度的默认配置一致也不猜测地雷数"""
+        state = {"tiles": [[None] * 30 for _ in range(16)], "gameOver": False}
+        self.assertEqual(config_from_state(state), BoardConfig(16, 30, None))
+        self.assertEqual(config_from_state(dict(state, numMines=80)), BoardConfig(16, 30, 80))
+        self.assertEqual(config_from_state(dict(state, mines="99")), BoardConfig(16, 30, None))
+
+        game = SimulatedGame(9, 12, 15, seed=1)
+        self.assertEqual(config_from_state(game.click(3, 3))[:2], (9, 12))
+
+
+if __name__ == "__main__":
+    unittest.main()
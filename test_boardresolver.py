@@ -1,7 +1,8 @@
 import unittest
 import numpy as np
 import random
-from boardresolver import get_safe_move
+from boardresolver import estimate_probabilities, get_safe_move
+from frontier_solver import solve_frontier
 
 class TestBoardResolver(unittest.TestCase):
     def test_initial_move(self):
@@ -47,6 +48,36 @@ class TestBoardResolver(unittest.TestCase):
         # 应该选择中间的1周围的格子，因为概率更低
         self.assertTrue(abs(x-5) <= 1 and abs(y-5) <= 1)
         
+    def test_total_mines_interior_estimate(self):
+        """测试给出地雷总数时，内部格子不再被当作没有风险"""
+        board = [[None for _ in range(10)] for _ in range(10)]
+        board[0][0] = 1  # 角落的1，周围每个格子约1/3
+        # 地雷很多时内部格子的估计概率高于角落的格子，应该选择角落旁边的格子
+        x, y = get_safe_move(board, total_mines=60)
+        self.assertTrue(x <= 1 and y <= 1)
+        # 地雷很少时内部格子更安全，应该选择远离数字的格子
+        x, y = get_safe_move(board, total_mines=2)
+        self.assertFalse(x <= 1 and y <= 1)
+        
+    def test_total_mines_exact_probabilities(self):
+        """测试给出地雷总数时的概率与solve_frontier按总数加权的精确概率相同"""
+        board = [[None for _ in range(10)] for _ in range(10)]
+        board[0][0] = 1
+        board[5][5] = 2
+        board[5][6] = 1
+        expected = solve_frontier(board, total_mines=10).probabilities
+        expected[np.array([[cell is not None for cell in row] for row in board])] = 0
+        np.testing.assert_allclose(estimate_probabilities(board, total_mines=10), expected)
+        # 角落的1周围三个格子中恰好有一个地雷
+        self.assertAlmostEqual(estimate_probabilities(board, total_mines=10)[0:2, 0:2].sum(), 1.0)
+
+    def test_rectangular_board(self):
+        """测试非正方形棋盘：初始棋盘返回中心，数字周围确定安全的格子照常找到"""
+        board = [[None for _ in range(30)] for _ in range(16)]
+        self.assertEqual(get_safe_move(board), (8, 15))
+        board[15][29] = 0
+        self.assertIn(get_safe_move(board), {(14, 28), (14, 29), (15, 28)})
+        
     def test_random_board_safety(self):
         """测试随机生成的棋盘和雷区，验证get_safe_move函数返回的安全坐标点"""
         # 设置随机种子以便结果可重现
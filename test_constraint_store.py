@@ -0,0 +1,95 @@
+import unittest
+import random
+import numpy as np
+from board_codec import UNKNOWN, tiles_to_array
+from constraint_store import ConstraintStore
+from frontier_solver import neighbor_table, solve_frontier
+from MineSweeper import MinesweeperSolver
+from rules_kernel import analyze_rules, pair_subset_mines
+
+
+def store_for(tiles):
+    """为整个棋盘建立约束库，返回(约束库, 列数)"""
+    board = tiles_to_array(tiles)
+    rows, cols = board.shape
+    store = ConstraintStore()
+    store.refresh(range(rows * cols), board.ravel().tolist(), neighbor_table(rows, cols), ())
+    return store, cols
+
+
+class TestConstraintStore(unittest.TestCase):
+    def test_index_follows_updates(self):
+        """测试按格子索引的重叠查询在约束变化和删除后保持正确"""
+        store = ConstraintStore()
+        self.assertTrue(store.set(10, (1, (0, 1, 2))))
+        self.assertTrue(store.set(11, (1, (2, 3))))
+        self.assertTrue(store.set(12, (1, (4, 5))))
+        self.assertFalse(store.set(12, (1, (4, 5))))
+        self.assertEqual(store.overlapping(10), {11})
+        self.assertEqual(store.overlapping(12), set())
+
+        store.set(12, (1, (3, 4)))
+        self.assertEqual(store.overlapping(11), {10, 12})
+        store.set(11, None)
+        self.assertNotIn(11, store)
+        self.assertEqual(store.overlapping(10), set())
+        self.assertEqual(store.overlapping(12), set())
+        self.assertEqual(len(store), 2)
+
+    def test_subset_and_difference_rules(self):
+        """测试子集规则和差集规则"""
+        store = ConstraintStore()
+        # 子集：{0,1}有1个地雷，{0,1,2}有2个地雷 -> 2是地雷
+        store.set(10, (1, (0, 1)))
+        store.set(11, (2, (0, 1, 2)))
+        # 差集：{3,4,5}有2个地雷，{4,5,6}有1个地雷，只属于前者的格子只有3，2 - 1 == 1
+        store.set(20, (2, (3, 4, 5)))
+        store.set(21, (1, (4, 5, 6)))
+        safe, mines = store.deduce(store.numbers())
+        self.assertEqual(mines, {2, 3})
+        self.assertEqual(safe, {6})
+
+    def test_deductions_are_sound(self):
+        """测试随机棋盘上规则的结论都被前沿枚举确认，并且包含相邻数字对规则推出的地雷"""
+        rng = random.Random(37)
+        for _ in range(200):
+            mines = set(rng.sample([(i, j) for i in range(10) for j in range(10)], rng.randint(5, 30)))
+            tiles = [[None] * 10 for _ in range(10)]
+            for _ in range(rng.randint(5, 60)):
+                i, j = rng.randrange(10), rng.randrange(10)
+                if (i, j) not in mines:
+                    tiles[i][j] = sum((i + di, j + dj) in mines for di in (-1, 0, 1) for dj in (-1, 0, 1))
+            store, cols = store_for(tiles)
+            safe, found = store.deduce(store.numbers())
+            exact = solve_frontier(tiles)
+            self.assertLessEqual({divmod(idx, cols) for idx in safe}, exact.safe)
+            self.assertLessEqual({divmod(idx, cols) for idx in found}, exact.mines)
+
+            board = tiles_to_array(tiles)
+            pair_mines = (analyze_rules(board).mine_mask | pair_subset_mines(board)) & (board == UNKNOWN)
+            self.assertLessEqual({tuple(cell) for cell in np.argwhere(pair_mines).tolist()},
+                                 {divmod(idx, cols) for idx in found})
+
+    def test_solver_store_tracks_new_games(self):
+        """测试求解器的约束库随揭示更新，新的一局开始时重建"""
+        solver = MinesweeperSolver()
+        board = [[None] * 10 for _ in range(10)]
+        board[0][0] = 1
+        board[0][1] = 1
+        solver.update_board(board)
+        self.assertEqual(len(solver.constraints), 2)
+        self.assertIn((1, 2), solver.safe_moves)
+
+        board[1][2] = 1
+        solver.update_board(board)
+        self.assertEqual(len(solver.constraints), 3)
+
+        fresh = [[None] * 10 for _ in range(10)]
+        fresh[5][5] = 2
+        solver.update_board(fresh)
+        self.assertEqual(len(solver.constraints), 1)
+        self.assertEqual(solver.safe_moves, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
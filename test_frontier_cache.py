@@ -0,0 +1,117 @@
+import unittest
+import os
+import random
+import tempfile
+import numpy as np
+from board_codec import tiles_to_array
+from frontier_cache import FrontierCache, canonical_form
+from frontier_solver import build_constraints, solve_frontier, split_components
+
+
+def single_component(board):
+    """返回棋盘上唯一的前沿分量(变量, 约束)以及列数"""
+    values = tiles_to_array(board).ravel().tolist()
+    rows, cols = len(board), len(board[0])
+    (component,) = split_components(build_constraints(values, rows, cols))
+    return component, cols
+
+
+def random_tiles(rng, rows=10, cols=10, mines=18, reveals=30):
+    """随机放置地雷并揭示一部分非地雷格子"""
+    cells = set(rng.sample([(i, j) for i in range(rows) for j in range(cols)], mines))
+    board = [[None] * cols for _ in range(rows)]
+    for _ in range(reveals):
+        i, j = rng.randrange(rows), rng.randrange(cols)
+        if (i, j) not in cells:
+            board[i][j] = sum((i + di, j + dj) in cells for di in (-1, 0, 1) for dj in (-1, 0, 1))
+    return board
+
+
+class TestFrontierCache(unittest.TestCase):
+    def test_canonical_form_ignores_translation_and_symmetry(self):
+        """测试平移以及8种旋转/翻转得到相同的规范形式"""
+        pattern = np.full((10, 10), None)
+        pattern[4, 4], pattern[4, 5], pattern[5, 5] = 1, 2, 1
+        keys = set()
+        for k in range(4):
+            for board in (np.rot90(pattern, k), np.fliplr(np.rot90(pattern, k))):
+                for shift in (0, 2):
+                    moved = np.roll(board, shift, axis=1)
+                    (_, group), cols = single_component(moved.tolist())
+                    keys.add(canonical_form(group, cols)[0])
+        self.assertEqual(len(keys), 1)
+
+    def test_canonical_form_keeps_edge_context(self):
+        """测试靠墙的1和棋盘中间的1得到不同的键"""
+        corner = [[None] * 10 for _ in range(10)]
+        corner[0][0] = 1
+        middle = [[None] * 10 for _ in range(10)]
+        middle[5][5] = 1
+        (_, corner_group), cols = single_component(corner)
+        (_, middle_group), _ = single_component(middle)
+        self.assertNotEqual(canonical_form(corner_group, cols)[0], canonical_form(middle_group, cols)[0])
+
+    def test_cached_results_match_enumeration(self):
+        """测试使用缓存（包括旋转后命中的情况）与直接枚举的结果完全一致"""
+        rng = random.Random(3)
+        cache = FrontierCache(min_variables=1)
+        for _ in range(30):
+            board = np.array(random_tiles(rng), dtype=object)
+            for variant in (board, np.rot90(board), np.flipud(board)):
+                variant = variant.tolist()
+                expected = solve_frontier(variant)
+                result = solve_frontier(variant, cache=cache)
+                np.testing.assert_array_equal(result.probabilities, expected.probabilities)
+                self.assertEqual(result.safe, expected.safe)
+                self.assertEqual(result.mines, expected.mines)
+        self.assertGreater(cache.hits, 0)
+        self.assertGreater(cache.misses, 0)
+
+    def test_lru_eviction(self):
+        """测试超过maxsize时淘汰最久没有使用的条目"""
+        cache = FrontierCache(maxsize=2, min_variables=1)
+        boards = []
+        for value in (1, 2, 3):
+            board = [[None] * 10 for _ in range(10)]
+            board[5][5] = value
+            boards.append(board)
+        solve_frontier(boards[0], cache=cache)
+        solve_frontier(boards[1], cache=cache)
+        solve_frontier(boards[0], cache=cache)  # 使用一次，boards[1]变为最久没有使用
+        solve_frontier(boards[2], cache=cache)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats()["hits"], 1)
+        solve_frontier(boards[0], cache=cache)
+        self.assertEqual(cache.stats()["hits"], 2)
+        solve_frontier(boards[1], cache=cache)
+        self.assertEqual(cache.stats()["misses"], 4)
+
+    def test_small_components_bypass_cache(self):
+        """测试少于min_variables个格子的分量直接枚举，不计入命中/未命中"""
+        cache = FrontierCache(min_variables=10)
+        board = [[None] * 10 for _ in range(10)]
+        board[0][0] = 1
+        solve_frontier(board, cache=cache)
+        self.assertEqual(cache.stats(), {"hits": 0, "misses": 0, "hit_rate": 0.0, "size": 0})
+
+    def test_save_and_load(self):
+        """测试保存后重新加载的缓存直接命中，并给出相同的结果"""
+        rng = random.Random(5)
+        boards = [random_tiles(rng) for _ in range(10)]
+        cache = FrontierCache(min_variables=1)
+        expected = [solve_frontier(board, cache=cache) for board in boards]
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "frontier_cache.json")
+            cache.save(path)
+            warm = FrontierCache(min_variables=1)
+            warm.load(path)
+
+        self.assertEqual(len(warm), len(cache))
+        for board, result in zip(boards, expected):
+            np.testing.assert_array_equal(solve_frontier(board, cache=warm).probabilities, result.probabilities)
+        self.assertEqual(warm.misses, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,223 @@
+import itertools
+import unittest
+import random
+from unittest import mock
+import numpy as np
+import frontier_solver
+from board_codec import tiles_to_array
+from frontier_solver import (solve_frontier, build_constraints, split_components, enumerate_component,
+                             component_distribution)
+
+
+class TestFrontierSolver(unittest.TestCase):
+    def test_corner_one(self):
+        """测试角落的1：周围3个格子各有1/3的概率是地雷"""
+        board = [[None for _ in range(10)] for _ in range(10)]
+        board[0][0] = 1
+        result = solve_frontier(board)
+        for cell in [(0, 1), (1, 0), (1, 1)]:
+            self.assertAlmostEqual(result.probabilities[cell], 1 / 3)
+        self.assertEqual(result.safe, set())
+        self.assertEqual(result.mines, set())
+
+    def test_one_two_one_on_wall(self):
+        """测试墙边的1-2-1：两侧是地雷，中间安全"""
+        board = [[None for _ in range(10)] for _ in range(10)]
+        for j in range(10):
+            board[9][j] = 0
+        board[9][3], board[9][4], board[9][5] = 1, 2, 1
+        board[9][2], board[9][6] = 1, 1
+        board[9][1], board[9][7] = 0, 0
+        for j in range(10):
+            if board[9][j] == 0:
+                board[8][j] = 0
+        board[8][2], board[8][6] = 1, 1
+        board[8][1], board[8][7] = 0, 0
+        result = solve_frontier(board)
+        self.assertIn((8, 3), result.mines)
+        self.assertIn((8, 5), result.mines)
+        self.assertIn((8, 4), result.safe)
+
+    def test_independent_components(self):
+        """测试相距较远的数字形成相互独立的分量"""
+        board = [[None for _ in range(10)] for _ in range(10)]
+        board[0][0] = 1
+        board[9][9] = 2
+        values = tiles_to_array(board).ravel().tolist()
+        components = split_components(build_constraints(values, 10, 10))
+        self.assertEqual(len(components), 2)
+        result = solve_frontier(board)
+        self.assertEqual(result.components, 2)
+        self.assertAlmostEqual(result.probabilities[8, 8], 2 / 3)
+
+    def test_zero_makes_neighbors_safe(self):
+        """测试0周围的格子都是确定安全的"""
+        board = [[None for _ in range(10)] for _ in range(10)]
+        board[5][5] = 0
+        result = solve_frontier(board)
+        expected = {(i, j) for i in range(4, 7) for j in range(4, 7) if (i, j) != (5, 5)}
+        self.assertEqual(result.safe, expected)
+
+    def test_probabilities_match_brute_force(self):
+        """测试枚举得到的概率与暴力枚举所有布局一致"""
+        board = [[None, None, None, None],
+                 [1, 2, None, None],
+                 [0, 1, 2, None],
+                 [0, 0, 1, None]]
+        result = solve_frontier(board)
+
+        unknown = [(i, j) for i in range(4) for j in range(4) if board[i][j] is None]
+        frontier = sorted(result.frontier)
+        totals = {cell: 0 for cell in frontier}
+        valid = 0
+        for mask in range(1 << len(frontier)):
+            mines = {cell for k, cell in enumerate(frontier) if mask >> k & 1}
+            consistent = True
+            for i in range(4):
+                for j in range(4):
+                    if board[i][j] is None:
+                        continue
+                    count = sum((ni, nj) in mines
+                                for ni in range(i - 1, i + 2) for nj in range(j - 1, j + 2))
+                    if count != board[i][j]:
+                        consistent = False
+            if consistent:
+                valid += 1
+                for cell in mines:
+                    totals[cell] += 1
+        self.assertGreater(valid, 0)
+        for cell in frontier:
+            self.assertAlmostEqual(result.probabilities[cell], totals[cell] / valid)
+        self.assertTrue(set(frontier) <= set(unknown))
+
+    def test_layered_count_matches_backtracking(self):
+        """测试逐层动态规划与直接回溯的计数结果一致"""
+        rng = random.Random(17)
+        for _ in range(40):
+            mines = set(rng.sample(range(36), 8))
+            board = [[None] * 6 for _ in range(6)]
+            for idx in rng.sample(range(36), 10):
+                if idx not in mines:
+                    i, j = divmod(idx, 6)
+                    board[i][j] = sum((i + di) * 6 + j + dj in mines
+                                      for di in (-1, 0, 1) for dj in (-1, 0, 1)
+                                      if 0 <= i + di < 6 and 0 <= j + dj < 6)
+            values = tiles_to_array(board).ravel().tolist()
+            for variables, group in split_components(build_constraints(values, 6, 6)):
+                with mock.patch.object(frontier_solver, "BACKTRACK_LIMIT", 0):
+                    layered = enumerate_component(variables, group)
+                with mock.patch.object(frontier_solver, "BACKTRACK_LIMIT", float("inf")):
+                    backtracked = enumerate_component(variables, group)
+                self.assertEqual(layered, backtracked)
+
+    def test_sparse_board_with_huge_component(self):
+        """测试分散的数字连成大分量时不需要逐个枚举布局，且概率仍然精确"""
+        board = [[None] * 15 for _ in range(9)]
+        numbers = [(i, j) for i in range(1, 9, 2) for j in range(1, 15, 2)]
+        for i, j in numbers:
+            board[i][j] = 1
+        result = solve_frontier(board)
+        probabilities = result.probabilities
+        self.assertEqual(result.components, 1)
+        self.assertGreater(result.configurations, 10 ** 8)
+        # 棋盘上下、左右对称，概率也必须对称
+        np.testing.assert_allclose(probabilities, probabilities[::-1, :])
+        np.testing.assert_allclose(probabilities, probabilities[:, ::-1])
+        # 每个数字周围格子的概率之和等于该数字的期望地雷数，也就是数字本身
+        for i, j in numbers:
+            around = sum(probabilities[i + di, j + dj]
+                         for di in (-1, 0, 1) for dj in (-1, 0, 1) if (di, dj) != (0, 0))
+            self.assertAlmostEqual(around, 1)
+
+    def test_total_mines_matches_brute_force(self):
+        """测试给出地雷总数时，所有未知格子（包括内部格子）的概率与暴力枚举一致"""
+        rng = random.Random(8)
+        for _ in range(40):
+            rows, cols = 4, rng.randint(3, 5)
+            cells = [(i, j) for i in range(rows) for j in range(cols)]
+            mines = set(rng.sample(cells, rng.randint(1, 5)))
+            board = [[None] * cols for _ in range(rows)]
+            for i, j in rng.sample(cells, rng.randint(1, 5)):
+                if (i, j) not in mines:
+                    board[i][j] = sum((i + di, j + dj) in mines for di in (-1, 0, 1) for dj in (-1, 0, 1))
+
+            unknown = [(i, j) for i, j in cells if board[i][j] is None]
+            totals = {cell: 0 for cell in unknown}
+            valid = 0
+            for placement in itertools.combinations(unknown, len(mines)):
+                placed = set(placement)
+                if all(board[i][j] is None or board[i][j] == sum(
+                        (i + di, j + dj) in placed for di in (-1, 0, 1) for dj in (-1, 0, 1))
+                       for i, j in cells):
+                    valid += 1
+                    for cell in placed:
+                        totals[cell] += 1
+
+            result = solve_frontier(board, total_mines=len(mines))
+            for cell in unknown:
+                self.assertAlmostEqual(result.probabilities[cell], totals[cell] / valid)
+                self.assertEqual(cell in result.safe, totals[cell] == 0)
+                self.assertEqual(cell in result.mines, totals[cell] == valid)
+
+    def test_total_mines_decides_interior(self):
+        """测试地雷总数本身就能确定格子：前沿用完所有地雷时内部格子全部安全"""
+        board = [[None for _ in range(10)] for _ in range(10)]
+        board[0][0] = 1
+        result = solve_frontier(board, total_mines=1)
+        self.assertEqual(result.probabilities[5, 5], 0)
+        self.assertIn((5, 5), result.safe)
+        self.assertAlmostEqual(result.probabilities[0, 1], 1 / 3)
+
+        # 不给地雷总数时内部格子只是估计，不会被判为安全
+        self.assertNotIn((5, 5), solve_frontier(board).safe)
+
+    def test_total_mines_inconsistent_falls_back(self):
+        """测试地雷总数与棋盘矛盾时退回不加权的计算"""
+        board = [[None for _ in range(10)] for _ in range(10)]
+        board[5][5] = 3
+        np.testing.assert_array_equal(solve_frontier(board, total_mines=1).probabilities,
+                                      solve_frontier(board).probabilities)
+
+    def test_layered_distribution_matches_backtracking(self):
+        """测试按地雷数拆分的逐层动态规划与直接回溯结果一致，且与不拆分的计数相符"""
+        rng = random.Random(19)
+        for _ in range(30):
+            mines = set(rng.sample(range(36), 8))
+            board = [[None] * 6 for _ in range(6)]
+            for idx in rng.sample(range(36), 10):
+                if idx not in mines:
+                    i, j = divmod(idx, 6)
+                    board[i][j] = sum((i + di) * 6 + j + dj in mines
+                                      for di in (-1, 0, 1) for dj in (-1, 0, 1)
+                                      if 0 <= i + di < 6 and 0 <= j + dj < 6)
+            values = tiles_to_array(board).ravel().tolist()
+            for variables, group in split_components(build_constraints(values, 6, 6)):
+                with mock.patch.object(frontier_solver, "BACKTRACK_LIMIT", 0):
+                    layered = component_distribution(variables, group)
+                with mock.patch.object(frontier_solver, "BACKTRACK_LIMIT", float("inf")):
+                    backtracked = component_distribution(variables, group)
+                for actual, expected in zip(layered, backtracked):
+                    np.testing.assert_allclose(actual, expected)
+                total, counts = enumerate_component(variables, group)
+                self.assertEqual(layered[0].sum(), total)
+                np.testing.assert_allclose(layered[1].sum(axis=1), counts)
+
+    def test_known_mines_are_excluded(self):
+        """测试预先确定的地雷会从约束中扣除"""
+        board = [[None for _ in range(10)] for _ in range(10)]
+        board[0][0] = 1
+        result = solve_frontier(board, known_mines={(1, 1)})
+        self.assertEqual(result.probabilities[1, 1], 1.0)
+        self.assertIn((0, 1), result.safe)
+        self.assertIn((1, 0), result.safe)
+
+    def test_numpy_object_board(self):
+        """测试可以直接接收numpy对象数组"""
+        board = np.full((10, 10), None)
+        board[3, 3] = 1
+        result = solve_frontier(board)
+        self.assertEqual(len(result.frontier), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
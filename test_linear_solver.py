@@ -0,0 +1,85 @@
+import unittest
+import random
+import numpy as np
+from board_codec import tiles_to_array
+from frontier_solver import build_constraints, solve_frontier
+from linear_solver import eliminate, linear_deductions
+from MineSweeper import MinesweeperSolver
+from rules_kernel import analyze_rules, pair_subset_mines
+
+
+def random_tiles(rng, size=10):
+    """随机放置地雷并揭示一部分非地雷格子"""
+    mines = set(rng.sample([(i, j) for i in range(size) for j in range(size)], rng.randint(5, 25)))
+    tiles = [[None] * size for _ in range(size)]
+    for _ in range(rng.randint(5, 60)):
+        i, j = rng.randrange(size), rng.randrange(size)
+        if (i, j) not in mines:
+            tiles[i][j] = sum((i + di, j + dj) in mines for di in (-1, 0, 1) for dj in (-1, 0, 1))
+    return tiles
+
+
+def deductions(tiles):
+    """返回线性推理在棋盘上得到的(安全格子, 地雷)，元素为(i, j)"""
+    board = tiles_to_array(tiles)
+    rows, cols = board.shape
+    safe, mines = linear_deductions(build_constraints(board.ravel().tolist(), rows, cols))
+    return {divmod(idx, cols) for idx in safe}, {divmod(idx, cols) for idx in mines}
+
+
+class TestLinearSolver(unittest.TestCase):
+    def test_one_two_one_on_wall(self):
+        """测试墙边的1-2-1：两端下方是地雷，中间下方安全"""
+        board = [[None] * 5 for _ in range(3)]
+        board[0][1:4] = [1, 2, 1]
+        board[0][0] = 1
+        board[0][4] = 1
+        safe, mines = deductions(board)
+        self.assertEqual(mines, {(1, 1), (1, 3)})
+        self.assertIn((1, 2), safe)
+
+    def test_three_constraint_proof(self):
+        """测试需要三个约束组合才能证明的结论：a+b=1, b+c=1, a+c+d=1 推出 a=c=0, b=d=1"""
+        safe, mines = linear_deductions([(1, (0, 1)), (1, (1, 2)), (1, (0, 2, 3))])
+        self.assertEqual(safe, {0, 2})
+        self.assertEqual(mines, {1, 3})
+
+    def test_eliminate_keeps_integer_rows(self):
+        """测试消元结果是整数系数，且每行约去了公约数"""
+        rows = eliminate([({0: 1, 1: 1}, 1), ({1: 1, 2: 1}, 1), ({0: 1, 2: 1, 3: 1}, 1)])
+        self.assertEqual(len(rows), 3)
+        for coefficients, target in rows:
+            values = list(coefficients.values()) + [target]
+            self.assertTrue(all(isinstance(a, int) for a in values))
+            self.assertEqual(np.gcd.reduce(np.abs(values)), 1)
+
+    def test_sound_and_covers_pair_rule(self):
+        """测试随机棋盘上的结论都被前沿枚举确认，并且包含相邻数字对规则推出的地雷"""
+        rng = random.Random(29)
+        for _ in range(200):
+            tiles = random_tiles(rng)
+            safe, mines = deductions(tiles)
+            exact = solve_frontier(tiles)
+            self.assertLessEqual(safe, exact.safe)
+            self.assertLessEqual(mines, exact.mines)
+
+            board = tiles_to_array(tiles)
+            pair_mines = (analyze_rules(board).mine_mask | pair_subset_mines(board)) & (board == -1)
+            self.assertLessEqual({tuple(cell) for cell in np.argwhere(pair_mines).tolist()}, mines)
+
+    def test_solver_with_linear_deduction(self):
+        """测试MinesweeperSolver使用linear推理时结果与默认的pairs推理一致"""
+        rng = random.Random(31)
+        for _ in range(50):
+            tiles = random_tiles(rng)
+            pairs = MinesweeperSolver()
+            linear = MinesweeperSolver(deduction="linear")
+            pairs.update_board(tiles)
+            linear.update_board(tiles)
+            self.assertEqual(linear.safe_moves, pairs.safe_moves)
+            self.assertEqual(linear.potential_mines, pairs.potential_mines)
+            np.testing.assert_array_equal(linear.probability_map, pairs.probability_map)
+
+
+if __name__ == "__main__":
+    unittest.main()
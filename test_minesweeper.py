@@ -1,7 +1,8 @@
 import unittest
 import numpy as np
 import random
-from MineSweeper import MinesweeperSolver, get_safe_moves
+from board_codec import tiles_to_array
+from MineSweeper import MinesweeperSolver, get_safe_moves, get_safe_moves_batch
 
 class TestMinesweeperSolver(unittest.TestCase):
     def setUp(self):
@@ -194,6 +195,127 @@ class TestMinesweeperSolver(unittest.TestCase):
         # 确保没有超过最大步数
         self.assertLessEqual(moves_count, max_moves, "游戏没有在最大步数内完成")
 
+    def test_safe_moves_batch(self):
+        """测试批量接口：安全格子不会是地雷，且整批计算与逐个棋盘计算结果一致"""
+        rng = random.Random(23)
+        boards = []
+        all_mines = []
+        for _ in range(40):
+            mines = set(rng.sample([(i, j) for i in range(10) for j in range(10)], 15))
+            board = [[None for _ in range(10)] for _ in range(10)]
+            for _ in range(rng.randint(0, 50)):
+                i, j = rng.randrange(10), rng.randrange(10)
+                if (i, j) not in mines:
+                    board[i][j] = sum((i + di, j + dj) in mines for di in (-1, 0, 1) for dj in (-1, 0, 1))
+            boards.append(tiles_to_array(board))
+            all_mines.append(mines)
+        boards = np.stack(boards)
+
+        safe, moves = get_safe_moves_batch(boards)
+        self.assertEqual(safe.shape, boards.shape)
+        self.assertEqual(moves.shape, (len(boards), 2))
+        for k, mines in enumerate(all_mines):
+            for cell in np.argwhere(safe[k]).tolist():
+                self.assertNotIn(tuple(cell), mines)
+            single_safe, single_moves = get_safe_moves_batch(boards[k:k + 1])
+            np.testing.assert_array_equal(single_safe[0], safe[k])
+            np.testing.assert_array_equal(single_moves[0], moves[k])
+            i, j = moves[k]
+            self.assertEqual(boards[k, i, j], -1)
+            if safe[k].any():
+                self.assertTrue(safe[k, i, j])
+
+    def test_safe_moves_batch_special_boards(self):
+        """测试批量接口：全部未知时点击中心，没有未知格子时返回(-1, -1)"""
+        boards = np.stack([
+            tiles_to_array([[None] * 10 for _ in range(10)]),
+            np.zeros((10, 10), dtype=np.int8),
+        ])
+        safe, moves = get_safe_moves_batch(boards)
+        self.assertEqual(moves.tolist(), [[5, 5], [-1, -1]])
+        self.assertFalse(safe.any())
+
+    def test_incremental_matches_full_recompute(self):
+        """测试增量模式每一步的安全格子、地雷和概率都与完整重算一致"""
+        rng = random.Random(11)
+        full = MinesweeperSolver()
+        incremental = MinesweeperSolver(incremental=True)
+        for _ in range(15):
+            mines = set(rng.sample([(i, j) for i in range(10) for j in range(10)], 12))
+            board = [[None for _ in range(10)] for _ in range(10)]
+
+            def reveal(i, j):
+                # 与服务器一样，点到0时连带揭示周围的格子
+                stack = [(i, j)]
+                while stack:
+                    i, j = stack.pop()
+                    if not (0 <= i < 10 and 0 <= j < 10) or board[i][j] is not None:
+                        continue
+                    board[i][j] = sum((i + di, j + dj) in mines for di in (-1, 0, 1) for dj in (-1, 0, 1))
+                    if board[i][j] == 0:
+                        stack.extend((i + di, j + dj) for di in (-1, 0, 1) for dj in (-1, 0, 1))
+
+            while True:
+                full.update_board(board)
+                incremental.update_board(board)
+                self.assertEqual(incremental.safe_moves, full.safe_moves)
+                self.assertEqual(incremental.potential_mines, full.potential_mines)
+                np.testing.assert_array_equal(incremental.probability_map, full.probability_map)
+
+                unknown = [(i, j) for i in range(10) for j in range(10) if board[i][j] is None]
+                if len(unknown) == len(mines):
+                    break
+                if full.safe_moves:
+                    move = min(full.safe_moves)
+                else:
+                    move = min((cell for cell in unknown if cell not in full.potential_mines),
+                               key=lambda cell: full.probability_map[cell])
+                if move in mines:
+                    break
+                reveal(*move)
+
+    def test_total_mines_probabilities(self):
+        """测试给出地雷总数时内部格子得到精确概率，并且在更安全时选择内部格子"""
+        board = [[None for _ in range(10)] for _ in range(10)]
+        board[0][0] = 1
+        solver = MinesweeperSolver(total_mines=10)
+        solver.update_board(board)
+        # 角落的1周围有1个地雷，其余9个地雷均匀分布在其他96个未知格子中
+        self.assertAlmostEqual(solver.probability_map[5, 5], 9 / 96)
+        self.assertAlmostEqual(solver.probability_map[0, 1], 1 / 3)
+        x, y = solver.get_next_move()
+        self.assertFalse(x <= 1 and y <= 1)
+
+        incremental = MinesweeperSolver(incremental=True, total_mines=10)
+        incremental.update_board(board)
+        np.testing.assert_array_equal(incremental.probability_map, solver.probability_map)
+
+        # 前沿用完所有地雷时内部格子都是安全的
+        self.assertIn((5, 5), get_safe_moves(board, total_mines=1))
+
+    def test_rectangular_boards(self):
+        """测试非正方形的大棋盘：第一步点中心，完整对局中不会把地雷当作安全格子，换尺寸时重新开始"""
+        from simulator import SimulatedGame
+        solver = MinesweeperSolver(rows=16, cols=30, total_mines=99)
+        self.assertEqual(solver.get_next_move(), (8, 15))
+        for incremental in (False, True):
+            for seed in range(3):
+                random.seed(seed)
+                game = SimulatedGame(16, 30, 99, seed=seed)
+                game.click(15, 8)
+                solver = MinesweeperSolver(incremental=incremental, total_mines=99)
+                while not game.game_over:
+                    solver.update_board(game.tiles)
+                    self.assertEqual(solver.probability_map.shape, (16, 30))
+                    for i, j in solver.safe_moves:
+                        self.assertFalse(game.mines[i, j])
+                    i, j = solver.get_next_move()
+                    game.click(j, i)
+
+                solver.update_board([[None] * 9 for _ in range(9)])
+                self.assertEqual(solver.probability_map.shape, (9, 9))
+                self.assertEqual(solver.get_next_move(), (4, 4))
+
 if __name__ == "__main__":
     # 设置随机种子以便结果可重现
     random.seed(42)
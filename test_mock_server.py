@@ -0,0 +1,139 @@
+import importlib
+import os
+import tempfile
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+import requests
+from main import APIClient
+from mock_server import MINESWEEPER_QUEST_ID, ROLL_QUEST_ID, MockServer, MockState
+
+minesweeper_request = importlib.import_module("minesweeper-request")
+
+TOKEN = "token-abcdefghijklmnop"
+
+
+def cookie(token=TOKEN):
+    return {"cookie": f"__Secure-next-auth.session-token={token}"}
+
+
+class TestMockServer(unittest.TestCase):
+    def setUp(self):
+        self.server = MockServer(seed=0).start()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.token_file = os.path.join(self.tmp.name, "token.txt")
+        with open(self.token_file, "w") as f:
+            f.write(TOKEN + "\n")
+
+    def tearDown(self):
+        self.server.stop()
+        self.tmp.cleanup()
+
+    def test_user_and_quests(self):
+        """测试需要cookie中的token，同一个token得到同一个用户，任务目录包含掷骰子和扫雷"""
+        self.assertEqual(requests.get(self.server.url + "/user").status_code, 401)
+        first = requests.get(self.server.url + "/user", headers=cookie()).json()["data"]
+        again = requests.get(self.server.url + "/user", headers=cookie()).json()["data"]
+        other = requests.get(self.server.url + "/user", headers=cookie("other")).json()["data"]
+        self.assertEqual(first["id"], again["id"])
+        self.assertNotEqual(first["id"], other["id"])
+        quests = requests.get(self.server.url + "/quests", headers=cookie()).json()["data"]
+        self.assertTrue({ROLL_QUEST_ID, MINESWEEPER_QUEST_ID} <= {quest["id"] for quest in quests})
+        self.assertEqual(requests.get(self.server.url + "/userQuests", headers=cookie()).json(), {"data": []})
+
+    def test_rolls_through_api_client(self):
+        """测试main.APIClient掷完当天的次数后得到"Quest already completed"的错误字典"""
+        client = APIClient(self.server.url, token_file=self.token_file,
+                           header_file=os.path.join(self.tmp.name, "header.json"))
+        rolls = [client.roll_dice(TOKEN) for _ in range(self.server.state.rolls_per_day)]
+        self.assertEqual([len(roll["data"]["_diceRolls"]) for roll in rolls], [1, 2, 3, 4, 5])
+        self.assertEqual(rolls[-1]["data"]["status"], "COMPLETED")
+        self.assertEqual(client.roll_dice(TOKEN), {"error": "Quest already completed", "status_code": 400})
+
+        user_quests = client.make_request("/userQuests", token=TOKEN)["data"]
+        roll = next(uq for uq in user_quests if uq["questId"] == ROLL_QUEST_ID)
+        self.assertEqual(roll["status"], "COMPLETED")
+        self.assertEqual(roll["credits"], sum(roll["_diceRolls"]))
+        datetime.fromisoformat(roll["updatedAt"].replace("Z", "+00:00"))
+
+    def test_minesweeper_game(self):
+        """测试MinesweeperAPIClient可以对模拟服务器开始并玩完一局"""
+        client = minesweeper_request.MinesweeperAPIClient(self.token_file, engine="minesweeper",
+                                                          base_url=self.server.url)
+        response = client.start_game("Easy")
+        self.assertEqual(len(response["data"]["_minesweeper"]["tiles"]), 10)
+        # 响应中没有地雷数，不按难度猜测
+        self.assertEqual(client.config, (10, 10, None))
+        state = response["data"]["_minesweeper"]
+        while not state["gameOver"]:
+            x, y = client.solver.next_move()
+            state = client.click_tile(x, y)["data"]["_minesweeper"]
+        record = next(uq for uq in requests.get(self.server.url + "/userQuests", headers=cookie()).json()["data"]
+                      if uq["questId"] == MINESWEEPER_QUEST_ID)
+        self.assertEqual(record["status"], "COMPLETED")
+        self.assertIn("Quest already completed", client.click_tile(0, 0)["error"])
+
+    def test_error_injection_and_latency(self):
+        """测试注入的失败返回500，延迟作用于每个请求"""
+        with MockServer(error_rate=1.0, seed=0) as failing:
+            client = APIClient(failing.url, token_file=self.token_file,
+                               header_file=os.path.join(self.tmp.name, "header.json"))
+            response = client.make_request("/user", token=TOKEN)
+            self.assertEqual(response["status_code"], 500)
+        with MockServer(latency=0.05) as slow:
+            start = time.perf_counter()
+            requests.get(slow.url + "/quests", headers=cookie())
+            self.assertGreaterEqual(time.perf_counter() - start, 0.05)
+            self.assertEqual(slow.requests, 1)
+
+    def test_minesweeper_completed_for_the_day(self):
+        """测试当天完成扫雷后START被拒绝且不覆盖完成的记录，结束的对局被删除，第二天可以重新开始"""
+        now = [datetime(2025, 3, 1, 8, 0, tzinfo=timezone.utc)]
+        state = MockState(seed=0, clock=lambda: now[0])
+        start = {"questId": MINESWEEPER_QUEST_ID, "metadata": {"action": "START", "difficulty": "Easy"}}
+        status, response = state.post_user_quest(TOKEN, start)
+        record_id = response["data"]["id"]
+        game = state.games[record_id]
+
+        def click(x, y):
+            metadata = {"action": "CLICK", "userQuestId": record_id, "x": x, "y": y}
+            return state.post_user_quest(TOKEN, {"questId": MINESWEEPER_QUEST_ID, "metadata": metadata})
+
+        # 第一下之后才放置地雷，再点一个地雷结束这一局
+        click(0, 0)
+        x, y = next((x, y) for y in range(game.rows) for x in range(game.cols) if game.mines[y, x])
+        self.assertEqual(click(x, y)[1]["data"]["status"], "COMPLETED")
+        self.assertEqual(state.games, {})
+
+        self.assertEqual(state.post_user_quest(TOKEN, start), (400, {"message": "Quest already completed"}))
+        self.assertEqual(click(0, 0), (400, {"message": "Quest already completed"}))
+        self.assertEqual(state.user_quests[TOKEN][MINESWEEPER_QUEST_ID]["id"], record_id)
+
+        now[0] += timedelta(days=1)
+        status, response = state.post_user_quest(TOKEN, start)
+        self.assertEqual(status, 200)
+        self.assertNotEqual(response["data"]["id"], record_id)
+
+    def test_history_is_bounded(self):
+        """测试history只保留最近history_size个请求"""
+        with MockServer(history_size=3) as server:
+            for path in ("/user", "/quests", "/userQuests", "/quests"):
+                requests.get(server.url + path, headers=cookie())
+            self.assertEqual(server.requests, 4)
+            self.assertEqual([path for _, path, _ in server.history], ["/quests", "/userQuests", "/quests"])
+
+    def test_roll_resets_next_day(self):
+        """测试掷骰子的次数按UTC日期重置"""
+        now = [datetime(2025, 3, 1, 23, 0, tzinfo=timezone.utc)]
+        state = MockState(rolls_per_day=2, seed=0, clock=lambda: now[0])
+        body = {"questId": ROLL_QUEST_ID, "metadata": {}}
+        self.assertEqual([state.post_user_quest(TOKEN, body)[0] for _ in range(3)], [200, 200, 400])
+        now[0] += timedelta(hours=2)
+        status, response = state.post_user_quest(TOKEN, body)
+        self.assertEqual(status, 200)
+        self.assertEqual(len(response["data"]["_diceRolls"]), 1)
+        self.assertTrue(response["data"]["updatedAt"].startswith("2025-03-02"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import random
+import tempfile
+import unittest
+from MineSweeper import MinesweeperSolver
+from opening_book import (OpeningBook, best_follow_up, build_entry, config_key, pattern_key,
+                          significant_first_click)
+from simulator import SimulatedGame
+from solver_registry import available_solvers, create_solver
+from solver_stats import SolverStats
+
+ROWS, COLS, MINES = 8, 8, 10
+FIRST = (0, 0)
+
+
+def opening(seed):
+    """从FIRST开始的一局"""
+    game = SimulatedGame(ROWS, COLS, MINES, seed=seed)
+    game.click(*FIRST)
+    return game
+
+
+def make_book(seeds):
+    """收录seeds中各局开局棋盘的开局库"""
+    follow_ups = {}
+    for seed in seeds:
+        board = opening(seed).board
+        follow_ups[pattern_key(board)] = best_follow_up(board, MINES)
+    return OpeningBook({config_key(ROWS, COLS, MINES): {"first": list(FIRST), "follow_ups": follow_ups}})
+
+
+def play(solver, seed):
+    """从空棋盘开始用MinesweeperSolver玩一局，返回点击序列(x, y)"""
+    random.seed(seed)
+    game = SimulatedGame(ROWS, COLS, MINES, seed=seed)
+    moves = []
+    while not game.game_over:
+        solver.update_board(game.tiles)
+        i, j = solver.get_next_move()
+        moves.append((j, i))
+        game.click(j, i)
+    return moves
+
+
+class TestOpeningBook(unittest.TestCase):
+    def test_pattern_key(self):
+        """测试相同的棋盘得到相同的键，tiles和int8棋盘的键相同，尺寸不同的键不同"""
+        game = opening(0)
+        self.assertEqual(pattern_key(game.board), pattern_key(game.tiles))
+        self.assertEqual(pattern_key(game.board), pattern_key(game.board.copy()))
+        self.assertNotEqual(pattern_key(game.board), pattern_key(opening(1).board))
+        self.assertNotEqual(pattern_key(game.board.reshape(4, 16)), pattern_key(game.board))
+
+    def test_lookup(self):
+        """测试空棋盘返回第一下，收录的开局返回下一步，未收录或地雷数未知时返回None"""
+        book = make_book([0])
+        board = opening(0).board
+        self.assertEqual(book.lookup(SimulatedGame(ROWS, COLS, MINES).board, MINES), FIRST)
+        move = book.lookup(board, MINES)
+        self.assertEqual(board[move[1], move[0]], -1)
+        self.assertIsNone(book.lookup(board, None))
+        self.assertIsNone(book.lookup(board, MINES + 1))
+        self.assertIsNone(OpeningBook().lookup(board, MINES))
+
+    def test_save_and_load(self):
+        """测试开局库保存后读取的结果相同，文件不存在时为空的开局库"""
+        book = make_book(range(3))
+        with tempfile.TemporaryDirectory() as path:
+            path = os.path.join(path, "book.json")
+            self.assertFalse(OpeningBook.load(path))
+            book.save(path)
+            loaded = OpeningBook.load(path)
+        self.assertEqual(loaded.entries, book.entries)
+        self.assertEqual(loaded.lookup(opening(2).board, MINES), book.lookup(opening(2).board, MINES))
+
+    def test_solver_uses_book_without_changing_play(self):
+        """
+        测试开局库的下一步就是求解器自己的选择时，使用开局库的对局与不使用时完全相同，
+        并且命中开局库时跳过了分析（完整重算和增量模式）
+        """
+        seeds = range(6)
+        book = make_book(seeds)
+        # 只有第一下的开局库，让两边从同一个格子开始
+        first_only = OpeningBook({config_key(ROWS, COLS, MINES): {"first": list(FIRST), "follow_ups": {}}})
+        for incremental in (False, True):
+            for seed in seeds:
+                plain = play(MinesweeperSolver(incremental=incremental, total_mines=MINES, rows=ROWS, cols=COLS,
+                                               opening_book=first_only), seed)
+                stats = SolverStats()
+                booked = play(MinesweeperSolver(incremental=incremental, total_mines=MINES, rows=ROWS, cols=COLS,
+                                                stats=stats, opening_book=book), seed)
+                self.assertEqual(booked[0], FIRST)
+                self.assertEqual(plain, booked)
+                self.assertLess(stats.calls["calculate_probabilities"], stats.calls["update_board"])
+
+    def test_registry_engines(self):
+        """测试所有引擎都接受opening_book，在开局时使用开局库的下一步"""
+        book = make_book([4])
+        expected = book.lookup(opening(4).board, MINES)
+        for name in available_solvers():
+            solver = create_solver(name, ROWS, COLS, MINES, opening_book=book)
+            solver.observe(SimulatedGame(ROWS, COLS, MINES).tiles)
+            self.assertEqual(solver.next_move(), FIRST, name)
+            game = opening(4)
+            solver.observe(game.tiles)
+            self.assertEqual(solver.next_move(), expected, name)
+            self.assertTrue((solver.probabilities()[game.board >= 0] == 0).all(), name)
+
+    def test_significant_first_click(self):
+        """测试胜率相差在噪声以内时保留中间位置，显著更高时才换，显著的候选中取胜率最高的"""
+        center = (5, 5)
+        self.assertEqual(significant_first_click({center: 0.98, (4, 3): 0.99}, center, 200), center)
+        self.assertEqual(significant_first_click({center: 0.80, (4, 3): 0.85}, center, 200), center)
+        rates = {center: 0.80, (4, 3): 0.88, (0, 0): 0.90, (1, 1): 0.81}
+        self.assertEqual(significant_first_click(rates, center, 2000), (0, 0))
+        self.assertEqual(significant_first_click({center: 0.5, (0, 0): 0.7, (1, 1): 0.7}, center, 1000,
+                                                 tie_break=lambda move: move[0]), (1, 1))
+
+    def test_build_entry(self):
+        """测试生成的条目：第一下在棋盘内，收录的下一步都是开局棋盘中未揭示的格子"""
+        entry = build_entry(6, 6, 4, solver_name="minesweeper", games=3, openings=200, patterns=8, candidates=1)
+        x, y = entry["first"]
+        self.assertTrue(0 <= x < 6 and 0 <= y < 6)
+        self.assertLessEqual(len(entry["follow_ups"]), 8)
+        self.assertTrue(0 <= entry["coverage"] <= 1)
+        book = OpeningBook({config_key(6, 6, 4): entry})
+        for seed in range(50):
+            game = SimulatedGame(6, 6, 4, seed=seed)
+            game.click(x, y)
+            move = book.follow_up(game.board, 4)
+            if move is not None:
+                self.assertEqual(game.board[move[1], move[0]], -1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from board_codec import tiles_to_array
+from replay_corpus import BOARDS_FILE, INDEX_DTYPE, INDEX_FILE, ReplayCorpus, ReplayRecorder
+from simulator import SimulatedGame
+
+
+def record_games(path, games, rows=10, cols=10):
+    """用SimulatedGame按固定顺序点击若干局并记录，返回记录的(棋盘, x, y)列表"""
+    expected = []
+    with ReplayRecorder(path) as recorder:
+        for seed in range(games):
+            recorder.new_game()
+            game = SimulatedGame(rows, cols, seed=seed)
+            for x, y in [(cols // 2, rows // 2), (0, 0), (cols - 1, rows - 1), (0, rows - 1)]:
+                if game.game_over:
+                    break
+                before = [row[:] for row in game.tiles]
+                state = game.click(x, y)
+                recorder.record(before, x, y, state["gameOver"], state["exploded"])
+                expected.append((tiles_to_array(before), x, y, state["gameOver"], state["exploded"]))
+    return expected
+
+
+class TestReplayCorpus(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "replays")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip(self):
+        """测试记录的棋盘、点击和结果可以按下标原样读出"""
+        expected = record_games(self.path, 5)
+        corpus = ReplayCorpus(self.path)
+        self.assertEqual(len(corpus), len(expected))
+        for record, (board, x, y, game_over, exploded) in zip(corpus, expected):
+            np.testing.assert_array_equal(record.board, board)
+            self.assertEqual((record.x, record.y, record.game_over, record.exploded), (x, y, game_over, exploded))
+        self.assertEqual(sorted(set(corpus.index["game"].tolist())), list(range(5)))
+        self.assertIsInstance(corpus.index, np.memmap)
+
+    def test_append_continues_game_numbers(self):
+        """测试重新打开语料库后继续追加，对局编号接着上次的编号"""
+        first = record_games(self.path, 2)
+        second = record_games(self.path, 2)
+        corpus = ReplayCorpus(self.path)
+        self.assertEqual(len(corpus), len(first) + len(second))
+        self.assertEqual(corpus[len(corpus) - 1].game, 3)
+        np.testing.assert_array_equal(corpus[len(first)].board, second[0][0])
+
+    def test_torn_write_is_truncated(self):
+        """测试中断写入留下的半条记录在下次打开时被截掉"""
+        expected = record_games(self.path, 1)
+        with open(os.path.join(self.path, BOARDS_FILE), "ab") as f:
+            f.write(b"\x01" * 37)
+        with open(os.path.join(self.path, INDEX_FILE), "ab") as f:
+            f.write(b"\x00" * (INDEX_DTYPE.itemsize // 2))
+        with ReplayRecorder(self.path) as recorder:
+            recorder.new_game()
+            recorder.record([[None] * 10 for _ in range(10)], 5, 5)
+        corpus = ReplayCorpus(self.path)
+        self.assertEqual(len(corpus), len(expected) + 1)
+        self.assertEqual(os.path.getsize(os.path.join(self.path, BOARDS_FILE)), 100 * len(corpus))
+        self.assertTrue((corpus.board(len(corpus) - 1) == -1).all())
+
+    def test_batches_split_on_size_change(self):
+        """测试按批次读取时每批的棋盘尺寸相同，合起来覆盖全部记录"""
+        small = record_games(self.path, 3, rows=8, cols=8)
+        large = record_games(self.path, 2, rows=9, cols=16)
+        corpus = ReplayCorpus(self.path)
+        seen = []
+        for indices, boards in corpus.batches(batch_size=5):
+            self.assertLessEqual(len(indices), 5)
+            for k, board in zip(indices.tolist(), boards):
+                np.testing.assert_array_equal(board, corpus.board(k))
+            seen.extend(indices.tolist())
+        self.assertEqual(seen, list(range(len(small) + len(large))))
+
+    def test_empty_corpus(self):
+        """测试不存在的语料库为空"""
+        corpus = ReplayCorpus(self.path)
+        self.assertEqual(len(corpus), 0)
+        self.assertEqual(list(corpus.batches()), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,128 @@
+import unittest
+import importlib
+import random
+import numpy as np
+from board_codec import UNKNOWN, tiles_to_array
+from rules_kernel import analyze_rules, neighbor_count, neighbor_sum, pair_subset_mines
+
+minesweeper_request = importlib.import_module("minesweeper-request")
+
+
+def random_board(rng, size=10):
+    """随机生成一个部分揭示的棋盘，返回tiles"""
+    mines = set(rng.sample([(i, j) for i in range(size) for j in range(size)], rng.randint(5, 30)))
+    tiles = [[None] * size for _ in range(size)]
+    for _ in range(rng.randint(1, 60)):
+        i, j = rng.randrange(size), rng.randrange(size)
+        if (i, j) not in mines:
+            tiles[i][j] = sum((i + di, j + dj) in mines for di in (-1, 0, 1) for dj in (-1, 0, 1))
+    return tiles
+
+
+def neighbors(i, j, size=10):
+    return [(i + di, j + dj) for di in (-1, 0, 1) for dj in (-1, 0, 1)
+            if (di, dj) != (0, 0) and 0 <= i + di < size and 0 <= j + dj < size]
+
+
+def loop_rules(tiles):
+    """逐格循环的参考实现：概率累加和 "数字 == 未知邻居数" 的地雷"""
+    probability_map = np.zeros((10, 10))
+    mines = set()
+    for i in range(10):
+        for j in range(10):
+            if tiles[i][j] is not None and tiles[i][j] > 0:
+                unknown = [(ni, nj) for ni, nj in neighbors(i, j) if tiles[ni][nj] is None]
+                for ni, nj in unknown:
+                    probability_map[ni, nj] += tiles[i][j] / len(unknown)
+                if tiles[i][j] == len(unknown):
+                    mines.update(unknown)
+    return probability_map, mines
+
+
+def loop_pair_mines(tiles):
+    """逐对循环的参考实现：相邻数字对的子集规则"""
+    mines = set()
+    for i in range(10):
+        for j in range(10):
+            if tiles[i][j] is None or tiles[i][j] <= 0:
+                continue
+            first = {(ni, nj) for ni, nj in neighbors(i, j) if tiles[ni][nj] is None}
+            for ni, nj in neighbors(i, j):
+                if tiles[ni][nj] is None or tiles[ni][nj] <= 0:
+                    continue
+                second = {(xi, xj) for xi, xj in neighbors(ni, nj) if tiles[xi][xj] is None}
+                if (tiles[i][j] > tiles[ni][nj] and not second - first
+                        and len(first - second) == tiles[i][j] - tiles[ni][nj]):
+                    mines.update(first - second)
+    return mines
+
+
+def mask_cells(mask):
+    return {tuple(cell) for cell in np.argwhere(mask).tolist()}
+
+
+class TestRulesKernel(unittest.TestCase):
+    def test_neighbor_count_edges(self):
+        """测试邻居计数在角落、边缘和内部的结果"""
+        counts = neighbor_count(np.ones((10, 10), dtype=bool))
+        self.assertEqual(counts[0, 0], 3)
+        self.assertEqual(counts[0, 5], 5)
+        self.assertEqual(counts[5, 5], 8)
+
+    def test_batch_dimension(self):
+        """测试批量棋盘的结果与逐个计算一致"""
+        rng = random.Random(3)
+        boards = np.stack([tiles_to_array(random_board(rng)) for _ in range(8)])
+        batch = analyze_rules(boards)
+        for k in range(8):
+            single = analyze_rules(boards[k])
+            np.testing.assert_array_equal(batch.mine_mask[k], single.mine_mask)
+            np.testing.assert_array_equal(batch.unknown_count[k], single.unknown_count)
+
+    def test_matches_loop_rules(self):
+        """测试向量化规则与逐格循环的概率和地雷完全一致"""
+        rng = random.Random(11)
+        for _ in range(200):
+            tiles = random_board(rng)
+            board = tiles_to_array(tiles)
+            rules = analyze_rules(board)
+            share = np.zeros(board.shape)
+            np.divide(board, rules.unknown_count, out=share, where=(board > 0) & (rules.unknown_count > 0))
+            probability_map = np.where(board == UNKNOWN, neighbor_sum(share), 0.0)
+
+            expected_map, expected_mines = loop_rules(tiles)
+            np.testing.assert_array_equal(probability_map, expected_map)
+            self.assertEqual(mask_cells(rules.mine_mask), expected_mines)
+
+    def test_pair_rule_matches_loop(self):
+        """测试向量化的相邻数字对规则与逐对循环一致"""
+        rng = random.Random(5)
+        for _ in range(200):
+            tiles = random_board(rng)
+            self.assertEqual(mask_cells(pair_subset_mines(tiles_to_array(tiles))), loop_pair_mines(tiles))
+
+    def test_matches_bitboard_analysis(self):
+        """测试带已知地雷的规则与位棋盘求解器的analyze_board一致"""
+        rng = random.Random(9)
+        for _ in range(100):
+            tiles = random_board(rng)
+            solver = minesweeper_request.MinesweeperSolver()
+            solver.update_board(tiles)
+            bb = solver.bitboard
+            old_mines = bb.mines
+            solver.analyze_board()
+
+            known = np.zeros((10, 10), dtype=bool)
+            for idx in range(100):
+                if (old_mines >> idx) & 1:
+                    known[idx // 10, idx % 10] = True
+            rules = analyze_rules(tiles_to_array(tiles), known_mines=known)
+            safe = rules.safe_mask if rules.safe_mask.any() else rules.zero_safe_mask
+
+            as_cells = lambda mask: {(idx // 10, idx % 10) for idx in range(100) if (mask >> idx) & 1}
+            self.assertEqual(mask_cells(rules.mine_mask), as_cells(bb.mines))
+            self.assertEqual(mask_cells(safe), as_cells(bb.safe))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import asyncio
+import sqlite3
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from automation_testcase import AutomationTestCase
+from main import ROLL_JITTER, DeadlineScheduler, StateStore, next_roll_window
+from mock_server import ROLL_QUEST_ID, MockServer
+
+TOKENS = [f"token-{k}-abcdefghijklmnop" for k in range(3)]
+
+
+def at(seconds):
+    """现在之后seconds秒的时间"""
+    return datetime.now(timezone.utc) + timedelta(seconds=seconds)
+
+
+class TestDeadlineScheduler(unittest.TestCase):
+    def test_pop_due_in_deadline_order(self):
+        """测试只返回已经到期的账号，按到期时间排序，同时到期的按加入的顺序"""
+        now = [1000.0]
+        scheduler = DeadlineScheduler(clock=lambda: now[0])
+        start = datetime.fromtimestamp(now[0], timezone.utc)
+        scheduler.schedule("c", start + timedelta(seconds=30))
+        scheduler.schedule("a", start)
+        scheduler.schedule("b", start)
+        self.assertEqual(scheduler.pop_due(), ["a", "b"])
+        self.assertEqual(scheduler.pop_due(), [])
+        self.assertEqual(scheduler.next_due(), start + timedelta(seconds=30))
+        now[0] += 30
+        self.assertEqual(scheduler.pop_due(), ["c"])
+        self.assertIsNone(scheduler.next_due())
+        self.assertEqual(len(scheduler), 0)
+
+    def test_wait_sleeps_until_earliest_deadline(self):
+        """测试wait一直睡到最早的到期时间，只返回到期的账号"""
+        scheduler = DeadlineScheduler()
+        scheduler.schedule("later", at(5))
+        scheduler.schedule("soon", at(0.2))
+        start = time.perf_counter()
+        self.assertEqual(scheduler.wait(), ["soon"])
+        self.assertGreaterEqual(time.perf_counter() - start, 0.15)
+        self.assertLess(time.perf_counter() - start, 2)
+        self.assertEqual(len(scheduler), 1)
+        self.assertEqual(DeadlineScheduler().wait(), [])
+
+    def test_wait_sleeps_once(self):
+        """测试wait只睡一次，时长为到最早的到期时间的间隔"""
+        now = [1000.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            now[0] += seconds
+
+        scheduler = DeadlineScheduler(clock=lambda: now[0], sleep=sleep)
+        start = datetime.fromtimestamp(now[0], timezone.utc)
+        scheduler.schedule("later", start + timedelta(hours=2))
+        scheduler.schedule("soon", start + timedelta(minutes=30))
+        self.assertEqual(scheduler.wait(), ["soon"])
+        self.assertEqual(sleeps, [30 * 60])
+
+    def test_next_roll_window(self):
+        """测试下一次掷骰子在完成那天之后的UTC零点加上随机延迟"""
+        completed = datetime(2025, 3, 1, 23, 59, tzinfo=timezone.utc)
+        reset = datetime(2025, 3, 2, tzinfo=timezone.utc)
+        self.assertEqual(next_roll_window(completed, jitter=0), reset)
+        for _ in range(20):
+            window = next_roll_window(datetime(2025, 3, 1, 0, 1, tzinfo=timezone.utc))
+            self.assertTrue(reset <= window <= reset + timedelta(seconds=ROLL_JITTER))
+
+
+class TestAccountDeadlines(AutomationTestCase):
+    tokens = TOKENS
+
+    def test_due_times_from_roll_time(self):
+        """
+        测试掷完骰子的账号在下一个UTC日重新到期，已经掷完的账号不再掷骰子也得到同样的到期时间，
+        只处理传入的账号
+        """
+        with MockServer(seed=0) as server:
+            automation = self.automation(server)
+            next_runs = asyncio.run(automation.run_cycle(TOKENS[:2]))
+            self.assertEqual(set(next_runs), set(TOKENS[:2]))
+            self.assertFalse(any(who == TOKENS[2] for _, _, who in server.history))
+
+            today = datetime.now(timezone.utc).date()
+            reset = datetime(today.year, today.month, today.day, tzinfo=timezone.utc) + timedelta(days=1)
+            for token, due in next_runs.items():
+                self.assertTrue(reset <= due <= reset + timedelta(seconds=ROLL_JITTER))
+                self.assertEqual(server.state.user_quests[token][ROLL_QUEST_ID]["status"], "COMPLETED")
+
+            rolls = len(server.history)
+            again = asyncio.run(automation.run_cycle(TOKENS[:1]))
+            self.assertNotIn(("POST", "/userQuests", TOKENS[0]), server.history[rolls:])
+            self.assertTrue(reset <= again[TOKENS[0]] <= reset + timedelta(seconds=ROLL_JITTER))
+            automation.api_client.close()
+
+    def test_run_automation_cleans_up_on_exit(self):
+        """测试run_automation正常结束（没有要处理的账号）时也关闭连接池和状态数据库，写入缓存的状态"""
+        with MockServer(seed=0) as server:
+            automation = self.automation(server, state_file="state.db")
+            automation.initial_schedule = lambda tokens: {}
+            automation.state_store.record(TOKENS[0], {"data": {"id": "u1"}}, {"data": []}, None, None)
+            automation.run_automation()
+        with self.assertRaises(RuntimeError):
+            automation.api_client.executor.submit(print)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            automation.state_store.connection.execute("SELECT 1")
+        with StateStore(self.path("state.db")) as store:
+            self.assertEqual(store.load()[TOKENS[0]]["profile"], {"id": "u1"})
+
+    def test_failed_rolls_retry_soon(self):
+        """测试请求失败的账号在RETRY_DELAY之后重试，而不是等到第二天"""
+        with MockServer(error_rate=1.0, seed=0) as server:
+            automation = self.automation(server)
+            due = asyncio.run(automation.run_cycle(TOKENS[:1]))[TOKENS[0]]
+            automation.api_client.close()
+        self.assertLess(due, at(60 * 60))
+        self.assertGreater(due, at(60))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import numpy as np
+from board_codec import UNKNOWN, tiles_to_array
+from simulator import SimulatedGame
+
+
+def flood_fill(mines, counts, x, y):
+    """参考实现：逐格扩张的0区域揭示，返回被揭示的(行, 列)集合"""
+    rows, cols = mines.shape
+    revealed = set()
+    stack = [(y, x)]
+    while stack:
+        i, j = stack.pop()
+        if (i, j) in revealed:
+            continue
+        revealed.add((i, j))
+        if counts[i, j] != 0:
+            continue
+        for di in (-1, 0, 1):
+            for dj in (-1, 0, 1):
+                ni, nj = i + di, j + dj
+                if 0 <= ni < rows and 0 <= nj < cols and not mines[ni, nj]:
+                    stack.append((ni, nj))
+    return revealed
+
+
+class TestSimulatedGame(unittest.TestCase):
+    def test_first_click_is_safe(self):
+        """测试第一次点击的格子及其周围没有地雷，地雷数量正确"""
+        for seed in range(50):
+            game = SimulatedGame(rows=8, cols=12, num_mines=20, seed=seed)
+            state = game.click(0, 7)
+            self.assertFalse(state["exploded"])
+            self.assertEqual(int(game.mines.sum()), 20)
+            self.assertFalse(game.mines[6:, :2].any())
+            self.assertEqual(game.tiles[7][0], 0)
+
+    def test_cascade_matches_flood_fill(self):
+        """测试点到0时揭示的格子与逐格扩张的参考实现一致，数字与周围地雷数一致"""
+        for seed in range(50):
+            game = SimulatedGame(num_mines=15, seed=seed)
+            game.click(5, 5)
+            expected = flood_fill(game.mines, game.counts, 5, 5)
+            board = tiles_to_array(game.tiles)
+            revealed = {tuple(cell) for cell in np.argwhere(board != UNKNOWN).tolist()}
+            self.assertEqual(revealed, expected)
+            np.testing.assert_array_equal(game.board, board)
+            for i, j in revealed:
+                self.assertEqual(game.tiles[i][j], int(game.mines[max(i - 1, 0):i + 2, max(j - 1, 0):j + 2].sum()))
+
+    def test_state_matches_server_format(self):
+        """测试返回值与服务器_minesweeper字段的格式相同，tiles是快照"""
+        game = SimulatedGame(rows=9, cols=16, num_mines=10, seed=3)
+        state = game.click(2, 4)
+        self.assertEqual(set(state), {"tiles", "gameOver", "exploded"})
+        self.assertEqual(len(state["tiles"]), 9)
+        self.assertTrue(all(len(row) == 16 for row in state["tiles"]))
+        values = {value for row in state["tiles"] for value in row}
+        self.assertTrue(values <= {None} | set(range(9)))
+
+        before = [row[:] for row in state["tiles"]]
+        hidden = next((j, i) for i, j in np.argwhere(~game.mines & (game.board == UNKNOWN)).tolist())
+        game.click(*hidden)
+        self.assertEqual(state["tiles"], before)
+
+    def test_win_and_explode(self):
+        """测试揭示所有安全格子获胜，点到地雷失败，结束后点击不再改变状态"""
+        game = SimulatedGame(num_mines=10, seed=11)
+        game.click(5, 5)
+        for i, j in np.argwhere(~game.mines).tolist():
+            game.click(j, i)
+        self.assertTrue(game.game_over)
+        self.assertTrue(game.win)
+
+        game = SimulatedGame(num_mines=10, seed=11)
+        game.click(5, 5)
+        i, j = np.argwhere(game.mines)[0].tolist()
+        state = game.click(j, i)
+        self.assertTrue(state["gameOver"])
+        self.assertTrue(state["exploded"])
+        self.assertFalse(game.win)
+        clicks = game.clicks
+        self.assertEqual(game.click(5, 5), state)
+        self.assertEqual(game.clicks, clicks)
+
+    def test_seed_is_reproducible(self):
+        """测试相同的种子得到相同的地雷布局"""
+        a = SimulatedGame(seed=7)
+        b = SimulatedGame(seed=7)
+        a.click(3, 3)
+        b.click(3, 3)
+        np.testing.assert_array_equal(a.mines, b.mines)
+        self.assertEqual(a.tiles, b.tiles)
+
+
+if __name__ == "__main__":
+    unittest.main()
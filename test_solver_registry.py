@@ -0,0 +1,75 @@
+import random
+import unittest
+import numpy as np
+from simulator import SimulatedGame
+from solver_registry import available_solvers, create_solver, register_solver
+
+
+class TestSolverRegistry(unittest.TestCase):
+    def test_engines_share_protocol(self):
+        """
+        测试所有引擎使用相同的(x, y)坐标，概率数组形状一致且已揭示的格子为0，
+        精确的引擎标为1的格子一定是地雷（boardresolver只是估计，不检查）
+        """
+        for name in available_solvers():
+            for seed in range(5):
+                random.seed(seed)
+                game = SimulatedGame(9, 12, 12, seed=seed)
+                game.click(6, 4)
+                solver = create_solver(name, 9, 12, 12)
+                while not game.game_over:
+                    solver.observe(game.tiles)
+                    probabilities = solver.probabilities()
+                    self.assertEqual(probabilities.shape, (9, 12))
+                    self.assertTrue((probabilities[game.board >= 0] == 0).all())
+                    if name != "boardresolver":
+                        self.assertTrue(game.mines[probabilities == 1].all(), name)
+                    x, y = solver.next_move()
+                    self.assertEqual(game.board[y, x], -1)
+                    game.click(x, y)
+
+    def test_new_game_and_resize(self):
+        """测试引擎收到新的一局（包括不同尺寸）时重新开始"""
+        for name in available_solvers():
+            solver = create_solver(name, total_mines=10)
+            tiles = [[None] * 10 for _ in range(10)]
+            tiles[0][0] = 0
+            solver.observe(tiles)
+            self.assertIn(solver.next_move(), {(1, 0), (0, 1), (1, 1)})
+
+            fresh = [[None] * 10 for _ in range(10)]
+            fresh[9][9] = 0
+            solver.observe(fresh)
+            self.assertIn(solver.next_move(), {(8, 9), (9, 8), (8, 8)}, name)
+
+            solver.observe([[None] * 7 for _ in range(5)])
+            self.assertEqual(solver.probabilities().shape, (5, 7))
+
+    def test_registry(self):
+        """测试按名称注册和创建引擎，未知名称抛出ValueError"""
+        @register_solver("_corner")
+        class CornerEngine:
+            def __init__(self, rows, cols, total_mines):
+                self.shape = (rows, cols)
+
+            def observe(self, tiles):
+                self.shape = (len(tiles), len(tiles[0]))
+
+            def next_move(self):
+                return 0, 0
+
+            def probabilities(self):
+                return np.full(self.shape, np.nan)
+
+        try:
+            self.assertIn("_corner", available_solvers())
+            self.assertEqual(create_solver("_corner").next_move(), (0, 0))
+        finally:
+            from solver_registry import _REGISTRY
+            del _REGISTRY["_corner"]
+        with self.assertRaises(ValueError):
+            create_solver("no-such-engine")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from frontier_cache import FrontierCache
+from MineSweeper import MinesweeperSolver
+from simulator import SimulatedGame
+from solver_registry import available_solvers, create_solver
+from solver_stats import NULL_STATS, SolverStats
+
+
+def play(solver, seed, rows=9, cols=9, num_mines=10):
+    """用MinesweeperSolver玩一局，返回点击序列"""
+    random.seed(seed)
+    game = SimulatedGame(rows, cols, num_mines, seed=seed)
+    game.click(cols // 2, rows // 2)
+    moves = []
+    while not game.game_over:
+        solver.update_board(game.tiles)
+        i, j = solver.get_next_move()
+        moves.append((i, j))
+        game.click(j, i)
+    return moves
+
+
+class TestSolverStats(unittest.TestCase):
+    def test_phases_and_counters(self):
+        """测试完整重算和增量模式都记录各阶段的耗时和枚举的计数器"""
+        for incremental in (False, True):
+            stats = SolverStats()
+            cache = FrontierCache()
+            solver = MinesweeperSolver(incremental=incremental, cache=cache, rows=9, cols=9, stats=stats)
+            moves = play(solver, 3)
+            summary = stats.summary()
+            for phase in ("update_board", "calculate_probabilities", "advanced_analysis",
+                          "enumeration", "get_next_move"):
+                self.assertGreater(summary["timings_ns"][phase], 0, phase)
+            self.assertEqual(summary["calls"]["get_next_move"], len(moves))
+            self.assertEqual(summary["calls"]["update_board"], len(moves))
+            self.assertGreaterEqual(summary["timings_ns"]["update_board"],
+                                    summary["timings_ns"]["calculate_probabilities"])
+            self.assertGreater(summary["counters"]["constraints"], 0)
+            self.assertGreater(summary["counters"]["components"], 0)
+            self.assertEqual(summary["counters"]["cache_hits"], cache.hits)
+
+    def test_stats_do_not_change_moves(self):
+        """测试开启统计不影响求解器的选择"""
+        for seed in range(5):
+            plain = play(MinesweeperSolver(rows=9, cols=9), seed)
+            profiled = play(MinesweeperSolver(rows=9, cols=9, stats=SolverStats()), seed)
+            self.assertEqual(plain, profiled)
+
+    def test_registry_engines_accept_stats(self):
+        """测试所有注册的引擎都接受stats并记录get_next_move"""
+        for name in available_solvers():
+            stats = SolverStats()
+            solver = create_solver(name, 9, 9, 10, stats=stats)
+            game = SimulatedGame(9, 9, 10, seed=1)
+            game.click(4, 4)
+            solver.observe(game.tiles)
+            solver.next_move()
+            self.assertEqual(stats.calls["get_next_move"], 1, name)
+            self.assertEqual(stats.calls["update_board"], 1, name)
+
+    def test_end_game_and_dump(self):
+        """测试每局的统计保存后清零，dump写出每局一行JSON"""
+        stats = SolverStats()
+        play(MinesweeperSolver(rows=9, cols=9, stats=stats), 0)
+        game = stats.end_game(seed=0)
+        self.assertEqual(game["seed"], 0)
+        self.assertFalse(stats.timings)
+        self.assertFalse(stats.counters)
+        play(MinesweeperSolver(rows=9, cols=9, stats=stats), 1)
+        stats.end_game(seed=1)
+
+        with tempfile.TemporaryDirectory() as path:
+            path = os.path.join(path, "stats.jsonl")
+            stats.dump(path)
+            stats.dump(path)
+            with open(path, encoding="utf-8") as f:
+                lines = [json.loads(line) for line in f]
+        self.assertEqual([line["seed"] for line in lines], [0, 1])
+        self.assertIn("enumeration", lines[1]["timings_ns"])
+
+    def test_null_stats(self):
+        """测试默认的空实现为假值，不记录任何内容"""
+        self.assertFalse(NULL_STATS)
+        self.assertIs(MinesweeperSolver().stats, NULL_STATS)
+        NULL_STATS.stop("phase", NULL_STATS.start())
+        NULL_STATS.count("name")
+        self.assertFalse(hasattr(NULL_STATS, "timings"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from automation_testcase import AutomationTestCase
+from main import StateStore
+from mock_server import ROLL_QUEST_ID, MockServer
+
+TOKENS = [f"token-{k}-abcdefghijklmnop" for k in range(3)]
+
+
+def user_quests(status, updated_at):
+    return {"data": [{"questId": ROLL_QUEST_ID, "status": status, "updatedAt": updated_at}]}
+
+
+class TestStateStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "state.db")
+
+    def stored(self):
+        """用另一个连接读取数据库中的状态"""
+        with StateStore(self.path) as store:
+            return store.load()
+
+    def test_batched_writes_and_reload(self):
+        """测试记录先缓存，flush时一次写入；WAL模式；重新打开后读到相同的状态，未知的字段保留原来的值"""
+        rolled = datetime(2025, 3, 1, 8, tzinfo=timezone.utc)
+        due = datetime(2025, 3, 2, 0, 30, tzinfo=timezone.utc)
+        user = {"data": {"id": "u1", "email": "a@b.c", "refCode": "R", "auths": [{"displayName": "alice"}]}}
+        with StateStore(self.path, batch_size=10) as store:
+            self.assertEqual(store.connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            store.record(TOKENS[0], user, user_quests("COMPLETED", "2025-03-01T08:00:00.000Z"), rolled, due)
+            self.assertEqual(self.stored(), {})
+
+            store.flush()
+            state = self.stored()[TOKENS[0]]
+            self.assertEqual(state["profile"], {"id": "u1", "email": "a@b.c", "refCode": "R", "displayName": "alice"})
+            self.assertEqual(state["quests"][ROLL_QUEST_ID]["status"], "COMPLETED")
+            self.assertEqual(state["last_roll_at"], rolled)
+            self.assertEqual(state["next_due"], due)
+
+            # 请求失败时没有数据：保留上次的资料和任务状态，清除下次到期时间
+            store.record(TOKENS[0], {"error": "boom"}, {"error": "boom"}, None, None)
+        state = self.stored()[TOKENS[0]]
+        self.assertEqual(state["profile"]["id"], "u1")
+        self.assertEqual(state["last_roll_at"], rolled)
+        self.assertIsNone(state["next_due"])
+
+    def test_flushes_when_batch_is_full(self):
+        """测试缓存的账号数达到batch_size时自动写入"""
+        with StateStore(self.path, batch_size=2) as store:
+            store.record(TOKENS[0], {}, {}, None, None)
+            self.assertEqual(len(self.stored()), 0)
+            store.record(TOKENS[1], {}, {}, None, None)
+            self.assertEqual(set(self.stored()), set(TOKENS[:2]))
+
+
+class TestStartupWithoutRequests(AutomationTestCase):
+    tokens = TOKENS
+
+    def test_restart_skips_finished_accounts(self):
+        """
+        测试掷完骰子的账号的状态写入数据库；重启后不发任何请求就知道这些账号要等到下一个窗口，
+        只有没有处理过和失败的账号现在到期
+        """
+        with MockServer(seed=0) as server:
+            automation = self.automation(server, state_file="state.db")
+            next_runs = asyncio.run(automation.run_cycle(TOKENS[:2]))
+            automation.close()
+
+            restarted = self.automation(server, state_file="state.db")
+            requests_before = server.requests
+            start = datetime.now(timezone.utc)
+            schedule = restarted.initial_schedule(TOKENS)
+            self.assertEqual(server.requests, requests_before)
+
+        for token in TOKENS[:2]:
+            self.assertEqual(schedule[token], next_runs[token])
+            self.assertIn(token, restarted.roll_times)
+        self.assertLessEqual(schedule[TOKENS[2]], start + timedelta(seconds=1))
+
+        state = restarted.state_store.load()[TOKENS[0]]
+        self.assertEqual(state["quests"][ROLL_QUEST_ID]["status"], "COMPLETED")
+        self.assertIn("id", state["profile"])
+
+    def test_failed_accounts_are_due_on_restart(self):
+        """测试请求失败的账号不记录下次到期时间，重启后立即处理"""
+        with MockServer(error_rate=1.0, seed=0) as server:
+            automation = self.automation(server, state_file="state.db")
+            asyncio.run(automation.run_cycle(TOKENS[:1]))
+            automation.close()
+            schedule = self.automation(server, state_file="state.db").initial_schedule(TOKENS[:1])
+        self.assertLessEqual(schedule[TOKENS[0]], datetime.now(timezone.utc))
+
+
+if __name__ == "__main__":
+    unittest.main()
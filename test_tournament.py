@@ -0,0 +1,38 @@
+import unittest
+from solver_registry import available_solvers
+from tournament import play_game, run_tournament, wilson_interval
+
+
+class TestTournament(unittest.TestCase):
+    def test_games_are_reproducible(self):
+        """测试同一个种子的对局结果相同，每个求解器都能把一局玩完"""
+        for name in available_solvers():
+            first = play_game(name, 123)
+            second = play_game(name, 123)
+            self.assertEqual(first[:2], second[:2])
+            self.assertEqual(len(first[2]), first[1] - 1)
+
+    def test_pool_matches_single_process(self):
+        """测试进程池的结果与单进程运行完全一致（与进程数和分块无关）"""
+        inline = run_tournament(["minesweeper", "bitboard"], games=12, master_seed=7, workers=1, chunk_size=5)
+        pooled = run_tournament(["minesweeper", "bitboard"], games=12, master_seed=7, workers=2, chunk_size=3)
+        for a, b in zip(inline, pooled):
+            self.assertEqual((a["solver"], a["wins"], a["avg_clicks"]), (b["solver"], b["wins"], b["avg_clicks"]))
+            self.assertEqual(a["games"], 12)
+            latency = a["latency_us"]
+            self.assertLessEqual(latency["p50"], latency["p95"])
+            self.assertLessEqual(latency["p95"], latency["p99"])
+
+    def test_wilson_interval(self):
+        """测试置信区间包含观测胜率，且局数越多越窄"""
+        low, high = wilson_interval(90, 100)
+        self.assertLess(low, 0.9)
+        self.assertGreater(high, 0.9)
+        narrow = wilson_interval(9000, 10000)
+        self.assertLess(narrow[1] - narrow[0], high - low)
+        self.assertEqual(wilson_interval(0, 10)[0], 0.0)
+        self.assertEqual(wilson_interval(10, 10)[1], 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+"""
+求解器锦标赛：在进程池中用SimulatedGame为每个求解器跑N局带种子的对局
+
+求解器按solver_registry中注册的名称选择。
+
+用法:
+    python tournament.py [--games 1000] [--seed 42] [--workers 4] [--solvers boardresolver minesweeper bitboard]
+    python tournament.py --difficulty Hard   # 16x30、99个地雷，也可以用--rows/--cols/--mines指定
+
+每局的种子由主种子确定，同一局的棋盘对所有求解器相同；结果与进程数、分块方式无关，可以完整复现。
+"""
+import argparse
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from board_config import DIFFICULTIES, config_for
+from simulator import SimulatedGame
+from solver_registry import available_solvers, create_solver
+
+
+def game_seeds(master_seed, games):
+    """由主种子生成每局的种子"""
+    return np.random.SeedSequence(master_seed).generate_state(games).tolist()
+
+
+def play_game(solver_name, seed, rows=10, cols=10, num_mines=10, first_click=None):
+    """
+    用指定求解器玩一局，第一下点first_click给出的(x, y)，默认点中间；每步的耗时包括observe和next_move
+
+    返回:
+    (win, clicks, latencies) -- latencies为每步决策耗时（秒）的列表，不包括第一下
+    """
+    # 求解器内部用random打破平局，按局设置种子保证可以复现
+    random.seed(seed)
+    game = SimulatedGame(rows, cols, num_mines, seed=seed)
+    solver = create_solver(solver_name, rows, cols, num_mines)
+    game.click(*(first_click or (cols // 2, rows // 2)))
+    latencies = []
+    while not game.game_over and game.clicks < rows * cols:
+        start = time.perf_counter()
+        solver.observe(game.tiles)
+        move = solver.next_move()
+        latencies.append(time.perf_counter() - start)
+        if move is None:
+            break
+        game.click(*move)
+    return game.win, game.clicks, latencies
+
+
+def play_chunk(solver_name, seeds, rows=10, cols=10, num_mines=10):
+    """在工作进程中连续玩seeds中的各局，返回(胜局列表, 点击数列表, 全部决策耗时)"""
+    wins = []
+    clicks = []
+    latencies = []
+    for seed in seeds:
+        win, count, moves = play_game(solver_name, seed, rows, cols, num_mines)
+        wins.append(win)
+        clicks.append(count)
+        latencies.extend(moves)
+    return wins, clicks, latencies
+
+
+def wilson_interval(wins, games, z=1.96):
+    """胜率的Wilson置信区间（默认95%）"""
+    if games == 0:
+        return 0.0, 1.0
+    p = wins / games
+    denominator = 1 + z * z / games
+    center = (p + z * z / (2 * games)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / games + z * z / (4 * games * games)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def summarize(name, wins, clicks, latencies):
+    """汇总一个求解器的结果"""
+    games = len(wins)
+    won = sum(wins)
+    latencies = np.asarray(latencies) * 1e6
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) if len(latencies) else (0.0, 0.0, 0.0)
+    return {
+        "solver": name,
+        "games": games,
+        "wins": won,
+        "win_rate": won / games if games else 0.0,
+        "win_rate_ci": wilson_interval(won, games),
+        "avg_clicks": sum(clicks) / games if games else 0.0,
+        "latency_us": {"p50": float(p50), "p95": float(p95), "p99": float(p99)},
+    }
+
+
+def run_tournament(solvers=None, games=1000, master_seed=42, workers=None,
+                   rows=10, cols=10, num_mines=10, chunk_size=50):
+    """
+    为每个求解器玩games局，分块提交到进程池
+
+    参数:
+    workers -- 进程数，默认为CPU数；为1时在当前进程中运行，不创建进程池
+    chunk_size -- 每个任务包含的局数，减少进程间通信的次数
+
+    返回:
+    list -- 每个求解器的汇总字典，顺序与solvers相同
+    """
+    solvers = list(solvers or available_solvers())
+    seeds = game_seeds(master_seed, games)
+    chunks = [seeds[k:k + chunk_size] for k in range(0, games, chunk_size)]
+    workers = workers or os.cpu_count() or 1
+
+    results = {}
+    if workers == 1:
+        for name in solvers:
+            results[name] = [play_chunk(name, chunk, rows, cols, num_mines) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {name: [pool.submit(play_chunk, name, chunk, rows, cols, num_mines) for chunk in chunks]
+                       for name in solvers}
+            results = {name: [future.result() for future in futures[name]] for name in solvers}
+
+    summaries = []
+    for name in solvers:
+        wins = [win for chunk in results[name] for win in chunk[0]]
+        clicks = [count for chunk in results[name] for count in chunk[1]]
+        latencies = [latency for chunk in results[name] for latency in chunk[2]]
+        summaries.append(summarize(name, wins, clicks, latencies))
+    return summaries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="扫雷求解器锦标赛")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--rows", type=int, default=10)
+    parser.add_argument("--cols", type=int, default=10)
+    parser.add_argument("--mines", type=int, default=10)
+    parser.add_argument("--difficulty", choices=list(DIFFICULTIES), help="使用难度的默认配置，覆盖--rows/--cols/--mines")
+    parser.add_argument("--solvers", nargs="+", choices=available_solvers(), default=available_solvers())
+    args = parser.parse_args()
+    if args.difficulty:
+        args.rows, args.cols, args.mines = config_for(args.difficulty)
+
+    start = time.perf_counter()
+    summaries = run_tournament(args.solvers, args.games, args.seed, args.workers,
+                               args.rows, args.cols, args.mines)
+    elapsed = time.perf_counter() - start
+    for summary in summaries:
+        low, high = summary["win_rate_ci"]
+        latency = summary["latency_us"]
+        print(f"{summary['solver']:>13}: 胜率 {summary['win_rate']:.1%} (95% CI {low:.1%}-{high:.1%}), "
+              f"平均点击 {summary['avg_clicks']:.1f}, "
+              f"决策耗时 p50 {latency['p50']:.0f} / p95 {latency['p95']:.0f} / p99 {latency['p99']:.0f} 微秒")
+    print(f"共 {args.games * len(summaries)} 局, 耗时 {elapsed:.1f} 秒")
+
+
+if __name__ == "__main__":
+    main()